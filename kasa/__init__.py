@@ -16,6 +16,8 @@ from importlib.metadata import version
 from typing import TYPE_CHECKING, Any
 from warnings import warn
 
+from kasa.capabilitycache import CapabilityCache
+from kasa.connectioncache import ConnectionCache
 from kasa.credentials import Credentials
 from kasa.device import Device
 from kasa.device_type import DeviceType
@@ -30,6 +32,7 @@ from kasa.emeterstatus import EmeterStatus
 from kasa.exceptions import (
     AuthenticationError,
     DeviceError,
+    DeviceUnavailableError,
     KasaException,
     TimeoutError,
     UnsupportedDeviceError,
@@ -38,8 +41,10 @@ from kasa.feature import Feature
 from kasa.interfaces.light import HSV, ColorTempRange, Light, LightState
 from kasa.interfaces.thermostat import Thermostat, ThermostatState
 from kasa.module import Module
+from kasa.poller import Poller
 from kasa.protocols import BaseProtocol, IotProtocol, SmartCamProtocol, SmartProtocol
 from kasa.protocols.iotprotocol import _deprecated_TPLinkSmartHomeProtocol  # noqa: F401
+from kasa.sessionstore import SessionStore
 from kasa.smartcam.modules.camera import StreamResolution
 from kasa.transports import BaseTransport
 
@@ -65,9 +70,11 @@ __all__ = [
     "HSV",
     "Plug",
     "Module",
+    "Poller",
     "KasaException",
     "AuthenticationError",
     "DeviceError",
+    "DeviceUnavailableError",
     "UnsupportedDeviceError",
     "TimeoutError",
     "Credentials",
@@ -75,6 +82,9 @@ __all__ = [
     "DeviceConnectionParameters",
     "DeviceEncryptionType",
     "DeviceFamily",
+    "SessionStore",
+    "ConnectionCache",
+    "CapabilityCache",
     "ThermostatState",
     "Thermostat",
     "StreamResolution",
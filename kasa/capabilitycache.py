@@ -0,0 +1,159 @@
+"""Cache of the capabilities of device models to shorten their first update.
+
+The first update of a SMART device negotiates the components of the device
+before the module queries of the first update can be planned. Devices of the
+same model, hardware and firmware version report the same components, so the
+components and the module queries of a first update are cached per model and
+shared by all devices using the cache of their
+:class:`~kasa.deviceconfig.DeviceConfig`::
+
+    cache = CapabilityCache("capabilities.json")
+    config = DeviceConfig(host, credentials=credentials, capability_cache=cache)
+    dev = await Device.connect(config=config)
+
+Discovered devices use the cache once it is set on their configuration
+before the first update::
+
+    dev.config.capability_cache = cache
+    await dev.update()
+
+With a cached entry the negotiation and the module queries of the first update
+are sent in a single batched request. As the device is looked up before its
+firmware version is known, the entry is found by the host or the model
+reported by discovery, and the negotiation response is still used to
+initialize the modules, so a stale entry only costs the extra queries.
+
+The cache also remembers the methods rejected as unsupported by a model,
+hardware and firmware version, which are no longer queried by the updates of
+devices using the cache.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from .exceptions import SmartErrorCode
+from .jsonfile import JsonFile
+
+
+class CapabilityCache:
+    """Cache of device model capabilities, optionally persisted to a json file.
+
+    The file is saved in the background, use :meth:`flush` to wait for the
+    changes to be written.
+
+    :param path: Path of the json file, the entries are only kept in
+        memory if not provided.
+    """
+
+    def __init__(self, path: str | os.PathLike | None = None) -> None:
+        self._file = JsonFile(path, "capability cache")
+        self._data: dict[str, dict[str, Any]] | None = None
+
+    def get(self, model: str, hw_ver: str, fw_ver: str) -> dict[str, Any] | None:
+        """Return the entry of the model, hardware and firmware version."""
+        return self._load()["entries"].get(_entry_key(model, hw_ver, fw_ver))
+
+    def find(
+        self, *, host: str | None = None, discovery_model: str | None = None
+    ) -> dict[str, Any] | None:
+        """Return the entry last stored for the host or the discovery model.
+
+        The host is preferred as the model reported by discovery does not
+        include the firmware version.
+        """
+        data = self._load()
+        for hint in _hints(host, discovery_model):
+            if (key := data["hints"].get(hint)) and (entry := data["entries"].get(key)):
+                return entry
+        return None
+
+    def set(
+        self,
+        model: str,
+        hw_ver: str,
+        fw_ver: str,
+        *,
+        components: dict[str, Any],
+        queries: dict[str, Any],
+        host: str | None = None,
+        discovery_model: str | None = None,
+    ) -> None:
+        """Store the entry of the model and its lookup hints if they changed."""
+        data = self._load()
+        key = _entry_key(model, hw_ver, fw_ver)
+        entry = {
+            "model": model,
+            "hw_ver": hw_ver,
+            "fw_ver": fw_ver,
+            "components": components,
+            "queries": queries,
+        }
+        hints = {hint: key for hint in _hints(host, discovery_model)}
+        if data["entries"].get(key) == entry and hints.items() <= data["hints"].items():
+            return
+        data["entries"][key] = entry
+        data["hints"].update(hints)
+        self._file.save(data)
+
+    def delete(self, model: str, hw_ver: str, fw_ver: str) -> None:
+        """Delete the entry and unsupported methods of the model version."""
+        data = self._load()
+        key = _entry_key(model, hw_ver, fw_ver)
+        entry = data["entries"].pop(key, None)
+        unsupported = data["unsupported"].pop(key, None)
+        if entry is None and unsupported is None:
+            return
+        data["hints"] = {
+            hint: value for hint, value in data["hints"].items() if value != key
+        }
+        self._file.save(data)
+
+    def get_unsupported(
+        self, model: str, hw_ver: str, fw_ver: str
+    ) -> dict[str, SmartErrorCode]:
+        """Return the methods rejected as unsupported and their error codes."""
+        methods = self._load()["unsupported"].get(_entry_key(model, hw_ver, fw_ver), {})
+        return {method: SmartErrorCode(code) for method, code in methods.items()}
+
+    def set_unsupported(
+        self,
+        model: str,
+        hw_ver: str,
+        fw_ver: str,
+        methods: dict[str, SmartErrorCode],
+    ) -> None:
+        """Store the methods rejected as unsupported if they are not known."""
+        data = self._load()
+        stored = data["unsupported"].setdefault(_entry_key(model, hw_ver, fw_ver), {})
+        changed = False
+        for method, error_code in methods.items():
+            if stored.get(method) != error_code.value:
+                stored[method] = error_code.value
+                changed = True
+        if changed:
+            self._file.save(data)
+
+    async def flush(self) -> None:
+        """Write the pending changes to the file."""
+        await self._file.flush()
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if self._data is None:
+            self._data = {"entries": {}, "hints": {}, "unsupported": {}}
+            self._data.update(self._file.load() or {})
+        return self._data
+
+
+def _entry_key(model: str, hw_ver: str, fw_ver: str) -> str:
+    return f"{model}|{hw_ver}|{fw_ver}"
+
+
+def _hints(host: str | None, discovery_model: str | None) -> list[str]:
+    hints = []
+    if host is not None:
+        hints.append(f"host:{host}")
+    if discovery_model is not None:
+        hints.append(f"model:{discovery_model}")
+    return hints
@@ -15,6 +15,8 @@ from kasa import (
     Discover,
     UnsupportedDeviceError,
 )
+from kasa.connectioncache import ConnectionCache
+from kasa.deviceconfig import DeviceConfig, DeviceConnectionParameters
 from kasa.discover import (
     NEW_DISCOVERY_REDACTORS,
     ConnectAttempt,
@@ -344,8 +346,34 @@ async def find_dev_from_alias(
     target: str = "255.255.255.255",
     timeout: int = 5,
     attempts: int = 3,
+    connection_cache: ConnectionCache | None = None,
 ) -> Device | None:
-    """Discover a device identified by its alias."""
+    """Discover a device identified by its alias.
+
+    If a connection cache is given, the device cached with the alias is
+    connected to first, and the discovered device is saved to the cache.
+    """
+    if connection_cache is not None and (cached := connection_cache.find(alias=alias)):
+        try:
+            dev = await Device.connect(
+                config=DeviceConfig(
+                    host=cached["host"],
+                    connection_type=DeviceConnectionParameters.from_dict(
+                        cached["config"]["connection_type"]
+                    ),
+                    timeout=timeout,
+                    credentials=credentials,
+                    connection_cache=connection_cache,
+                )
+            )
+        except Exception as ex:
+            echo(f"Unable to connect to cached device {cached['host']}: {ex}")
+            connection_cache.delete(cached["mac"])
+        else:
+            if dev.alias and dev.alias.lower() == alias.lower():
+                return dev
+            await dev.disconnect()
+
     found_event = asyncio.Event()
     found_device = []
     seen_hosts = set()
@@ -365,6 +393,8 @@ async def find_dev_from_alias(
             echo(f"Skipping device {dev.host} with no alias")
             return
         if dev.alias.lower() == alias.lower():
+            if connection_cache is not None:
+                connection_cache.set_device(dev)
             found_device.append(dev)
             found_event.set()
 
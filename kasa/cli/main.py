@@ -223,6 +223,14 @@ def _legacy_type_to_class(_type: str) -> Any:
     envvar="KASA_CREDENTIALS_HASH",
     help="Hashed credentials used to authenticate to the device.",
 )
+@click.option(
+    "--connection-cache",
+    default=None,
+    required=False,
+    envvar="KASA_CONNECTION_CACHE",
+    type=click.Path(dir_okay=False),
+    help="File caching the connection parameters of devices found by alias.",
+)
 @click.version_option(package_name="python-kasa")
 @click.pass_context
 async def cli(
@@ -244,6 +252,7 @@ async def cli(
     username,
     password,
     credentials_hash,
+    connection_cache,
 ):
     """A tool for controlling TP-Link smart home devices."""  # noqa
     # no need to perform any checks if we are just displaying the help
@@ -345,11 +354,19 @@ async def cli(
     elif alias:
         echo(f"Alias is given, using discovery to find host {alias}")
 
+        from kasa.connectioncache import ConnectionCache
+
         from .discover import find_dev_from_alias
 
+        cache = ConnectionCache(connection_cache) if connection_cache else None
         dev = await find_dev_from_alias(
-            alias=alias, target=target, credentials=credentials
+            alias=alias,
+            target=target,
+            credentials=credentials,
+            connection_cache=cache,
         )
+        if cache is not None:
+            await cache.flush()
         if not dev:
             echo(f"No device with name {alias} found")
             return
@@ -0,0 +1,121 @@
+"""Cache of the connection parameters of devices to reuse them across restarts.
+
+Connecting to devices with :meth:`Device.connect() <kasa.Device.connect>` saves
+the connection parameters of the device to the cache of the
+:class:`~kasa.deviceconfig.DeviceConfig`. Later connections to the same host
+start from the cached parameters, and the cache is only refreshed when
+connecting with the cached parameters fails::
+
+    cache = ConnectionCache("devices.json")
+    config = DeviceConfig(host, credentials=credentials, connection_cache=cache)
+    dev = await Device.connect(config=config)
+
+The devices are keyed by their mac address, and the cache stores the last ip
+address, the device configuration without credentials, the alias, model and
+firmware version of each device.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from typing import TYPE_CHECKING, Any
+
+from .exceptions import KasaException
+from .jsonfile import JsonFile
+
+if TYPE_CHECKING:
+    from .device import Device
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ConnectionCache:
+    """Cache of device connection parameters, optionally persisted to a json file.
+
+    The file is saved in the background, use :meth:`flush` to wait for the
+    changes to be written.
+
+    :param path: Path of the json file, the entries are only kept in
+        memory if not provided.
+    """
+
+    def __init__(self, path: str | os.PathLike | None = None) -> None:
+        self._file = JsonFile(path, "connection cache")
+        self._entries: dict[str, dict[str, Any]] | None = None
+
+    def get(self, mac: str) -> dict[str, Any] | None:
+        """Return the entry of the device with the mac address."""
+        return self._load().get(_normalize_mac(mac))
+
+    def find(
+        self, *, host: str | None = None, alias: str | None = None
+    ) -> dict[str, Any] | None:
+        """Return the entry of the device last seen at the host or with the alias.
+
+        Aliases are compared case insensitively.
+        """
+        for entry in self._load().values():
+            if host is not None and entry["host"] != host:
+                continue
+            if alias is not None and (
+                not entry.get("alias") or entry["alias"].lower() != alias.lower()
+            ):
+                continue
+            return entry
+        return None
+
+    def set_device(self, device: Device) -> None:
+        """Store the entry of the updated device if it changed."""
+        try:
+            mac = device.mac
+        except KasaException as ex:
+            _LOGGER.debug("Unable to cache %s without mac: %s", device.host, ex)
+            return
+        if mac.upper() == "NONE":
+            return
+        mac = _normalize_mac(mac)
+        config = device.config.to_dict_control_credentials(credentials_hash="")
+        config.pop("aes_keys", None)
+        entry = {
+            "mac": mac,
+            "host": device.host,
+            "device_id": device.device_id,
+            "alias": device.alias,
+            "model": device.model,
+            "firmware": device.hw_info.get("sw_ver"),
+            "config": config,
+        }
+        entries = self._load()
+        if entries.get(mac) == entry:
+            return
+        # Only one device can be reached at a host
+        for other in [
+            other for other, value in entries.items() if value["host"] == device.host
+        ]:
+            del entries[other]
+        entries[mac] = entry
+        self._file.save(entries)
+
+    def delete(self, mac: str) -> None:
+        """Delete the entry of the device with the mac address."""
+        if self._load().pop(_normalize_mac(mac), None) is not None:
+            self._file.save(self._entries)
+
+    async def flush(self) -> None:
+        """Write the pending changes to the file."""
+        await self._file.flush()
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if self._entries is None:
+            self._entries = self._file.load() or {}
+        return self._entries
+
+
+def _normalize_mac(mac: str) -> str:
+    """Return the mac address in upper case separated by colons.
+
+    Mac addresses separated by dashes or without separators are accepted.
+    """
+    digits = mac.upper().replace(":", "").replace("-", "")
+    return ":".join(digits[i : i + 2] for i in range(0, len(digits), 2))
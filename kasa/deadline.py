@@ -0,0 +1,77 @@
+"""Deadlines bounding the total time of queries to devices.
+
+Queries made within :func:`query_deadline` shrink the timeout of each attempt
+to the time remaining and do not retry when a retry cannot finish in time::
+
+    with query_deadline(3):
+        await dev.turn_on()
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .exceptions import TimeoutError, _DeadlineExceededError
+
+#: Minimum seconds remaining before the deadline to attempt a request
+MINIMUM_ATTEMPT_SECONDS = 0.5
+
+_query_deadline: ContextVar[float | None] = ContextVar("query_deadline", default=None)
+
+
+@contextmanager
+def query_deadline(seconds: float) -> Iterator[None]:
+    """Bound the total seconds of the queries made within the context.
+
+    The bound covers waiting for the device, the attempts and the backoff
+    between retries. Nested deadlines cannot extend an outer deadline.
+    """
+    deadline = time.monotonic() + seconds
+    if (outer := _query_deadline.get()) is not None:
+        deadline = min(deadline, outer)
+    token = _query_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _query_deadline.reset(token)
+
+
+def get_remaining_time() -> float | None:
+    """Return the seconds remaining before the deadline, or None without one."""
+    if (deadline := _query_deadline.get()) is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
+
+
+def get_timeout(timeout: float | None) -> float | None:
+    """Return the timeout shrunk to the seconds remaining before the deadline.
+
+    Raises :class:`~kasa.exceptions.TimeoutError` if the deadline has passed.
+    """
+    if (remaining := get_remaining_time()) is None:
+        return timeout
+    if remaining <= 0:
+        raise _DeadlineExceededError("Query deadline exceeded")
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+def get_timeout_error(
+    timeout: float | None, configured_timeout: float | None
+) -> type[TimeoutError]:
+    """Return the error for an attempt timing out after the timeout.
+
+    Attempts with a timeout shrunk by the deadline raise an error telling
+    them apart from devices not responding within their configured timeout.
+    """
+    if timeout != configured_timeout:
+        return _DeadlineExceededError
+    return TimeoutError
+
+
+def can_retry(backoff: float = 0) -> bool:
+    """Return true if an attempt after the backoff can finish before the deadline."""
+    remaining = get_remaining_time()
+    return remaining is None or remaining - backoff >= MINIMUM_ATTEMPT_SECONDS
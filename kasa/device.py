@@ -107,7 +107,7 @@ from __future__ import annotations
 
 import logging
 from abc import ABC, abstractmethod
-from collections.abc import Callable, Mapping, Sequence
+from collections.abc import Callable, Iterable, Mapping, Sequence
 from dataclasses import dataclass
 from datetime import datetime, tzinfo
 from typing import TYPE_CHECKING, Any, TypeAlias
@@ -124,7 +124,7 @@ from .deviceconfig import (
 from .exceptions import KasaException
 from .feature import Feature
 from .module import Module
-from .protocols import BaseProtocol, IotProtocol
+from .protocols import BaseProtocol, CircuitState, IotProtocol
 from .transports import XorTransport
 
 if TYPE_CHECKING:
@@ -190,6 +190,10 @@ class Device(ABC):
     #: The connection type for the device.
     ConnectionParameters: TypeAlias = DeviceConnectionParameters
 
+    #: Modules the device state depends on, updated regardless of the update
+    #: interests and at their minimum interval with adaptive update intervals
+    STATE_MODULES: set[str | ModuleName[Module]] = {Module.Time}
+
     def __init__(
         self,
         host: str,
@@ -219,6 +223,9 @@ class Device(ABC):
         self._features: dict[str, Feature] = {}
         self._parent: Device | None = None
         self._children: Mapping[str, Device] = {}
+        self._update_interests: frozenset[str] | None = None
+        self._adaptive_max_interval: int | None = None
+        self._module_update_intervals: dict[str, int] | None = None
 
     @staticmethod
     async def connect(
@@ -314,6 +321,16 @@ class Device(ABC):
         """The protocol specific hash of the credentials the device is using."""
         return self.protocol._transport.credentials_hash
 
+    @property
+    def circuit_state(self) -> CircuitState:
+        """Return the state of the circuit breaker of the device connection.
+
+        With :attr:`~kasa.deviceconfig.DeviceConfig.circuit_breaker` enabled,
+        queries raise :class:`~kasa.exceptions.DeviceUnavailableError` without
+        contacting the device while the circuit is open.
+        """
+        return self.protocol.circuit_state
+
     @property
     def device_type(self) -> DeviceType:
         """Return the device type."""
@@ -450,6 +467,110 @@ class Device(ABC):
         """Return the list of supported features."""
         return self._features
 
+    def set_update_interests(self, interests: Iterable[str] | None) -> None:
+        """Limit the module queries of updates to the features of interest.
+
+        Only the modules backing the given features and the given modules are
+        updated, along with the modules needed for the device state. The first
+        update queries all modules to initialize the features, and children
+        without their own interests use the interests of their parent.
+
+        :param interests: Ids of features and names of modules, or None to
+            update all modules.
+        """
+        self._update_interests = frozenset(interests) if interests is not None else None
+
+    def _get_modules_of_interest(self) -> set[Module] | None:
+        """Return the modules to update or None to update all modules."""
+        interests = self._update_interests
+        if interests is None and self._parent is not None:
+            interests = self._parent._update_interests
+        if interests is None or not self._features:
+            return None
+        modules = {
+            module
+            for name, module in self.modules.items()
+            if name in interests or name in self.STATE_MODULES
+        }
+        for feature_id in interests:
+            if (feature := self._features.get(feature_id)) and isinstance(
+                feature.container, Module
+            ):
+                modules.add(feature.container)
+        return modules
+
+    def set_adaptive_update_intervals(self, max_interval: int | None) -> None:
+        """Adapt the update intervals of the modules to how often they change.
+
+        The update interval of a module doubles with every update not changing
+        its data, up to the maximum interval, and is reset to the minimum
+        interval of the module when its data changes or the module is changed
+        by a setter. Children without their own setting use the setting of
+        their parent.
+
+        :param max_interval: Maximum seconds between updates of a module, or
+            None to disable adaptive intervals.
+        """
+        self._adaptive_max_interval = max_interval
+
+    @property
+    def _adaptive_updates_enabled(self) -> bool:
+        """Return True if adaptive update intervals are enabled for the device."""
+        return self._adaptive_max_interval is not None or (
+            self._parent is not None and self._parent._adaptive_max_interval is not None
+        )
+
+    def _get_adaptive_max_interval(self, module: Module) -> int | None:
+        """Return the maximum adaptive interval of the module, if enabled."""
+        max_interval = self._adaptive_max_interval
+        if max_interval is None and self._parent is not None:
+            max_interval = self._parent._adaptive_max_interval
+        if max_interval is None:
+            return None
+        # The modules of iot devices are only known after the first update
+        if (modules := self.modules) is not None and any(
+            modules.get(name) is module for name in self.STATE_MODULES
+        ):
+            return None
+        return max_interval
+
+    def set_module_update_intervals(self, intervals: Mapping[str, int] | None) -> None:
+        """Set the minimum seconds between updates of modules by module name.
+
+        The intervals override the default minimum intervals of the modules,
+        including modules initialized by later updates. Children without their
+        own intervals use the intervals of their parent.
+
+        :param intervals: Minimum seconds between updates keyed by module name,
+            or None to use the default intervals.
+        """
+        self._module_update_intervals = (
+            {str(name): interval for name, interval in intervals.items()}
+            if intervals is not None
+            else None
+        )
+
+    def _get_module_update_interval(self, module: Module) -> int | None:
+        """Return the minimum update interval set for the module, if any."""
+        intervals = self._module_update_intervals
+        if intervals is None and self._parent is not None:
+            intervals = self._parent._module_update_intervals
+        # The modules of iot devices are only known after the first update
+        if not intervals or (modules := self.modules) is None:
+            return None
+        for name, interval in intervals.items():
+            if modules.get(name) is module:
+                return interval
+        return None
+
+    @property
+    def module_update_stats(self) -> dict[str, dict[str, Any]]:
+        """Return the observed data changes and update intervals of the modules.
+
+        See :attr:`Module.update_stats <kasa.Module.update_stats>`.
+        """
+        return {str(name): module.update_stats for name, module in self.modules.items()}
+
     def _add_feature(self, feature: Feature) -> None:
         """Add a new feature to the device."""
         if feature.id in self._features:
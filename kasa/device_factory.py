@@ -4,11 +4,17 @@ from __future__ import annotations
 
 import logging
 import time
+from dataclasses import replace
 from typing import Any
 
 from .device import Device
 from .device_type import DeviceType
-from .deviceconfig import DeviceConfig, DeviceEncryptionType, DeviceFamily
+from .deviceconfig import (
+    DeviceConfig,
+    DeviceConnectionParameters,
+    DeviceEncryptionType,
+    DeviceFamily,
+)
 from .exceptions import KasaException, UnsupportedDeviceError
 from .iot import (
     IotBulb,
@@ -69,6 +75,43 @@ async def connect(*, host: str | None = None, config: DeviceConfig) -> Device:
     if host:
         config = DeviceConfig(host=host)
 
+    if (cache := config.connection_cache) is None:
+        return await _connect_with_config(config)
+
+    if (cached := cache.find(host=config.host)) is not None:
+        try:
+            connection_type = DeviceConnectionParameters.from_dict(
+                cached["config"]["connection_type"]
+            )
+        except Exception as ex:
+            _LOGGER.debug("Invalid cached connection for %s: %s", config.host, ex)
+            connection_type = None
+        if connection_type is not None and connection_type != config.connection_type:
+            try:
+                device = await _connect_with_config(
+                    replace(config, connection_type=connection_type)
+                )
+            except Exception as ex:
+                _LOGGER.debug(
+                    "Unable to connect to %s with the cached connection: %s",
+                    config.host,
+                    ex,
+                )
+            else:
+                cache.set_device(device)
+                return device
+
+    try:
+        device = await _connect_with_config(config)
+    except Exception:
+        if cached is not None:
+            cache.delete(cached["mac"])
+        raise
+    cache.set_device(device)
+    return device
+
+
+async def _connect_with_config(config: DeviceConfig) -> Device:
     if (protocol := get_protocol(config=config)) is None:
         raise UnsupportedDeviceError(
             f"Unsupported device for {config.host}: "
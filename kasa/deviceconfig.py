@@ -39,9 +39,12 @@ from aiohttp import ClientSession
 from mashumaro import field_options, pass_through
 from mashumaro.config import BaseConfig
 
+from .capabilitycache import CapabilityCache
+from .connectioncache import ConnectionCache
 from .credentials import Credentials
 from .exceptions import KasaException
 from .json import DataClassJSONMixin
+from .sessionstore import SessionStore
 
 if TYPE_CHECKING:
     from aiohttp import ClientSession
@@ -170,6 +173,52 @@ class DeviceConfig(_DeviceConfigBaseMixin):
 
     aes_keys: KeyPairDict | None = None
 
+    #: The learned maximum size in bytes of a multiple request batch for
+    #: protocols supporting multiple request batches.
+    batch_max_size: int | None = None
+
+    #: The learned batch size for protocols supporting multiple request
+    #: batches, if lower than the configured batch size.
+    learned_batch_size: int | None = None
+
+    #: Renew sessions in the background shortly before they expire instead of
+    #: on the first request after they expire.
+    session_renewal: bool = field(
+        default=False,
+        metadata=field_options(serialize="omit"),
+    )
+
+    #: Fail queries fast with :class:`~kasa.exceptions.DeviceUnavailableError`
+    #: after consecutive connection failures until the device is probed again.
+    circuit_breaker: bool = field(
+        default=False,
+        metadata=field_options(serialize="omit"),
+    )
+
+    #: Set a store for transports to save their sessions to and restore them
+    #: from instead of performing a new handshake.
+    session_store: SessionStore | None = field(
+        default=None,
+        compare=False,
+        metadata=field_options(serialize="omit", deserialize=pass_through),
+    )
+
+    #: Set a cache for connecting with the connection parameters last used for
+    #: the host and saving the parameters of connected devices.
+    connection_cache: ConnectionCache | None = field(
+        default=None,
+        compare=False,
+        metadata=field_options(serialize="omit", deserialize=pass_through),
+    )
+
+    #: Set a cache for sharing the capabilities of devices of the same model
+    #: to shorten the first update.
+    capability_cache: CapabilityCache | None = field(
+        default=None,
+        compare=False,
+        metadata=field_options(serialize="omit", deserialize=pass_through),
+    )
+
     def __post_init__(self) -> None:
         if self.connection_type is None:
             self.connection_type = DeviceConnectionParameters(
@@ -72,6 +72,21 @@ Discovered Bedroom Lightstrip (model: KL430)
 Discovered Living Room Dimmer Switch (model: HS220)
 Discovered Tapo Hub (model: H200)
 
+Devices can also be iterated as soon as they are discovered, optionally
+finishing the discovery once the expected devices have been found:
+
+>>> async for dev in Discover.discover_iter(hosts=["127.0.0.3"], credentials=creds):
+>>>     print(f"Discovered {dev.host} (model: {dev.model})")
+Discovered 127.0.0.1 (model: KP303)
+Discovered 127.0.0.2 (model: HS110)
+Discovered 127.0.0.3 (model: L530E)
+
+The key pair sent with the discovery queries is created on the first discovery.
+Services can prepare it at startup instead, optionally passing a key file to
+load it from so restarts skip creating it:
+
+>>> await Discover.prepare_key_pair()
+
 Discovering a single device returns a kasa.Device object.
 
 >>> device = await Discover.discover_single("127.0.0.1", credentials=creds)
@@ -87,13 +102,17 @@ import base64
 import binascii
 import ipaddress
 import logging
+import os
 import secrets
 import socket
 import struct
+import time
 from asyncio import timeout as asyncio_timeout
 from asyncio.transports import DatagramTransport
-from collections.abc import Callable, Coroutine
+from collections.abc import AsyncIterator, Callable, Coroutine, Iterable
+from contextlib import suppress
 from dataclasses import dataclass
+from pathlib import Path
 from pprint import pformat as pf
 from typing import (
     TYPE_CHECKING,
@@ -109,6 +128,7 @@ from mashumaro.config import BaseConfig
 from mashumaro.types import Alias
 
 from kasa import Device
+from kasa.connectioncache import ConnectionCache, _normalize_mac
 from kasa.credentials import Credentials
 from kasa.device_factory import (
     get_device_class_from_family,
@@ -121,6 +141,7 @@ from kasa.deviceconfig import (
     DeviceEncryptionType,
 )
 from kasa.exceptions import (
+    AuthenticationError,
     KasaException,
     TimeoutError,
     UnsupportedDeviceError,
@@ -129,6 +150,7 @@ from kasa.iot.iotdevice import IotDevice, _extract_sys_info
 from kasa.json import DataClassJSONMixin
 from kasa.json import dumps as json_dumps
 from kasa.json import loads as json_loads
+from kasa.jsonfile import write_private_file
 from kasa.protocols.iotprotocol import REDACTORS as IOT_REDACTORS
 from kasa.protocols.protocol import mask_mac, redact_data
 from kasa.transports.aestransport import AesEncyptionSession, KeyPair
@@ -141,6 +163,19 @@ if TYPE_CHECKING:
     from kasa.transports import BaseTransport
 
 
+class UpdatedDevice(NamedTuple):
+    """Device updated after discovery by :func:`Discover.discover_and_update`."""
+
+    #: The discovered device
+    device: Device
+    #: Seconds from discovering the device until it was updated or gave up
+    time_to_ready: float
+    #: Number of update attempts
+    attempts: int
+    #: Error of the last attempt if the device could not be updated
+    error: Exception | None = None
+
+
 class ConnectAttempt(NamedTuple):
     """Try to connect attempt."""
 
@@ -191,12 +226,66 @@ NEW_DISCOVERY_REDACTORS: dict[str, Callable[[Any], Any] | None] = {
 
 
 class _AesDiscoveryQuery:
+    KEY_SIZE = 2048
+
     keypair: KeyPair | None = None
+    query: bytearray | None = None
+    key_file: Path | None = None
+
+    @classmethod
+    async def get_query(cls) -> bytearray:
+        """Return the cached query, creating the key pair in an executor."""
+        if cls.query is None:
+            if cls.keypair is None:
+                loop = asyncio.get_running_loop()
+                keypair = await loop.run_in_executor(
+                    None, cls._load_or_create_key_pair, cls.key_file
+                )
+                # Keep the key pair of a concurrent discovery finishing first
+                if cls.keypair is None:
+                    cls.keypair = keypair
+            if cls.query is None:
+                cls.query = cls.generate_query()
+        return cls.query
+
+    @classmethod
+    def set_key_file(cls, key_file: Path | None) -> None:
+        """Set the key file, dropping the key pair loaded from another file."""
+        if key_file != cls.key_file:
+            cls.key_file = key_file
+            cls.keypair = None
+            cls.query = None
+
+    @classmethod
+    def _load_or_create_key_pair(cls, key_file: Path | None) -> KeyPair:
+        if key_file is not None and key_file.exists():
+            try:
+                keypair = KeyPair.create_from_private_pem(key_file.read_bytes())
+            except (OSError, ValueError, TypeError) as ex:
+                _LOGGER.warning(
+                    "Unable to load discovery key from %s: %s", key_file, ex
+                )
+            else:
+                if keypair.private_key.key_size == cls.KEY_SIZE:
+                    return keypair
+                _LOGGER.warning(
+                    "Ignoring discovery key of %s bits from %s",
+                    keypair.private_key.key_size,
+                    key_file,
+                )
+
+        keypair = KeyPair.create_key_pair(key_size=cls.KEY_SIZE)
+        if key_file is not None:
+            try:
+                write_private_file(key_file, keypair.get_private_pem())
+            except OSError as ex:
+                _LOGGER.warning("Unable to save discovery key to %s: %s", key_file, ex)
+        return keypair
 
     @classmethod
     def generate_query(cls) -> bytearray:
         if not cls.keypair:
-            cls.keypair = KeyPair.create_key_pair(key_size=2048)
+            cls.keypair = cls._load_or_create_key_pair(cls.key_file)
         secret = secrets.token_bytes(4)
 
         key_payload = {"params": {"rsa_key": cls.keypair.get_public_pem().decode()}}
@@ -230,6 +319,14 @@ class _AesDiscoveryQuery:
         return query
 
 
+def _with_derived_stats(stats: dict[str, Any]) -> dict[str, Any]:
+    """Add the average latency and the throughput to the pipeline metrics."""
+    processed = stats["processed"]
+    stats["latency_average"] = stats["latency_total"] / processed if processed else 0.0
+    stats["throughput"] = processed / stats["duration"] if stats["duration"] else 0.0
+    return stats
+
+
 class _DiscoverProtocol(asyncio.DatagramProtocol):
     """Implementation of the discovery protocol handler.
 
@@ -237,6 +334,8 @@ class _DiscoverProtocol(asyncio.DatagramProtocol):
     """
 
     DISCOVERY_START_TIMEOUT = 1
+    #: Number of responses deserialized and decrypted concurrently in the executor
+    DISCOVERY_WORKERS = 4
 
     discovered_devices: DeviceDict
 
@@ -253,11 +352,13 @@ class _DiscoverProtocol(asyncio.DatagramProtocol):
         port: int | None = None,
         credentials: Credentials | None = None,
         timeout: int | None = None,
+        device_queue: asyncio.Queue[Device | None] | None = None,
     ) -> None:
         self.transport: DatagramTransport | None = None
         self.discovery_packets = discovery_packets
         self.interface = interface
         self.on_discovered = on_discovered
+        self.device_queue = device_queue
 
         self.port = port
         self.discovery_port = port or Discover.DISCOVERY_PORT
@@ -278,6 +379,36 @@ class _DiscoverProtocol(asyncio.DatagramProtocol):
         self.callback_tasks: list[asyncio.Task] = []
         self.target_discovered: bool = False
         self._started_event = asyncio.Event()
+        self._responses: asyncio.Queue[tuple[str, float, asyncio.Task[Device]]] = (
+            asyncio.Queue()
+        )
+        self._response_task: asyncio.Task | None = None
+        self._decode_semaphore = asyncio.Semaphore(self.DISCOVERY_WORKERS)
+        self._first_received: float | None = None
+        self._last_processed: float | None = None
+        self._stats: dict[str, Any] = {
+            "received": 0,
+            "processed": 0,
+            "queue_max": 0,
+            "latency_max": 0.0,
+            "latency_total": 0.0,
+        }
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the metrics of the response pipeline.
+
+        The latency is the seconds from receiving a response until the device
+        was created, and the throughput the responses processed per second.
+        """
+        stats = dict(self._stats)
+        stats["pending"] = self._responses.qsize()
+        stats["duration"] = (
+            self._last_processed - self._first_received
+            if self._first_received is not None and self._last_processed is not None
+            else 0.0
+        )
+        return _with_derived_stats(stats)
 
     def _run_callback_task(self, coro: Coroutine) -> None:
         task: asyncio.Task = asyncio.create_task(coro)
@@ -297,9 +428,14 @@ class _DiscoverProtocol(asyncio.DatagramProtocol):
             # if target_discovered then cancel was called internally
             if not self.target_discovered:
                 raise
+        await self.wait_for_responses()
         # Wait for any pending callbacks to complete
         await asyncio.gather(*self.callback_tasks)
 
+    async def wait_for_responses(self) -> None:
+        """Wait for the received responses to be processed."""
+        await self._responses.join()
+
     def connection_made(self, transport: DatagramTransport) -> None:  # type: ignore[override]
         """Set socket options for broadcasting."""
         self.transport = cast(DatagramTransport, transport)
@@ -327,7 +463,7 @@ class _DiscoverProtocol(asyncio.DatagramProtocol):
         encrypted_req = XorEncryption.encrypt(req)
         sleep_between_packets = self.discovery_timeout / self.discovery_packets
 
-        aes_discovery_query = _AesDiscoveryQuery.generate_query()
+        aes_discovery_query = await _AesDiscoveryQuery.get_query()
         for _ in range(self.discovery_packets):
             if self.target in self.seen_hosts:  # Stop sending for discover_single
                 break
@@ -340,60 +476,96 @@ class _DiscoverProtocol(asyncio.DatagramProtocol):
         data: bytes,
         addr: tuple[str, int],
     ) -> None:
-        """Handle discovery responses."""
-        if TYPE_CHECKING:
-            assert _AesDiscoveryQuery.keypair
-
+        """Queue discovery responses to be processed outside of the callback."""
         ip, port = addr
         # Prevent multiple entries due multiple broadcasts
         if ip in self.seen_hosts:
             return
         self.seen_hosts.add(ip)
 
-        device: Device | None = None
+        if port not in {self.discovery_port, Discover.DISCOVERY_PORT_2}:
+            return
+
+        received = time.monotonic()
+        if self._first_received is None:
+            self._first_received = received
+        self._stats["received"] += 1
+        decode_task = asyncio.create_task(self._decode_response(data, ip, port))
+        self._responses.put_nowait((ip, received, decode_task))
+        self._stats["queue_max"] = max(
+            self._stats["queue_max"], self._responses.qsize()
+        )
+        if self._response_task is None:
+            self._response_task = asyncio.create_task(self._process_responses())
+
+        self._handle_discovered_event()
 
+    async def _decode_response(self, data: bytes, ip: str, port: int) -> Device:
+        """Create the device from a discovery response."""
         config = DeviceConfig(host=ip, port_override=self.port)
         if self.credentials:
             config.credentials = self.credentials
         if self.timeout:
             config.timeout = self.timeout
-        try:
-            if port == self.discovery_port:
-                json_func = Discover._get_discovery_json_legacy
-                device_func = Discover._get_device_instance_legacy
-            elif port == Discover.DISCOVERY_PORT_2:
-                json_func = Discover._get_discovery_json
-                device_func = Discover._get_device_instance
-            else:
-                return
-            info = json_func(data, ip)
-            if self.on_discovered_raw is not None:
-                self.on_discovered_raw(
-                    {
-                        "discovery_response": info,
-                        "meta": {"ip": ip, "port": port},
-                    }
-                )
-            device = device_func(info, config)
-        except UnsupportedDeviceError as udex:
-            _LOGGER.debug("Unsupported device found at %s << %s", ip, udex)
-            self.unsupported_device_exceptions[ip] = udex
-            if self.on_unsupported is not None:
-                self._run_callback_task(self.on_unsupported(udex))
-            self._handle_discovered_event()
-            return
-        except KasaException as ex:
-            _LOGGER.debug("[DISCOVERY] Unable to find device type for %s: %s", ip, ex)
-            self.invalid_device_exceptions[ip] = ex
-            self._handle_discovered_event()
-            return
 
-        self.discovered_devices[ip] = device
+        if port == self.discovery_port:
+            info = Discover._get_discovery_json_legacy(data, ip)
+        else:
+            info = Discover._get_discovery_json(data, ip)
+        if self.on_discovered_raw is not None:
+            self.on_discovered_raw(
+                {
+                    "discovery_response": info,
+                    "meta": {"ip": ip, "port": port},
+                }
+            )
+        if port == self.discovery_port:
+            return Discover._get_device_instance_legacy(info, config)
+
+        # Deserializing and decrypting the response is offloaded to the executor
+        # as the rsa decryption of the key would block the event loop.
+        async with self._decode_semaphore:
+            loop = asyncio.get_running_loop()
+            discovery_result = await loop.run_in_executor(
+                None, Discover._get_discovery_result, info, ip
+            )
+        return Discover._get_device_instance(info, config, discovery_result)
 
-        if self.on_discovered is not None:
-            self._run_callback_task(self.on_discovered(device))
+    async def _process_responses(self) -> None:
+        """Process the decoded responses in the order they were received."""
+        try:
+            while not self._responses.empty():
+                ip, received, decode_task = self._responses.get_nowait()
+                try:
+                    device = await decode_task
+                except UnsupportedDeviceError as udex:
+                    _LOGGER.debug("Unsupported device found at %s << %s", ip, udex)
+                    self.unsupported_device_exceptions[ip] = udex
+                    if self.on_unsupported is not None:
+                        self._run_callback_task(self.on_unsupported(udex))
+                except KasaException as ex:
+                    _LOGGER.debug(
+                        "[DISCOVERY] Unable to find device type for %s: %s", ip, ex
+                    )
+                    self.invalid_device_exceptions[ip] = ex
+                else:
+                    self.discovered_devices[ip] = device
+                    if self.device_queue is not None:
+                        self.device_queue.put_nowait(device)
+                    if self.on_discovered is not None:
+                        self._run_callback_task(self.on_discovered(device))
+                finally:
+                    self._record_processed(received)
+                    self._responses.task_done()
+        finally:
+            self._response_task = None
 
-        self._handle_discovered_event()
+    def _record_processed(self, received: float) -> None:
+        self._last_processed = time.monotonic()
+        latency = self._last_processed - received
+        self._stats["processed"] += 1
+        self._stats["latency_total"] += latency
+        self._stats["latency_max"] = max(self._stats["latency_max"], latency)
 
     def _handle_discovered_event(self) -> None:
         """If target is in seen_hosts cancel discover_task."""
@@ -410,6 +582,71 @@ class _DiscoverProtocol(asyncio.DatagramProtocol):
         """Cancel the discover task if running."""
         if self.discover_task:
             self.discover_task.cancel()
+        if self._response_task:
+            self._response_task.cancel()
+        while not self._responses.empty():
+            self._responses.get_nowait()[2].cancel()
+            self._responses.task_done()
+
+
+class _SweepDiscoverProtocol(_DiscoverProtocol):
+    """Discovery protocol handler sending unicast queries to a list of hosts.
+
+    This is internal class, use :func:`Discover.sweep`: instead.
+    """
+
+    #: Sleep only once sending is this many seconds ahead of the packet rate
+    MINIMUM_PACING_SLEEP = 0.01
+
+    def __init__(
+        self,
+        *,
+        hosts: list[str],
+        packet_rate: int,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.hosts = hosts
+        self.packet_rate = packet_rate
+
+    async def do_discover(self) -> None:
+        """Send the discovery datagrams to the hosts at the packet rate.
+
+        Each round resends the datagrams to the hosts which have not responded
+        yet, and lasts at least the discovery timeout divided by the number of
+        discovery packets.
+        """
+        if TYPE_CHECKING:
+            assert self.transport
+        req = json_dumps(Discover.DISCOVERY_QUERY)
+        encrypted_req = XorEncryption.encrypt(req)[4:]
+        aes_discovery_query = await _AesDiscoveryQuery.get_query()
+        round_time = self.discovery_timeout / self.discovery_packets
+        _LOGGER.debug(
+            "[DISCOVERY] Sweeping %s hosts at %s packets per second",
+            len(self.hosts),
+            self.packet_rate,
+        )
+
+        for _ in range(self.discovery_packets):
+            round_start = time.monotonic()
+            sent = 0
+            for host in self.hosts:
+                if host in self.seen_hosts:
+                    continue
+                self.transport.sendto(encrypted_req, (host, self.discovery_port))
+                self.transport.sendto(
+                    aes_discovery_query, (host, Discover.DISCOVERY_PORT_2)
+                )
+                sent += 2
+                ahead = round_start + sent / self.packet_rate - time.monotonic()
+                if ahead >= self.MINIMUM_PACING_SLEEP:
+                    await asyncio.sleep(ahead)
+            await asyncio.sleep(max(round_start + round_time - time.monotonic(), 0))
+
+    def error_received(self, ex: Exception) -> None:
+        """Handle errors of unicast datagrams such as unreachable hosts."""
+        _LOGGER.debug("Got error: %s", ex)
 
 
 class Discover:
@@ -424,7 +661,55 @@ class Discover:
     DISCOVERY_PORT_2 = 20002
     DISCOVERY_QUERY_2 = binascii.unhexlify("020000010000000000000000463cb5d3")
 
+    #: Default seconds to wait for the tcp ports probed by :func:`try_connect_all`
+    TRY_CONNECT_PROBE_TIMEOUT = 2
+    #: Number of connection attempts made concurrently by :func:`try_connect_all`
+    TRY_CONNECT_CONCURRENCY = 4
+
     _redact_data = True
+    _stats: dict[str, Any] = {
+        "received": 0,
+        "processed": 0,
+        "queue_max": 0,
+        "latency_max": 0.0,
+        "latency_total": 0.0,
+        "duration": 0.0,
+    }
+
+    @staticmethod
+    def get_stats() -> dict[str, Any]:
+        """Return the metrics of the response pipeline of all discoveries.
+
+        The latency is the seconds from receiving a response until the device
+        was created, and the throughput the responses processed per second
+        while discoveries were processing responses.
+        """
+        return _with_derived_stats(dict(Discover._stats))
+
+    @staticmethod
+    def _add_stats(stats: dict[str, Any]) -> None:
+        """Add the metrics of a discovery to the metrics of all discoveries."""
+        for key in ("received", "processed", "latency_total", "duration"):
+            Discover._stats[key] += stats[key]
+        for key in ("queue_max", "latency_max"):
+            Discover._stats[key] = max(Discover._stats[key], stats[key])
+
+    @staticmethod
+    async def prepare_key_pair(key_file: str | os.PathLike | None = None) -> None:
+        """Prepare the key pair used for discovery ahead of the first discovery.
+
+        The 2048 bit key pair sent with the discovery queries is otherwise
+        created on the first discovery. It is created in an executor to not
+        block the event loop.
+
+        :param key_file: Optional file to load the private key from, the key is
+            created and saved to the file if it does not exist yet. The file
+            should be protected in the same way as the credentials.
+        """
+        _AesDiscoveryQuery.set_key_file(
+            Path(key_file) if key_file is not None else None
+        )
+        await _AesDiscoveryQuery.get_query()
 
     @staticmethod
     async def discover(
@@ -505,11 +790,322 @@ class Discover:
             raise ex
         finally:
             transport.close()
+            Discover._add_stats(protocol.stats)
 
         _LOGGER.debug("Discovered %s devices", len(protocol.discovered_devices))
 
         return protocol.discovered_devices
 
+    @staticmethod
+    async def discover_iter(
+        *,
+        target: str = "255.255.255.255",
+        hosts: Iterable[str] | None = None,
+        macs: Iterable[str] | None = None,
+        on_discovered_raw: OnDiscoveredRawCallable | None = None,
+        discovery_timeout: int = 5,
+        discovery_packets: int = 3,
+        interface: str | None = None,
+        on_unsupported: OnUnsupportedCallable | None = None,
+        credentials: Credentials | None = None,
+        username: str | None = None,
+        password: str | None = None,
+        port: int | None = None,
+        timeout: int | None = None,
+    ) -> AsyncIterator[Device]:
+        """Discover supported devices, yielding each device once discovered.
+
+        Unlike :func:`discover()` the devices are available as soon as their
+        responses have been received instead of after the discovery timeout.
+        If *hosts* or *macs* are given, the discovery finishes as soon as all
+        of the expected devices have been discovered.
+
+        Breaking out of the iteration does not stop the discovery until the
+        iterator is closed, use :func:`contextlib.aclosing` to stop it
+        immediately.
+
+        :param target: The target address where to send the broadcast discovery
+         queries if multi-homing (e.g. 192.168.xxx.255).
+        :param hosts: IP addresses of the expected devices
+        :param macs: Mac addresses of the expected devices
+        :param on_discovered_raw: Optional callback once discovered json is loaded
+            before any attempt to deserialize it and create devices
+        :param discovery_timeout: Seconds to wait for responses, defaults to 5
+        :param discovery_packets: Number of discovery packets to broadcast
+        :param interface: Bind to specific interface
+        :param on_unsupported: Optional callback when unsupported devices are discovered
+        :param credentials: Credentials for devices that require authentication.
+            username and password are ignored if provided.
+        :param username: Username for devices that require authentication
+        :param password: Password for devices that require authentication
+        :param port: Override the discovery port for devices listening on 9999
+        :param timeout: Query timeout in seconds for devices returned by discovery
+        :return: async iterator of the discovered devices
+        """
+        if not credentials and username and password:
+            credentials = Credentials(username, password)
+        expected_hosts = set(hosts) if hosts is not None else set()
+        expected_macs = {_normalize_mac(mac) for mac in macs} if macs else set()
+        expecting = bool(expected_hosts or expected_macs)
+
+        device_queue: asyncio.Queue[Device | None] = asyncio.Queue()
+        loop = asyncio.get_event_loop()
+        transport, protocol = await loop.create_datagram_endpoint(
+            lambda: _DiscoverProtocol(
+                target=target,
+                discovery_packets=discovery_packets,
+                interface=interface,
+                on_unsupported=on_unsupported,
+                on_discovered_raw=on_discovered_raw,
+                credentials=credentials,
+                timeout=timeout,
+                discovery_timeout=discovery_timeout,
+                port=port,
+                device_queue=device_queue,
+            ),
+            local_addr=("0.0.0.0", 0),  # noqa: S104
+        )
+        protocol = cast(_DiscoverProtocol, protocol)
+
+        _LOGGER.debug("Waiting up to %s seconds for responses...", discovery_timeout)
+        discovery_task = asyncio.create_task(protocol.wait_for_discovery_to_complete())
+        discovery_task.add_done_callback(lambda _: device_queue.put_nowait(None))
+        try:
+            while (device := await device_queue.get()) is not None:
+                yield device
+                if expecting:
+                    expected_hosts.discard(device.host)
+                    with suppress(KasaException):
+                        expected_macs.discard(_normalize_mac(device.mac))
+                    if not expected_hosts and not expected_macs:
+                        _LOGGER.debug("Discovered all expected devices")
+                        return
+            # Raise any error of the discovery
+            discovery_task.result()
+        finally:
+            if not discovery_task.done():
+                discovery_task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await discovery_task
+            transport.close()
+            Discover._add_stats(protocol.stats)
+
+    @staticmethod
+    async def discover_and_update(
+        *,
+        max_concurrency: int = 10,
+        update_attempts: int = 3,
+        retry_delay: float = 5,
+        target: str = "255.255.255.255",
+        hosts: Iterable[str] | None = None,
+        macs: Iterable[str] | None = None,
+        discovery_timeout: int = 5,
+        discovery_packets: int = 3,
+        interface: str | None = None,
+        on_unsupported: OnUnsupportedCallable | None = None,
+        credentials: Credentials | None = None,
+        username: str | None = None,
+        password: str | None = None,
+        port: int | None = None,
+        timeout: int | None = None,
+    ) -> AsyncIterator[UpdatedDevice]:
+        """Discover supported devices and update them as they are discovered.
+
+        Unlike updating the devices in an `on_discovered` callback of
+        :func:`discover()`, at most *max_concurrency* devices are updated at
+        the same time and the other devices are queued. Devices failing to
+        update are retried after *retry_delay* seconds without holding up
+        the other devices.
+
+        Each device is yielded once updated, or with the error once all the
+        update attempts failed. Breaking out of the iteration does not stop
+        the discovery until the iterator is closed, use
+        :func:`contextlib.aclosing` to stop it immediately.
+
+        See :func:`discover_iter()` for the discovery parameters.
+
+        :param max_concurrency: Maximum number of devices updated concurrently
+        :param update_attempts: Number of attempts to update each device,
+            at least 1
+        :param retry_delay: Seconds to wait before retrying a failed update
+        :return: async iterator of the updated devices
+        """
+        if update_attempts < 1:
+            raise ValueError(
+                f"update_attempts must be at least 1, got {update_attempts}"
+            )
+        results: asyncio.Queue[UpdatedDevice | None] = asyncio.Queue()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        update_tasks: dict[str, asyncio.Task] = {}
+
+        async def _update(device: Device, discovered: float) -> None:
+            error: Exception | None = None
+            try:
+                for attempt in range(1, update_attempts + 1):
+                    if attempt > 1:
+                        _LOGGER.debug(
+                            "Error updating %s, retrying in %s seconds: %s",
+                            device.host,
+                            retry_delay,
+                            error,
+                        )
+                        await asyncio.sleep(retry_delay)
+                    async with semaphore:
+                        try:
+                            await device.update()
+                        except AuthenticationError as ex:
+                            # Retrying with the same credentials will not succeed
+                            error = ex
+                            break
+                        except Exception as ex:
+                            error = ex
+                        else:
+                            error = None
+                            break
+            except asyncio.CancelledError:
+                await device.protocol.close()
+                raise
+            if error is not None:
+                await device.protocol.close()
+            results.put_nowait(
+                UpdatedDevice(device, time.monotonic() - discovered, attempt, error)
+            )
+
+        async def _discover() -> None:
+            try:
+                async for device in Discover.discover_iter(
+                    target=target,
+                    hosts=hosts,
+                    macs=macs,
+                    discovery_timeout=discovery_timeout,
+                    discovery_packets=discovery_packets,
+                    interface=interface,
+                    on_unsupported=on_unsupported,
+                    credentials=credentials,
+                    username=username,
+                    password=password,
+                    port=port,
+                    timeout=timeout,
+                ):
+                    update_tasks[device.host] = asyncio.create_task(
+                        _update(device, time.monotonic())
+                    )
+            finally:
+                results.put_nowait(None)
+
+        discover_task = asyncio.create_task(_discover())
+        discovering = True
+        try:
+            while discovering or update_tasks:
+                if (result := await results.get()) is None:
+                    discovering = False
+                    # Raise any error of the discovery
+                    await discover_task
+                    continue
+                await update_tasks.pop(result.device.host)
+                yield result
+        finally:
+            discover_task.cancel()
+            for task in update_tasks.values():
+                task.cancel()
+            await asyncio.gather(
+                discover_task, *update_tasks.values(), return_exceptions=True
+            )
+
+    @staticmethod
+    async def sweep(
+        networks: Iterable[str],
+        *,
+        packet_rate: int = 2000,
+        on_discovered: OnDiscoveredCallable | None = None,
+        on_discovered_raw: OnDiscoveredRawCallable | None = None,
+        discovery_timeout: int = 3,
+        discovery_packets: int = 2,
+        interface: str | None = None,
+        on_unsupported: OnUnsupportedCallable | None = None,
+        credentials: Credentials | None = None,
+        username: str | None = None,
+        password: str | None = None,
+        port: int | None = None,
+        timeout: int | None = None,
+    ) -> DeviceDict:
+        """Discover supported devices by querying every host of the networks.
+
+        Unlike :func:`discover()` the discovery queries are sent as unicast
+        datagrams to each host, so devices on routed networks not reached by
+        broadcasts are discovered. The queries are sent from a single socket
+        at *packet_rate* datagrams per second, and resent to the hosts not
+        responding for each of the *discovery_packets*.
+
+        :param networks: Networks in CIDR notation (e.g. 192.168.16.0/20) or
+            ip addresses to query
+        :param packet_rate: Datagrams sent per second, two per host
+        :param on_discovered: coroutine to execute on discovery
+        :param on_discovered_raw: Optional callback once discovered json is loaded
+            before any attempt to deserialize it and create devices
+        :param discovery_timeout: Minimum seconds to wait for responses,
+            extended if sending to all hosts takes longer, defaults to 3
+        :param discovery_packets: Number of discovery packets to send to each host
+        :param interface: Bind to specific interface
+        :param on_unsupported: Optional callback when unsupported devices are discovered
+        :param credentials: Credentials for devices that require authentication.
+            username and password are ignored if provided.
+        :param username: Username for devices that require authentication
+        :param password: Password for devices that require authentication
+        :param port: Override the discovery port for devices listening on 9999
+        :param timeout: Query timeout in seconds for devices returned by discovery
+        :return: dictionary with discovered devices
+        """
+        hosts = list(
+            dict.fromkeys(
+                str(address)
+                for network in networks
+                for address in (
+                    ipaddress.ip_network(network, strict=False).hosts()
+                    if "/" in network
+                    else [ipaddress.ip_address(network)]
+                )
+            )
+        )
+        if not credentials and username and password:
+            credentials = Credentials(username, password)
+        loop = asyncio.get_event_loop()
+        transport, protocol = await loop.create_datagram_endpoint(
+            lambda: _SweepDiscoverProtocol(
+                hosts=hosts,
+                packet_rate=packet_rate,
+                on_discovered=on_discovered,
+                discovery_packets=discovery_packets,
+                interface=interface,
+                on_unsupported=on_unsupported,
+                on_discovered_raw=on_discovered_raw,
+                credentials=credentials,
+                timeout=timeout,
+                discovery_timeout=discovery_timeout,
+                port=port,
+            ),
+            local_addr=("0.0.0.0", 0),  # noqa: S104
+        )
+        protocol = cast(_SweepDiscoverProtocol, protocol)
+
+        try:
+            await protocol.wait_for_discovery_to_complete()
+        except (KasaException, asyncio.CancelledError) as ex:
+            for device in protocol.discovered_devices.values():
+                await device.protocol.close()
+            raise ex
+        finally:
+            transport.close()
+            Discover._add_stats(protocol.stats)
+
+        _LOGGER.debug(
+            "Discovered %s devices of %s hosts",
+            len(protocol.discovered_devices),
+            len(hosts),
+        )
+
+        return protocol.discovered_devices
+
     @staticmethod
     async def discover_single(
         host: str,
@@ -590,6 +1186,7 @@ class Discover:
             await protocol.wait_for_discovery_to_complete()
         finally:
             transport.close()
+            Discover._add_stats(protocol.stats)
 
         if ip in protocol.discovered_devices:
             dev = protocol.discovered_devices[ip]
@@ -615,6 +1212,7 @@ class Discover:
         credentials: Credentials | None = None,
         http_client: ClientSession | None = None,
         on_attempt: OnConnectAttemptCallable | None = None,
+        connection_cache: ConnectionCache | None = None,
     ) -> Device | None:
         """Try to connect directly to a device with all possible parameters.
 
@@ -622,14 +1220,46 @@ class Discover:
         After succesfully connecting use the device config and
         :meth:`Device.connect()` for future connections.
 
+        The tcp ports used by the connection parameters are probed first to
+        skip the parameters using ports which are not open. The remaining
+        parameters are attempted :attr:`TRY_CONNECT_CONCURRENCY` at a time,
+        and the first of them in the order of preference connecting is used.
+
         :param host: Hostname of device to query
         :param port: Optionally set a different port for legacy devices using port 9999
         :param timeout: Timeout in seconds device for devices queries
         :param credentials: Credentials for devices that require authentication.
         :param http_client: Optional client session for devices that use http.
             username and password are ignored if provided.
+        :param on_attempt: Optional callback with the result of each attempt
+        :param connection_cache: Optional cache to try the connection parameters
+            cached for the host first, and to save the working parameters to.
         """
-        from .device_factory import _connect
+        from .device_factory import _connect, connect
+
+        if connection_cache is not None and (
+            cached := connection_cache.find(host=host)
+        ):
+            try:
+                return await connect(
+                    config=DeviceConfig(
+                        host=host,
+                        connection_type=DeviceConnectionParameters.from_dict(
+                            cached["config"]["connection_type"]
+                        ),
+                        timeout=timeout,
+                        port_override=port,
+                        credentials=credentials,
+                        http_client=http_client,
+                        connection_cache=connection_cache,
+                    )
+                )
+            except Exception as ex:
+                _LOGGER.debug(
+                    "Unable to connect to %s with the cached connection: %s",
+                    host,
+                    ex,
+                )
 
         main_device_families = {
             Device.Family.SmartTapoPlug,
@@ -675,9 +1305,26 @@ class Discover:
                 )
             )
         }
-        for key, val in candidates.items():
+        ports = {prot._transport._port for prot, _ in candidates.values()}
+        open_ports = await Discover._get_open_ports(
+            host, ports, timeout or Discover.TRY_CONNECT_PROBE_TIMEOUT
+        )
+        _LOGGER.debug("Open ports of %s: %s", host, open_ports)
+
+        attempts: list[tuple[ConnectAttempt, BaseProtocol, DeviceConfig]] = []
+        for key, (prot, config) in candidates.items():
+            ca = tuple.__new__(ConnectAttempt, key)
+            if prot._transport._port in open_ports:
+                attempts.append((ca, prot, config))
+                continue
+            if on_attempt:
+                on_attempt(ca, False)
+            await prot.close()
+
+        async def _try_connect(
+            ca: ConnectAttempt, prot: BaseProtocol, config: DeviceConfig
+        ) -> Device | None:
             try:
-                prot, config = val
                 _LOGGER.debug("Trying to connect with %s", prot.__class__.__name__)
                 dev = await _connect(config, prot)
             except Exception as ex:
@@ -686,19 +1333,64 @@ class Discover:
                     prot.__class__.__name__,
                     ex,
                 )
+                await prot.close()
                 if on_attempt:
-                    ca = tuple.__new__(ConnectAttempt, key)
                     on_attempt(ca, False)
-            else:
-                if on_attempt:
-                    ca = tuple.__new__(ConnectAttempt, key)
-                    on_attempt(ca, True)
-                _LOGGER.debug("Found working protocol %s", prot.__class__.__name__)
-                return dev
-            finally:
+                return None
+            except asyncio.CancelledError:
                 await prot.close()
+                raise
+            if on_attempt:
+                on_attempt(ca, True)
+            _LOGGER.debug("Found working protocol %s", prot.__class__.__name__)
+            return dev
+
+        concurrency = Discover.TRY_CONNECT_CONCURRENCY
+        for index in range(0, len(attempts), concurrency):
+            tasks = [
+                asyncio.create_task(_try_connect(*attempt))
+                for attempt in attempts[index : index + concurrency]
+            ]
+            dev = None
+            try:
+                # Wait for the earlier attempts to keep the order of preference
+                for task in tasks:
+                    if dev := await task:
+                        break
+            finally:
+                for task in tasks:
+                    task.cancel()
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+                for result in results:
+                    if isinstance(result, Device) and result is not dev:
+                        await result.disconnect()
+            if dev:
+                if connection_cache is not None:
+                    connection_cache.set_device(dev)
+                return dev
         return None
 
+    @staticmethod
+    async def _get_open_ports(
+        host: str, ports: Iterable[int], timeout: float
+    ) -> set[int]:
+        """Return the ports accepting tcp connections."""
+
+        async def _probe(port: int) -> int | None:
+            try:
+                async with asyncio_timeout(timeout):
+                    _, writer = await asyncio.open_connection(host, port)
+            except (OSError, TimeoutError) as ex:
+                _LOGGER.debug("Port %s of %s is not open: %s", port, host, ex)
+                return None
+            writer.close()
+            with suppress(OSError):
+                await writer.wait_closed()
+            return port
+
+        results = await asyncio.gather(*(_probe(port) for port in ports))
+        return {port for port in results if port is not None}
+
     @staticmethod
     def _get_device_class(info: dict) -> type[Device]:
         """Find SmartDevice subclass for device described by passed data."""
@@ -842,17 +1534,12 @@ class Discover:
         )
 
     @staticmethod
-    def _get_device_instance(
-        info: dict,
-        config: DeviceConfig,
-    ) -> Device:
-        """Get SmartDevice from the new 20002 response."""
-        debug_enabled = _LOGGER.isEnabledFor(logging.DEBUG)
-
+    def _get_discovery_result(info: dict, host: str) -> DiscoveryResult:
+        """Get the decrypted discovery result from the new 20002 response."""
         try:
             discovery_result = DiscoveryResult.from_dict(info["result"])
         except Exception as ex:
-            if debug_enabled:
+            if _LOGGER.isEnabledFor(logging.DEBUG):
                 data = (
                     redact_data(info, NEW_DISCOVERY_REDACTORS)
                     if Discover._redact_data
@@ -860,12 +1547,12 @@ class Discover:
                 )
                 _LOGGER.debug(
                     "Unable to parse discovery from device %s: %s",
-                    config.host,
+                    host,
                     pf(data),
                 )
             raise UnsupportedDeviceError(
-                f"Unable to parse discovery from device: {config.host}: {ex}",
-                host=config.host,
+                f"Unable to parse discovery from device: {host}: {ex}",
+                host=host,
             ) from ex
 
         # Decrypt the data
@@ -877,9 +1564,22 @@ class Discover:
             except Exception:
                 _LOGGER.exception(
                     "Unable to decrypt discovery data %s: %s",
-                    config.host,
+                    host,
                     redact_data(info, NEW_DISCOVERY_REDACTORS),
                 )
+        return discovery_result
+
+    @staticmethod
+    def _get_device_instance(
+        info: dict,
+        config: DeviceConfig,
+        discovery_result: DiscoveryResult | None = None,
+    ) -> Device:
+        """Get SmartDevice from the new 20002 response."""
+        debug_enabled = _LOGGER.isEnabledFor(logging.DEBUG)
+
+        if discovery_result is None:
+            discovery_result = Discover._get_discovery_result(info, config.host)
         type_ = discovery_result.device_type
         try:
             conn_params = Discover._get_connection_parameters(discovery_result)
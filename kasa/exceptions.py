@@ -22,10 +22,26 @@ class TimeoutError(KasaException, _asyncioTimeoutError):
         return KasaException.__str__(self)
 
 
+class _DeadlineExceededError(TimeoutError):
+    """Timeout exception for attempts cut short by the query deadline."""
+
+
 class _ConnectionError(KasaException):
     """Connection exception for device errors."""
 
 
+class DeviceUnavailableError(KasaException):
+    """Exception for queries not sent to a device that is failing to connect.
+
+    Raised without contacting the device until *retry_after* seconds have
+    passed since the last connection failure.
+    """
+
+    def __init__(self, *args: Any, retry_after: float = 0.0) -> None:
+        self.retry_after = retry_after
+        super().__init__(*args)
+
+
 class UnsupportedDeviceError(KasaException):
     """Exception for trying to connect to unsupported devices."""
 
@@ -11,6 +11,7 @@ from typing import Any
 import aiohttp
 from yarl import URL
 
+from .deadline import get_timeout, get_timeout_error
 from .deviceconfig import DeviceConfig
 from .exceptions import (
     KasaException,
@@ -70,7 +71,10 @@ class HttpClient:
         """Send an http post request to the device.
 
         If the request is provided via the json parameter json will be returned.
+        The request timeout is shrunk to the time remaining before the query
+        deadline, if any.
         """
+        timeout = get_timeout(self._config.timeout)
         # Once we know a device needs a wait between sequential queries always wait
         # first rather than keep erroring then waiting.
         if self._wait_between_requests:
@@ -90,9 +94,9 @@ class HttpClient:
         self._last_url = url
         self.client.cookie_jar.clear()
         return_json = bool(json)
-        if self._config.timeout is None:
+        if timeout is None:
             _LOGGER.warning("Request timeout is set to None.")
-        client_timeout = aiohttp.ClientTimeout(total=self._config.timeout)
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
 
         # If json is not a dict send as data.
         # This allows the json parameter to be used to pass other
@@ -145,7 +149,7 @@ class HttpClient:
                 f"Device connection error: {self._config.host}: {ex}", ex
             ) from ex
         except (aiohttp.ServerTimeoutError, TimeoutError) as ex:
-            raise TimeoutError(
+            raise get_timeout_error(timeout, self._config.timeout)(
                 "Unable to query the device, "
                 + f"timed out: {self._config.host}: {ex}",
                 ex,
@@ -17,6 +17,7 @@ from __future__ import annotations
 import functools
 import inspect
 import logging
+import time
 from collections.abc import Callable, Mapping, Sequence
 from datetime import datetime, timedelta, tzinfo
 from typing import TYPE_CHECKING, Any, cast
@@ -27,6 +28,7 @@ from ..device_type import DeviceType
 from ..deviceconfig import DeviceConfig
 from ..exceptions import KasaException
 from ..feature import Feature
+from ..json import dumps as json_dumps
 from ..module import Module
 from ..modulemapping import ModuleMapping, ModuleName
 from ..protocols import BaseProtocol
@@ -35,6 +37,9 @@ from .modules import Emeter
 
 _LOGGER = logging.getLogger(__name__)
 
+#: Largest measured module response sizes in bytes keyed by device model
+_MODEL_RESPONSE_SIZES: dict[str, dict[str, int]] = {}
+
 
 def requires_update(f: Callable) -> Any:
     """Indicate that `update` should be called before accessing this method."""  # noqa: D202
@@ -394,33 +399,77 @@ class IotDevice(Device):
 
     async def _modular_update(self, req: dict) -> None:
         """Execute an update query."""
+        update_time = time.monotonic()
+        request_list, module_queries = self._get_update_requests(req, update_time)
+        responses = [await self.protocol.query(request) for request in request_list]
+        self._handle_update_responses(responses, update_time, module_queries)
+
+    @property
+    def response_sizes(self) -> dict[str, int]:
+        """Return the measured module response sizes in bytes.
+
+        The sizes are the largest seen for the device model and are used in
+        place of the module estimates to split the update queries.
+        This should only be used for diagnostics purposes.
+        """
+        return dict(self._get_response_sizes())
+
+    def _get_response_sizes(self) -> dict[str, int]:
+        return _MODEL_RESPONSE_SIZES.setdefault(self.model, {})
+
+    def _get_update_requests(
+        self, req: dict, update_time: float
+    ) -> tuple[list[dict], list[IotModule]]:
+        """Return the module update requests split by estimated response size.
+
+        Returns the requests and the modules due an update included in them.
+        """
+        response_sizes = self._get_response_sizes()
         request_list = []
-        est_response_size = 1024 if "system" in req else 0
+        module_queries: list[IotModule] = []
+        est_response_size = response_sizes.get("system", 1024) if "system" in req else 0
+        interests = self._get_modules_of_interest()
         for module in self._modules.values():
             if not module.is_supported:
                 _LOGGER.debug("Module %s not supported, skipping", module)
                 continue
 
-            est_response_size += module.estimated_query_response_size
+            if interests is not None and module not in interests:
+                continue
+
+            if not module._should_update(update_time):
+                continue
+
+            module_size = response_sizes.get(
+                module._module, module.estimated_query_response_size
+            )
+            est_response_size += module_size
             if est_response_size > self.max_device_response_size:
                 request_list.append(req)
                 req = {}
-                est_response_size = module.estimated_query_response_size
+                est_response_size = module_size
 
             q = module.query()
             _LOGGER.debug("Adding query for %s: %s", module, q)
             req = merge(req, q)
+            module_queries.append(module)
         request_list.append(req)
 
-        responses = [
-            await self.protocol.query(request) for request in request_list if request
-        ]
+        return [request for request in request_list if request], module_queries
 
+    def _handle_update_responses(
+        self,
+        responses: list[dict],
+        update_time: float,
+        module_queries: list[IotModule],
+    ) -> None:
+        """Merge the update responses into the last update."""
         # Preserve the last update and merge
         # responses on top of it so we remember
         # which modules are not supported, otherwise
         # every other update will query for them
         update: dict = self._last_update.copy() if self._last_update else {}
+        response_sizes = self._get_response_sizes()
         for response in responses:
             for k, v in response.items():
                 # The same module could have results in different responses
@@ -431,7 +480,16 @@ class IotDevice(Device):
                 # become top level key/values of the response so check for dict
                 if isinstance(v, dict):
                     update.setdefault(k, {}).update(**v)
+                    size = len(json_dumps(v))
+                    if size > response_sizes.get(k, 0):
+                        response_sizes[k] = size
         self._last_update = update
+        # Only digest the module data when it is used to adapt the intervals
+        record_updates = self._adaptive_updates_enabled
+        for module in module_queries:
+            module._last_update_time = update_time
+            if record_updates:
+                module._record_update(update_time)
 
         # IOT modules are added as default but could be unsupported post first update
         if self._supported_modules is None:
@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Any
+from collections.abc import Callable, Coroutine
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Concatenate, ParamSpec, TypeVar
 
 from ..exceptions import KasaException
 from ..module import Module
@@ -13,6 +15,29 @@ _LOGGER = logging.getLogger(__name__)
 if TYPE_CHECKING:
     from .iotdevice import IotDevice
 
+_T = TypeVar("_T", bound="IotModule")
+_P = ParamSpec("_P")
+_R = TypeVar("_R")
+
+
+def allow_update_after(
+    func: Callable[Concatenate[_T, _P], Coroutine[Any, Any, _R]],
+) -> Callable[Concatenate[_T, _P], Coroutine[Any, Any, _R]]:
+    """Define a wrapper to set _last_update_time to None.
+
+    This will ensure that a module is updated in the next update cycle after
+    a value has been changed.
+    """
+
+    @wraps(func)
+    async def _async_wrap(self: _T, *args: _P.args, **kwargs: _P.kwargs) -> _R:
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            self._last_update_time = None
+
+    return _async_wrap
+
 
 def _merge_dict(dest: dict, source: dict) -> dict:
     """Update dict recursively."""
@@ -32,8 +57,31 @@ class IotModule(Module):
 
     _device: IotDevice
 
+    MINIMUM_UPDATE_INTERVAL_SECS = 0
+
+    def __init__(self, device: IotDevice, module: str) -> None:
+        super().__init__(device, module)
+        self._last_update_time: float | None = None
+
+    @property
+    def update_interval(self) -> int:
+        """Time to wait between updates."""
+        interval = self._get_minimum_update_interval(self.MINIMUM_UPDATE_INTERVAL_SECS)
+        return max(interval, self._get_adaptive_interval())
+
+    def _should_update(self, update_time: float) -> bool:
+        """Return true if module should update based on delay parameters."""
+        return (
+            not self.update_interval
+            or not self._last_update_time
+            or (update_time - self._last_update_time) >= self.update_interval
+            or self._module not in self._device._last_update
+        )
+
     async def call(self, method: str, params: dict | None = None) -> dict:
         """Call the given method with the given parameters."""
+        # Setters call the module, so update it at the minimum interval again
+        self._reset_adaptive_interval()
         return await self._device._query_helper(self._module, method, params)
 
     def query_for_command(self, query: str, params: dict | None = None) -> dict:
@@ -29,6 +29,8 @@ class CloudInfo(DataClassDictMixin):
 class Cloud(IotModule):
     """Module implementing support for cloud services."""
 
+    MINIMUM_UPDATE_INTERVAL_SECS = 60 * 5
+
     def _initialize_features(self) -> None:
         """Initialize features after the initial update."""
         self._add_feature(
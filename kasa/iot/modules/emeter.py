@@ -12,6 +12,8 @@ from .usage import Usage
 class Emeter(Usage, EnergyInterface):
     """Emeter module."""
 
+    MINIMUM_UPDATE_INTERVAL_SECS = 0
+
     async def _post_update_hook(self) -> None:
         self._supported = EnergyInterface.ModuleFeature.PERIODIC_STATS
         if (
@@ -8,7 +8,7 @@ from enum import Enum
 
 from mashumaro import DataClassDictMixin
 
-from ..iotmodule import IotModule, merge
+from ..iotmodule import IotModule, allow_update_after, merge
 
 
 class Action(Enum):
@@ -58,6 +58,8 @@ _LOGGER = logging.getLogger(__name__)
 class RuleModule(IotModule):
     """Base class for rule-based modules, such as countdown and antitheft."""
 
+    MINIMUM_UPDATE_INTERVAL_SECS = 60 * 5
+
     def query(self) -> dict:
         """Prepare the query for rules."""
         q = self.query_for_command("get_rules")
@@ -74,14 +76,17 @@ class RuleModule(IotModule):
             _LOGGER.error("Unable to read rule list: %s (data: %s)", ex, self.data)
             return []
 
+    @allow_update_after
     async def set_enabled(self, state: bool) -> dict:
         """Enable or disable the service."""
         return await self.call("set_overall_enable", {"enable": state})
 
+    @allow_update_after
     async def delete_rule(self, rule: Rule) -> dict:
         """Delete the given rule."""
         return await self.call("delete_rule", {"id": rule.id})
 
+    @allow_update_after
     async def delete_all_rules(self) -> dict:
         """Delete all rules."""
         return await self.call("delete_all_rules")
@@ -2,17 +2,20 @@
 
 from __future__ import annotations
 
-from datetime import UTC, datetime, tzinfo
+from datetime import UTC, datetime, timedelta, tzinfo
+from time import monotonic
 
 from ...exceptions import KasaException
 from ...interfaces import Time as TimeInterface
-from ..iotmodule import IotModule, merge
+from ..iotmodule import IotModule, allow_update_after, merge
 from ..iottimezone import get_timezone, get_timezone_index
 
 
 class Time(IotModule, TimeInterface):
     """Implements the timezone settings."""
 
+    MINIMUM_UPDATE_INTERVAL_SECS = 60
+
     _timezone: tzinfo = UTC
 
     def query(self) -> dict:
@@ -40,6 +43,10 @@ class Time(IotModule, TimeInterface):
             res["sec"],
             tzinfo=self.timezone,
         )
+        # The time is only queried every update interval so advance it
+        # by the whole seconds since it was last updated
+        if self._last_update_time is not None:
+            time += timedelta(seconds=int(monotonic() - self._last_update_time))
         return time
 
     @property
@@ -63,6 +70,7 @@ class Time(IotModule, TimeInterface):
         except KasaException:
             return None
 
+    @allow_update_after
     async def set_time(self, dt: datetime) -> dict:
         """Set the device time."""
         params = {
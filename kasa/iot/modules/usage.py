@@ -4,12 +4,14 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from ..iotmodule import IotModule, merge
+from ..iotmodule import IotModule, allow_update_after, merge
 
 
 class Usage(IotModule):
     """Baseclass for emeter/usage interfaces."""
 
+    MINIMUM_UPDATE_INTERVAL_SECS = 60 * 5
+
     def query(self) -> dict:
         """Return the base query."""
         now = datetime.now()
@@ -97,6 +99,7 @@ class Usage(IotModule):
         data = self._convert_stat_data(data["month_list"], entry_key="month")
         return data
 
+    @allow_update_after
     async def erase_stats(self) -> dict:
         """Erase all stats."""
         return await self.call("erase_runtime_stat")
@@ -0,0 +1,121 @@
+"""Json files saved atomically in the background.
+
+The stores and caches persisting their data to json files save them with
+:class:`JsonFile`, which batches the saves of changes made in quick
+succession and writes the file in an executor instead of on the event loop.
+The files may contain key material so they are only readable by the owner.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+from .json import dumps as json_dumps
+from .json import loads as json_loads
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def write_private_file(path: Path, content: bytes) -> None:
+    """Atomically replace the file with the content, readable only by the owner.
+
+    Raises :class:`OSError` if the file cannot be written.
+    """
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as file:
+        file.write(content)
+    tmp_path.replace(path)
+
+
+class JsonFile:
+    """Json file loaded once and saved in the background.
+
+    Saves are delayed by :attr:`SAVE_DELAY` seconds to write the changes made
+    in the meantime together, and written in an executor. Without a running
+    event loop the file is written straight away.
+
+    :param path: Path of the file, nothing is persisted if not provided.
+    :param description: Description of the content for log messages.
+    """
+
+    #: Seconds to wait for further changes before writing the file
+    SAVE_DELAY = 1.0
+
+    def __init__(self, path: str | os.PathLike | None, description: str) -> None:
+        self._path = Path(path) if path is not None else None
+        self._description = description
+        self._data: Any = None
+        self._dirty = False
+        self._save_handle: asyncio.TimerHandle | None = None
+        self._write_task: asyncio.Future[None] | None = None
+
+    def load(self) -> Any | None:
+        """Return the content of the file, or None if it cannot be loaded."""
+        if self._path is None or not self._path.exists():
+            return None
+        try:
+            return json_loads(self._path.read_text())
+        except (OSError, ValueError) as ex:
+            _LOGGER.warning(
+                "Unable to load %s from %s: %s", self._description, self._path, ex
+            )
+        return None
+
+    def save(self, data: Any) -> None:
+        """Save the data, batching the writes of changes made in quick succession.
+
+        The data is serialized when the file is written, so changes made to it
+        until then are saved as well.
+        """
+        if self._path is None:
+            return
+        self._data = data
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._dirty = False
+            self._write(self._path, json_dumps(data).encode())
+            return
+        if self._save_handle is None and self._write_task is None:
+            self._save_handle = loop.call_later(self.SAVE_DELAY, self._start_write)
+
+    async def flush(self) -> None:
+        """Write the pending changes now and wait for them to be written."""
+        while True:
+            if self._save_handle is not None:
+                self._save_handle.cancel()
+                self._start_write()
+            if (write_task := self._write_task) is None:
+                return
+            await asyncio.wait([write_task])
+
+    def _start_write(self) -> None:
+        self._save_handle = None
+        if self._path is None or not self._dirty:
+            return
+        self._dirty = False
+        # Serialize on the loop so the data is not changed while it is written
+        content = json_dumps(self._data).encode()
+        loop = asyncio.get_running_loop()
+        self._write_task = loop.run_in_executor(None, self._write, self._path, content)
+        self._write_task.add_done_callback(self._write_done)
+
+    def _write_done(self, _: asyncio.Future[None]) -> None:
+        self._write_task = None
+        # Save the changes made while the file was written
+        if self._dirty:
+            self._save_handle = asyncio.get_running_loop().call_later(
+                self.SAVE_DELAY, self._start_write
+            )
+
+    def _write(self, path: Path, content: bytes) -> None:
+        try:
+            write_private_file(path, content)
+        except OSError as ex:
+            _LOGGER.warning("Unable to save %s to %s: %s", self._description, path, ex)
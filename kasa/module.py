@@ -57,6 +57,7 @@ from collections.abc import Callable
 from functools import cache
 from typing import (
     TYPE_CHECKING,
+    Any,
     Final,
     TypeVar,
     get_type_hints,
@@ -64,6 +65,7 @@ from typing import (
 
 from .exceptions import KasaException
 from .feature import Feature
+from .json import dumps as json_dumps
 from .modulemapping import ModuleName
 
 if TYPE_CHECKING:
@@ -182,12 +184,98 @@ class Module(ABC):
         self._device = device
         self._module = module
         self._module_features: dict[str, Feature] = {}
+        self._update_interval_override: int | None = None
+        # Observed data changes for the adaptive update interval
+        self._data_digest: int | None = None
+        self._last_observed_time: float | None = None
+        self._adaptive_interval = 0
+        self._observed_updates = 0
+        self._observed_changes = 0
 
     @property
     def device(self) -> Device:
         """Return the device exposing the module."""
         return self._device
 
+    @property
+    def update_interval(self) -> int:
+        """Time to wait between updates."""
+        return self._get_minimum_update_interval(0)
+
+    def set_update_interval(self, interval: int | None) -> None:
+        """Set the minimum seconds between updates of the module.
+
+        The interval takes precedence over the intervals set with
+        :meth:`Device.set_module_update_intervals()
+        <kasa.Device.set_module_update_intervals>`.
+
+        :param interval: Minimum seconds between updates, or None to use the
+            default minimum interval of the module.
+        """
+        self._update_interval_override = interval
+
+    def _get_minimum_update_interval(self, default: int) -> int:
+        """Return the minimum update interval set for the module or the default."""
+        if (interval := self._update_interval_override) is None:
+            interval = self._device._get_module_update_interval(self)
+        return default if interval is None else interval
+
+    @property
+    def update_stats(self) -> dict[str, Any]:
+        """Return the observed data changes and the update interval.
+
+        The data changes are only observed with adaptive update intervals, see
+        :meth:`Device.set_adaptive_update_intervals()
+        <kasa.Device.set_adaptive_update_intervals>`. The change rate is the
+        fraction of the updates that changed the data.
+        """
+        updates = self._observed_updates
+        return {
+            "updates": updates,
+            "changes": self._observed_changes,
+            "change_rate": self._observed_changes / updates if updates else 0.0,
+            "adaptive_interval": self._get_adaptive_interval(),
+            "update_interval": self.update_interval,
+        }
+
+    def _get_adaptive_interval(self) -> int:
+        """Return the adaptive update interval if enabled for the device."""
+        if self._device._get_adaptive_max_interval(self) is None:
+            return 0
+        return self._adaptive_interval
+
+    def _reset_adaptive_interval(self) -> None:
+        """Update the module at the minimum interval again, e.g. after a change."""
+        self._adaptive_interval = 0
+
+    def _record_update(self, update_time: float) -> None:
+        """Adapt the update interval to whether the update changed the data.
+
+        The interval doubles with every update not changing the data, up to the
+        maximum adaptive interval of the device, and is reset on changes. The
+        devices only call this when adaptive intervals are enabled, as the data
+        is serialized to detect the changes.
+        """
+        if (max_interval := self._device._get_adaptive_max_interval(self)) is None:
+            return
+        try:
+            digest = hash(json_dumps(self.data))
+        except (KasaException, TypeError):
+            return
+
+        if self._data_digest is not None and self._last_observed_time is not None:
+            self._observed_updates += 1
+            if digest != self._data_digest:
+                self._observed_changes += 1
+                self._adaptive_interval = 0
+            else:
+                elapsed = int(update_time - self._last_observed_time)
+                self._adaptive_interval = min(
+                    max(2 * self._adaptive_interval, elapsed, 1), max_interval
+                )
+        self._data_digest = digest
+        self._last_observed_time = update_time
+
     @property
     def _all_features(self) -> dict[str, Feature]:
         """Get the features for this module and any sub modules."""
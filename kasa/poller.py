@@ -0,0 +1,324 @@
+"""Poll a fleet of devices at intervals.
+
+The :class:`Poller` updates devices at their poll interval, spreading the
+polls with jitter and limiting how many devices are polled at once, in
+total and per subnet. Unreachable devices are polled with an exponential
+backoff and a callback is called after each poll::
+
+    async def on_update(dev, error):
+        print(dev.alias, error)
+
+    async with Poller(devices, interval=30, callback=on_update) as poller:
+        poller.add_device(dev, interval=5, module_intervals={"Firmware": 3600})
+        await asyncio.sleep(120)
+
+Polls only update the modules backing the features of interest, if given::
+
+    poller = Poller(devices, interests=["state", "current_consumption", "rssi"])
+
+Modules whose data rarely changes are updated less often with adaptive
+update intervals, up to the given maximum interval::
+
+    poller = Poller(devices, interval=30, adaptive_max_interval=3600)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import heapq
+import inspect
+import ipaddress
+import itertools
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any, cast
+
+from .device import Device
+from .protocols import QueryPriority, query_priority
+
+_LOGGER = logging.getLogger(__name__)
+
+PollCallback = Callable[[Device, Exception | None], Awaitable[None] | None]
+
+
+@dataclass
+class _PollEntry:
+    device: Device
+    interval: float
+    next_due: float = 0
+    failures: int = 0
+    removed: bool = False
+    task: asyncio.Task | None = field(default=None, repr=False)
+    #: Setters of the device settings applied by the poller, with the
+    #: previous values to restore when the device is removed
+    restore: list[tuple[Callable[[Any], None], Any]] = field(
+        default_factory=list, repr=False
+    )
+
+
+class Poller:
+    """Poll devices at intervals with bounded concurrency.
+
+    :param devices: Devices to poll.
+    :param interval: Default seconds between polls of a device.
+    :param max_concurrency: Maximum devices polled at once.
+    :param max_subnet_concurrency: Maximum devices polled at once per subnet.
+    :param subnet_prefix: Prefix length of the IPv4 subnets.
+    :param jitter: Fraction of the interval polls are randomly spread by.
+    :param max_backoff: Maximum seconds between polls of unreachable devices.
+    :param callback: Called with the device and the error, if any, after
+        each poll.
+    :param interests: Ids of features and names of modules read from the
+        devices, to only update the modules backing them. See
+        :meth:`Device.set_update_interests() <kasa.Device.set_update_interests>`.
+    :param adaptive_max_interval: Maximum seconds between module updates with
+        adaptive update intervals. See :meth:`Device.set_adaptive_update_intervals()
+        <kasa.Device.set_adaptive_update_intervals>`.
+    """
+
+    #: Maximum exponent of the backoff of unreachable devices
+    MAX_BACKOFF_EXPONENT = 32
+
+    def __init__(
+        self,
+        devices: Iterable[Device] = (),
+        *,
+        interval: float = 30,
+        max_concurrency: int = 100,
+        max_subnet_concurrency: int = 16,
+        subnet_prefix: int = 24,
+        jitter: float = 0.1,
+        max_backoff: float = 600,
+        callback: PollCallback | None = None,
+        interests: Iterable[str] | None = None,
+        adaptive_max_interval: int | None = None,
+    ) -> None:
+        self._interval = interval
+        self._interests = list(interests) if interests is not None else None
+        self._adaptive_max_interval = adaptive_max_interval
+        self._concurrency = asyncio.Semaphore(max_concurrency)
+        self._max_subnet_concurrency = max_subnet_concurrency
+        self._subnet_prefix = subnet_prefix
+        self._subnet_concurrency: dict[str, asyncio.Semaphore] = {}
+        self._jitter = jitter
+        self._max_backoff = max_backoff
+        self._callback = callback
+        self._entries: dict[int, _PollEntry] = {}
+        # In-flight polls by device, also of devices removed while polled
+        self._polls: dict[int, asyncio.Task] = {}
+        self._schedule: list[tuple[float, int, _PollEntry]] = []
+        self._order = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._scheduler: asyncio.Task | None = None
+        self._stats: dict[str, Any] = {
+            "polls": 0,
+            "errors": 0,
+            "lag_last": 0.0,
+            "lag_max": 0.0,
+            "lag_total": 0.0,
+        }
+        for device in devices:
+            self.add_device(device)
+
+    @property
+    def devices(self) -> list[Device]:
+        """Return the polled devices."""
+        return [entry.device for entry in self._entries.values()]
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the poll metrics.
+
+        The lag is the seconds a poll started after it was due, because of the
+        concurrency limits or a busy event loop.
+        """
+        stats = dict(self._stats)
+        stats["lag_average"] = (
+            stats["lag_total"] / stats["polls"] if stats["polls"] else 0.0
+        )
+        stats["devices"] = len(self._entries)
+        stats["polling"] = sum(
+            1 for entry in self._entries.values() if entry.task is not None
+        )
+        stats["backing_off"] = sum(
+            1 for entry in self._entries.values() if entry.failures
+        )
+        return stats
+
+    def add_device(
+        self,
+        device: Device,
+        *,
+        interval: float | None = None,
+        module_intervals: dict[str, int] | None = None,
+        interests: Iterable[str] | None = None,
+        adaptive_max_interval: int | None = None,
+    ) -> None:
+        """Add a device to poll.
+
+        :param interval: Seconds between polls, defaults to the poller interval.
+        :param module_intervals: Minimum seconds between updates of modules
+            keyed by module name, applied to the device and its children.
+        :param interests: Ids of features and names of modules read from the
+            device, defaults to the poller interests.
+        :param adaptive_max_interval: Maximum seconds between module updates
+            with adaptive update intervals, defaults to the poller setting.
+        """
+        self.remove_device(device)
+        restore: list[tuple[Callable[[Any], None], Any]] = []
+        if interests is None:
+            interests = self._interests
+        if interests is not None:
+            restore.append((device.set_update_interests, device._update_interests))
+            device.set_update_interests(interests)
+        if adaptive_max_interval is None:
+            adaptive_max_interval = self._adaptive_max_interval
+        if adaptive_max_interval is not None:
+            restore.append(
+                (device.set_adaptive_update_intervals, device._adaptive_max_interval)
+            )
+            device.set_adaptive_update_intervals(adaptive_max_interval)
+        if module_intervals:
+            restore.append(
+                (device.set_module_update_intervals, device._module_update_intervals)
+            )
+            device.set_module_update_intervals(module_intervals)
+        interval = interval if interval is not None else self._interval
+        entry = _PollEntry(device, interval, restore=restore)
+        self._entries[id(device)] = entry
+        # Spread the first polls over the interval
+        self._schedule_poll(entry, time.monotonic() + random.uniform(0, interval))  # noqa: S311
+
+    def remove_device(self, device: Device) -> None:
+        """Stop polling a device.
+
+        The settings the poller applied to the device are restored.
+        """
+        if entry := self._entries.pop(id(device), None):
+            entry.removed = True
+            for setter, value in reversed(entry.restore):
+                setter(value)
+
+    async def start(self) -> None:
+        """Start polling."""
+        if self._scheduler is None:
+            self._scheduler = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop polling and cancel the polls in progress."""
+        tasks = {entry.task for entry in self._entries.values() if entry.task}
+        tasks.update(self._polls.values())
+        if self._scheduler is not None:
+            tasks.add(self._scheduler)
+            self._scheduler = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def __aenter__(self) -> Poller:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        await self.stop()
+
+    def _schedule_poll(self, entry: _PollEntry, due: float) -> None:
+        entry.next_due = due
+        heapq.heappush(self._schedule, (due, next(self._order), entry))
+        if self._schedule[0][2] is entry:
+            self._wakeup.set()
+
+    def _get_next_interval(self, entry: _PollEntry) -> float:
+        interval = entry.interval
+        if entry.failures:
+            # Cap the exponent to not overflow after many failures
+            backoff = 2 ** min(entry.failures, self.MAX_BACKOFF_EXPONENT)
+            interval = min(interval * backoff, self._max_backoff)
+        jitter = random.uniform(-self._jitter, self._jitter)  # noqa: S311
+        return interval * (1 + jitter)
+
+    def _get_subnet_concurrency(self, host: str) -> asyncio.Semaphore:
+        try:
+            subnet = str(
+                ipaddress.ip_network(f"{host}/{self._subnet_prefix}", strict=False)
+            )
+        except ValueError:
+            subnet = host
+        if (semaphore := self._subnet_concurrency.get(subnet)) is None:
+            semaphore = asyncio.Semaphore(self._max_subnet_concurrency)
+            self._subnet_concurrency[subnet] = semaphore
+        return semaphore
+
+    async def _run(self) -> None:
+        """Start the polls as they become due."""
+        while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+            while self._schedule and self._schedule[0][0] <= now:
+                _, _, entry = heapq.heappop(self._schedule)
+                if entry.removed or entry.task is not None:
+                    continue
+                entry.task = asyncio.create_task(self._poll(entry))
+            timeout = self._schedule[0][0] - now if self._schedule else None
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+
+    async def _poll(self, entry: _PollEntry) -> None:
+        device = entry.device
+        key = id(device)
+        # Wait for a poll started before the device was removed and added again
+        while (previous := self._polls.get(key)) is not None:
+            await asyncio.wait([previous])
+        task = self._polls[key] = cast(asyncio.Task, entry.task)
+        error: Exception | None = None
+        try:
+            async with (
+                self._get_subnet_concurrency(device.host),
+                self._concurrency,
+            ):
+                lag = max(time.monotonic() - entry.next_due, 0.0)
+                self._stats["polls"] += 1
+                self._stats["lag_last"] = lag
+                self._stats["lag_total"] += lag
+                self._stats["lag_max"] = max(self._stats["lag_max"], lag)
+                try:
+                    with query_priority(QueryPriority.Background):
+                        await device.update()
+                except Exception as ex:
+                    error = ex
+        finally:
+            entry.task = None
+            if self._polls.get(key) is task:
+                del self._polls[key]
+
+        if error is None:
+            entry.failures = 0
+        else:
+            entry.failures += 1
+            self._stats["errors"] += 1
+            _LOGGER.debug(
+                "Error polling %s, polling again with backoff: %s", device.host, error
+            )
+        if not entry.removed:
+            self._schedule_poll(
+                entry,
+                max(
+                    entry.next_due + self._get_next_interval(entry),
+                    time.monotonic(),
+                ),
+            )
+        await self._call_callback(device, error)
+
+    async def _call_callback(self, device: Device, error: Exception | None) -> None:
+        if self._callback is None:
+            return
+        try:
+            result = self._callback(device, error)
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            _LOGGER.exception("Error in poll callback for %s", device.host)
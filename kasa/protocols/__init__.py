@@ -1,13 +1,18 @@
 """Package containing all supported protocols."""
 
+from ..deadline import query_deadline
 from .iotprotocol import IotProtocol
-from .protocol import BaseProtocol
+from .protocol import BaseProtocol, CircuitState, QueryPriority, query_priority
 from .smartcamprotocol import SmartCamProtocol
 from .smartprotocol import SmartErrorCode, SmartProtocol
 
 __all__ = [
     "BaseProtocol",
+    "CircuitState",
     "IotProtocol",
+    "QueryPriority",
+    "query_deadline",
+    "query_priority",
     "SmartErrorCode",
     "SmartProtocol",
     "SmartCamProtocol",
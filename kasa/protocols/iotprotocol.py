@@ -8,6 +8,7 @@ from collections.abc import Callable
 from pprint import pformat as pf
 from typing import TYPE_CHECKING, Any
 
+from ..deadline import can_retry
 from ..deviceconfig import DeviceConfig
 from ..exceptions import (
     AuthenticationError,
@@ -17,6 +18,7 @@ from ..exceptions import (
     _RetryableError,
 )
 from ..json import dumps as json_dumps
+from ..json import loads as json_loads
 from ..transports import XorEncryption, XorTransport
 from .protocol import BaseProtocol, mask_mac, redact_data
 
@@ -61,6 +63,8 @@ class IotProtocol(BaseProtocol):
     """Class for the legacy TPLink IOT KASA Protocol."""
 
     BACKOFF_SECONDS_AFTER_TIMEOUT = 1
+    #: Request sent to check whether an unavailable device is back
+    CIRCUIT_PROBE_REQUEST = '{"system": {"get_sysinfo": {}}}'
 
     def __init__(
         self,
@@ -70,7 +74,6 @@ class IotProtocol(BaseProtocol):
         """Create a protocol object."""
         super().__init__(transport=transport)
 
-        self._query_lock = asyncio.Lock()
         self._redact_data = True
 
     async def query(self, request: str | dict, retry_count: int = 3) -> dict:
@@ -79,15 +82,32 @@ class IotProtocol(BaseProtocol):
             request = json_dumps(request)
             assert isinstance(request, str)  # noqa: S101
 
-        async with self._query_lock:
-            return await self._query(request, retry_count)
+        return await self._query_scheduled(
+            request,
+            lambda: self._query(request, retry_count),
+            lambda: self._query(self.CIRCUIT_PROBE_REQUEST, 0),
+        )
+
+    def _is_read_only_request(self, request: str | dict) -> bool:
+        """Return true if all the request methods are getters."""
+        if isinstance(request, str):
+            try:
+                request = json_loads(request)
+            except ValueError:
+                return False
+        return isinstance(request, dict) and all(
+            isinstance(methods, dict)
+            and all(method.startswith("get_") for method in methods)
+            for module, methods in request.items()
+            if module != "context"
+        )
 
     async def _query(self, request: str, retry_count: int = 3) -> dict:
         for retry in range(retry_count + 1):
             try:
                 return await self._execute_query(request, retry)
             except _ConnectionError as sdex:
-                if retry >= retry_count:
+                if retry >= retry_count or not can_retry():
                     _LOGGER.debug("Giving up on %s after %s retries", self._host, retry)
                     raise sdex
                 continue
@@ -106,7 +126,7 @@ class IotProtocol(BaseProtocol):
                         ex,
                     )
                 await self._transport.reset()
-                if retry >= retry_count:
+                if retry >= retry_count or not can_retry():
                     _LOGGER.debug("Giving up on %s after %s retries", self._host, retry)
                     raise ex
                 continue
@@ -119,9 +139,12 @@ class IotProtocol(BaseProtocol):
                         ex,
                     )
                 await self._transport.reset()
-                if retry >= retry_count:
+                if retry >= retry_count or not can_retry(
+                    self.BACKOFF_SECONDS_AFTER_TIMEOUT
+                ):
                     _LOGGER.debug("Giving up on %s after %s retries", self._host, retry)
                     raise ex
+                await self._query_lock.yield_to_higher_priority()
                 await asyncio.sleep(self.BACKOFF_SECONDS_AFTER_TIMEOUT)
                 continue
             except KasaException as ex:
@@ -12,15 +12,34 @@ http://www.apache.org/licenses/LICENSE-2.0
 
 from __future__ import annotations
 
+import asyncio
+import copy
 import errno
 import hashlib
+import heapq
+import itertools
 import logging
 import struct
+import time
 from abc import ABC, abstractmethod
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import Enum, IntEnum
+from functools import partial
 from typing import TYPE_CHECKING, Any, TypeVar, cast
 
+from ..deadline import get_remaining_time
 from ..deviceconfig import DeviceConfig
+from ..exceptions import (
+    DeviceUnavailableError,
+    KasaException,
+    _ConnectionError,
+    _DeadlineExceededError,
+)
+from ..exceptions import TimeoutError as KasaTimeoutError
+from ..json import dumps as json_dumps
+from ..transports.basetransport import _RenewableSessionTransport
 
 _LOGGER = logging.getLogger(__name__)
 _NO_RETRY_ERRORS = {errno.EHOSTDOWN, errno.EHOSTUNREACH, errno.ECONNREFUSED}
@@ -78,9 +97,190 @@ def md5(payload: bytes) -> bytes:
     return hashlib.md5(payload).digest()  # noqa: S324
 
 
+class QueryPriority(IntEnum):
+    """Priority of a query waiting to be sent to a device.
+
+    Queries with a higher priority are sent first, and queries with the
+    same priority in the order they were made.
+    """
+
+    Interactive = 0
+    Normal = 1
+    Background = 2
+
+
+_query_priority: ContextVar[QueryPriority | None] = ContextVar(
+    "query_priority", default=None
+)
+
+
+@contextmanager
+def query_priority(priority: QueryPriority) -> Iterator[None]:
+    """Set the priority of the queries made within the context.
+
+    Without a priority set, requests changing the device are sent as
+    interactive and read only requests with normal priority.
+    """
+    token = _query_priority.set(priority)
+    try:
+        yield
+    finally:
+        _query_priority.reset(token)
+
+
+class _PriorityLock:
+    """Lock granting access to waiters by priority and then in order."""
+
+    def __init__(self) -> None:
+        self._owner: tuple[QueryPriority, int] | None = None
+        self._owner_task: asyncio.Task | None = None
+        self._waiters: list[tuple[QueryPriority, int, asyncio.Future[None]]] = []
+        self._order = itertools.count()
+        self.wait_stats: dict[QueryPriority, dict[str, float]] = {
+            priority: {"count": 0, "total": 0.0, "max": 0.0}
+            for priority in QueryPriority
+        }
+
+    def locked(self) -> bool:
+        """Return true if the lock is held."""
+        return self._owner is not None
+
+    async def _acquire(self, owner: tuple[QueryPriority, int]) -> None:
+        if self._owner is None and not self._waiters:
+            self._owner = owner
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (*owner, future)
+        heapq.heappush(self._waiters, waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+            else:
+                # The lock was handed over before the cancellation
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        if self._waiters:
+            priority, order, future = heapq.heappop(self._waiters)
+            self._owner = (priority, order)
+            future.set_result(None)
+        else:
+            self._owner = None
+
+    @asynccontextmanager
+    async def __call__(self, priority: QueryPriority) -> AsyncIterator[None]:
+        """Hold the lock with the given priority."""
+        owner = (priority, next(self._order))
+        start = time.monotonic()
+        await self._acquire(owner)
+        self._owner_task = asyncio.current_task()
+        wait_time = time.monotonic() - start
+        stats = self.wait_stats[priority]
+        stats["count"] += 1
+        stats["total"] += wait_time
+        stats["max"] = max(stats["max"], wait_time)
+        try:
+            yield
+        finally:
+            if self._owner == owner:
+                self._release()
+
+    async def yield_to_higher_priority(self) -> None:
+        """Let waiters with a higher priority than the owner go first.
+
+        The owner keeps its place ahead of waiters with the same priority.
+        Does nothing if the lock is not held by the current task.
+        """
+        if (
+            (owner := self._owner) is None
+            or self._owner_task is not asyncio.current_task()
+            or not self._waiters
+            or self._waiters[0][0] >= owner[0]
+        ):
+            return
+        self._release()
+        await self._acquire(owner)
+        self._owner_task = asyncio.current_task()
+
+
+class CircuitState(Enum):
+    """State of the circuit breaker of a device connection."""
+
+    #: Queries are sent to the device
+    Closed = "closed"
+    #: Queries fail fast without contacting the device
+    Open = "open"
+    #: A probe is allowed to check whether the device is back
+    HalfOpen = "half_open"
+
+
+class _CircuitBreaker:
+    """Track consecutive connection failures of a device.
+
+    The circuit opens after *failure_threshold* consecutive failures and
+    half opens after the reset timeout, which doubles after each failed
+    probe up to *max_reset_timeout*.
+    """
+
+    def __init__(
+        self, failure_threshold: int, reset_timeout: float, max_reset_timeout: float
+    ) -> None:
+        self.failures = 0
+        self.probing = False
+        self._failure_threshold = failure_threshold
+        self._base_reset_timeout = reset_timeout
+        self._reset_timeout = reset_timeout
+        self._max_reset_timeout = max_reset_timeout
+        self._opened_at: float | None = None
+
+    @property
+    def state(self) -> CircuitState:
+        """Return the state of the circuit."""
+        if self._opened_at is None:
+            return CircuitState.Closed
+        if self.probing or self.retry_after == 0:
+            return CircuitState.HalfOpen
+        return CircuitState.Open
+
+    @property
+    def retry_after(self) -> float:
+        """Return the seconds until the circuit half opens."""
+        if self._opened_at is None:
+            return 0.0
+        return max(self._opened_at + self._reset_timeout - time.monotonic(), 0.0)
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        self.failures = 0
+        self._opened_at = None
+        self._reset_timeout = self._base_reset_timeout
+
+    def record_failure(self) -> None:
+        """Record a connection failure, opening the circuit at the threshold."""
+        self.failures += 1
+        if self._opened_at is not None:
+            # The probe failed so wait longer before the next one
+            self._reset_timeout = min(self._reset_timeout * 2, self._max_reset_timeout)
+            self._opened_at = time.monotonic()
+        elif self.failures >= self._failure_threshold:
+            self._opened_at = time.monotonic()
+
+
 class BaseProtocol(ABC):
     """Base class for all TP-Link Smart Home communication."""
 
+    #: Consecutive connection failures after which queries fail fast
+    CIRCUIT_FAILURE_THRESHOLD = 3
+    #: Seconds queries fail fast before the device is probed
+    CIRCUIT_RESET_TIMEOUT = 30
+    #: Maximum seconds queries fail fast after failed probes
+    CIRCUIT_MAX_RESET_TIMEOUT = 600
+
     def __init__(
         self,
         *,
@@ -88,11 +288,182 @@ class BaseProtocol(ABC):
     ) -> None:
         """Create a protocol object."""
         self._transport = transport
+        self._query_lock = _PriorityLock()
+        self._in_flight_queries: dict[str, asyncio.Future[dict]] = {}
+        self._coalesced_query_count = 0
+        if isinstance(transport, _RenewableSessionTransport):
+            # Renew the session between the queries, after any waiting queries
+            transport._session_renewal_lock = partial(
+                self._query_lock, QueryPriority.Background
+            )
+        self._circuit_breaker: _CircuitBreaker | None = None
+        if transport._config.circuit_breaker:
+            self._circuit_breaker = _CircuitBreaker(
+                self.CIRCUIT_FAILURE_THRESHOLD,
+                self.CIRCUIT_RESET_TIMEOUT,
+                self.CIRCUIT_MAX_RESET_TIMEOUT,
+            )
 
     @property
     def _host(self) -> str:
         return self._transport._host
 
+    @property
+    def coalesced_query_count(self) -> int:
+        """Return the number of queries served by an identical in-flight query."""
+        return self._coalesced_query_count
+
+    @property
+    def query_wait_stats(self) -> dict[QueryPriority, dict[str, float]]:
+        """Return the count, total and max seconds queries waited per priority."""
+        return {
+            priority: dict(stats)
+            for priority, stats in self._query_lock.wait_stats.items()
+        }
+
+    @property
+    def circuit_state(self) -> CircuitState:
+        """Return the state of the circuit breaker of the connection.
+
+        The circuit is always closed unless the breaker is enabled with
+        :attr:`~kasa.deviceconfig.DeviceConfig.circuit_breaker`.
+        """
+        if self._circuit_breaker is None:
+            return CircuitState.Closed
+        return self._circuit_breaker.state
+
+    def _is_read_only_request(self, request: str | dict) -> bool:
+        """Return true if the request only reads from the device.
+
+        Only read only requests are coalesced with identical in-flight
+        requests. Protocols override this to allow coalescing.
+        """
+        return False
+
+    async def _query_scheduled(
+        self,
+        request: str | dict,
+        query: Callable[[], Awaitable[dict]],
+        probe: Callable[[], Awaitable[dict]] | None = None,
+    ) -> dict:
+        """Execute the query when the device is available for its priority.
+
+        Read only requests are coalesced with identical in-flight requests.
+        While the enabled circuit breaker is open queries fail fast, and the *probe*
+        is sent to check whether the device is back before the first query
+        after the reset timeout. Within a :func:`~kasa.deadline.query_deadline`
+        the wait for the device counts towards the deadline.
+        """
+        self._check_circuit()
+        read_only = self._is_read_only_request(request)
+        if (priority := _query_priority.get()) is None:
+            priority = QueryPriority.Normal if read_only else QueryPriority.Interactive
+
+        async def _locked_query() -> dict:
+            async with self._query_lock(priority):
+                if self._circuit_breaker is None:
+                    return await query()
+                return await self._query_circuit(self._circuit_breaker, query, probe)
+
+        try:
+            async with asyncio.timeout(get_remaining_time()) as deadline:
+                if not read_only:
+                    return await _locked_query()
+                return await self._query_single_flight(request, _locked_query)
+        except TimeoutError as ex:
+            if deadline.expired() and not isinstance(ex, KasaTimeoutError):
+                raise _DeadlineExceededError(
+                    f"Query deadline exceeded querying the device: {self._host}"
+                ) from ex
+            raise
+
+    def _check_circuit(self) -> None:
+        """Raise if the device is not to be queried due to connection failures."""
+        if (breaker := self._circuit_breaker) is None:
+            return
+        state = breaker.state
+        if state is CircuitState.Open or (
+            state is CircuitState.HalfOpen and breaker.probing
+        ):
+            raise DeviceUnavailableError(
+                f"Device {self._host} is unavailable after {breaker.failures} "
+                f"connection failures, retrying in {breaker.retry_after:.0f}s",
+                retry_after=breaker.retry_after,
+            )
+
+    async def _query_circuit(
+        self,
+        breaker: _CircuitBreaker,
+        query: Callable[[], Awaitable[dict]],
+        probe: Callable[[], Awaitable[dict]] | None,
+    ) -> dict:
+        """Execute the query recording connection failures with the breaker."""
+        # The circuit may have opened while waiting for the lock
+        self._check_circuit()
+        # Only a single query probes the device when the circuit half opens
+        half_open = breaker.probing = breaker.state is CircuitState.HalfOpen
+        try:
+            if half_open and probe is not None:
+                await probe()
+                breaker.record_success()
+            result = await query()
+        except _DeadlineExceededError:
+            # The caller ran out of time, which says nothing about the device
+            raise
+        except (_ConnectionError, KasaTimeoutError):
+            breaker.record_failure()
+            raise
+        except KasaException:
+            # The device responded
+            breaker.record_success()
+            raise
+        finally:
+            if half_open:
+                breaker.probing = False
+        breaker.record_success()
+        return result
+
+    async def _query_single_flight(
+        self, request: str | dict, query: Callable[[], Awaitable[dict]]
+    ) -> dict:
+        """Execute the query or share the result of an identical one in flight.
+
+        Concurrent identical requests share a single call to the device.
+        Each caller receives its own copy of the response.
+        """
+        key = request if isinstance(request, str) else json_dumps(request)
+        if (in_flight := self._in_flight_queries.get(key)) is not None:
+            self._coalesced_query_count += 1
+            try:
+                return copy.deepcopy(await asyncio.shield(in_flight))
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if not in_flight.cancelled() or (task and task.cancelling()):
+                    raise
+            # The query in flight was cancelled so query again
+            self._coalesced_query_count -= 1
+            return await self._query_single_flight(request, query)
+
+        future: asyncio.Future[dict] = asyncio.get_running_loop().create_future()
+        self._in_flight_queries[key] = future
+        try:
+            result = await query()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as ex:
+            future.set_exception(ex)
+            # Mark the exception as retrieved if there are no waiters
+            future.exception()
+            raise
+        else:
+            # Share a copy as the caller may change the result before the
+            # waiters resume
+            future.set_result(copy.deepcopy(result))
+            return result
+        finally:
+            del self._in_flight_queries[key]
+
     @property
     def config(self) -> DeviceConfig:
         """Return the connection parameters the device is using."""
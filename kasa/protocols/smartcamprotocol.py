@@ -19,6 +19,7 @@ from ..transports.sslaestransport import (
     SMART_RETRYABLE_ERRORS,
     SmartErrorCode,
 )
+from .protocol import CircuitState
 from .smartprotocol import SmartProtocol
 
 _LOGGER = logging.getLogger(__name__)
@@ -49,6 +50,8 @@ class SingleRequest:
 class SmartCamProtocol(SmartProtocol):
     """Class for SmartCam Protocol."""
 
+    CIRCUIT_PROBE_REQUEST = {"getDeviceInfo": {"device_info": {"name": ["basic_info"]}}}
+
     def _get_list_request(
         self, method: str, params: dict | None, start_index: int
     ) -> dict:
@@ -91,6 +94,66 @@ class SmartCamProtocol(SmartProtocol):
         """Close the underlying transport."""
         await self._transport.close()
 
+    async def _query_children(
+        self, requests: dict[str, dict], retry_count: int = 3
+    ) -> dict[str, dict]:
+        """Query multiple child devices with batched controlChild requests.
+
+        The methods of all the child requests, keyed by child device id, are
+        wrapped as controlChild requests and sent in multipleRequests planned
+        by the multi request limits. The responses are routed back to their
+        child by index.
+
+        Returns the unwrapped responses keyed by child device id. Children
+        missing from the result could not be queried as part of a batch and
+        should be queried individually by the caller.
+        """
+        children = {
+            device_id: _ChildCameraProtocolWrapper(device_id, self)
+            for device_id in requests
+        }
+        control_child_requests = [
+            (device_id, method, control_child_request)
+            for device_id, request in requests.items()
+            for method, control_child_request in children[
+                device_id
+            ]._get_control_child_requests(request)
+        ]
+        child_responses: dict[str, tuple[list[str], list[dict]]] = {
+            device_id: ([], []) for device_id in requests
+        }
+        failed: set[str] = set()
+
+        batch_responses = await self._query_multi_request_batches(
+            [req for _, _, req in control_child_requests], retry_count
+        )
+        for (device_id, method, _), response in zip(
+            control_child_requests, batch_responses, strict=True
+        ):
+            if response is None:
+                failed.add(device_id)
+                continue
+            methods, child_response_list = child_responses[device_id]
+            methods.append(method)
+            child_response_list.append(response)
+
+        results: dict[str, dict] = {}
+        for device_id, (methods, responses) in child_responses.items():
+            if device_id in failed:
+                continue
+            try:
+                results[device_id] = children[
+                    device_id
+                ]._unwrap_control_child_responses(methods, responses)
+            except Exception as ex:
+                _LOGGER.debug(
+                    "Error querying %s for child %s in batch: %s",
+                    self._host,
+                    device_id,
+                    ex,
+                )
+        return results
+
     @staticmethod
     def _get_smart_camera_single_request(
         request: dict[str, dict[str, Any]],
@@ -215,42 +278,35 @@ class _ChildCameraProtocolWrapper(SmartProtocol):
         self._protocol = base_protocol
         self._transport = base_protocol._transport
 
-    async def query(self, request: str | dict, retry_count: int = 3) -> dict:
-        """Wrap request inside controlChild envelope."""
-        return await self._query(request, retry_count)
-
-    async def _query(self, request: str | dict, retry_count: int = 3) -> dict:
-        """Wrap request inside controlChild envelope."""
-        if not isinstance(request, dict):
-            raise KasaException("Child requests must be dictionaries.")
-        requests = []
-        methods = []
-        for key, val in request.items():
-            request = {
-                "method": "controlChild",
-                "params": {
-                    "childControl": {
-                        "device_id": self._device_id,
-                        "request_data": {"method": key, "params": val},
-                    }
+    def _get_control_child_requests(self, request: dict) -> list[tuple[str, dict]]:
+        """Return the child methods and their controlChild requests."""
+        return [
+            (
+                method,
+                {
+                    "method": "controlChild",
+                    "params": {
+                        "childControl": {
+                            "device_id": self._device_id,
+                            "request_data": {"method": method, "params": params},
+                        }
+                    },
                 },
-            }
-            methods.append(key)
-            requests.append(request)
-
-        multipleRequest = {"multipleRequest": {"requests": requests}}
-
-        response = await self._protocol.query(multipleRequest, retry_count)
+            )
+            for method, params in request.items()
+        ]
 
-        responses = response["multipleRequest"]["responses"]
+    def _unwrap_control_child_responses(
+        self, methods: list[str], responses: list[dict]
+    ) -> dict:
+        """Unwrap the controlChild responses into the child responses."""
         response_dict = {}
 
         # Raise errors for single calls
-        raise_on_error = len(requests) == 1
+        raise_on_error = len(methods) == 1
 
-        for index_id, response in enumerate(responses):
+        for method, response in zip(methods, responses, strict=False):
             response_data = response["result"]["response_data"]
-            method = methods[index_id]
             self._handle_response_error_code(
                 response_data, method, raise_on_error=raise_on_error
             )
@@ -258,5 +314,31 @@ class _ChildCameraProtocolWrapper(SmartProtocol):
 
         return response_dict
 
+    @property
+    def circuit_state(self) -> CircuitState:
+        """Return the state of the circuit breaker of the parent connection."""
+        return self._protocol.circuit_state
+
+    async def query(self, request: str | dict, retry_count: int = 3) -> dict:
+        """Wrap request inside controlChild envelope."""
+        return await self._query(request, retry_count)
+
+    async def _query(self, request: str | dict, retry_count: int = 3) -> dict:
+        """Wrap request inside controlChild envelope."""
+        if not isinstance(request, dict):
+            raise KasaException("Child requests must be dictionaries.")
+        control_child_requests = self._get_control_child_requests(request)
+        methods = [method for method, _ in control_child_requests]
+        multipleRequest = {
+            "multipleRequest": {
+                "requests": [request for _, request in control_child_requests]
+            }
+        }
+
+        response = await self._protocol.query(multipleRequest, retry_count)
+
+        responses = response["multipleRequest"]["responses"]
+        return self._unwrap_control_child_responses(methods, responses)
+
     async def close(self) -> None:
         """Do nothing as the parent owns the protocol."""
@@ -16,6 +16,7 @@ from collections.abc import Callable
 from pprint import pformat as pf
 from typing import TYPE_CHECKING, Any
 
+from ..deadline import can_retry
 from ..exceptions import (
     SMART_AUTHENTICATION_ERRORS,
     SMART_RETRYABLE_ERRORS,
@@ -28,7 +29,7 @@ from ..exceptions import (
     _RetryableError,
 )
 from ..json import dumps as json_dumps
-from .protocol import BaseProtocol, mask_mac, md5, redact_data
+from .protocol import BaseProtocol, CircuitState, mask_mac, md5, redact_data
 
 if TYPE_CHECKING:
     from ..transports import BaseTransport
@@ -96,12 +97,31 @@ FORCE_SINGLE_REQUEST = {
     "scanApList",
 }
 
+# Methods only reading from the device without a get prefix
+READ_ONLY_METHODS = {
+    "component_nego",
+}
+
+# Errors returned by some devices for multiple request batches too large
+MULTI_REQUEST_SIZE_ERRORS = {
+    SmartErrorCode.JSON_DECODE_FAIL_ERROR,
+    SmartErrorCode.INTERNAL_UNKNOWN_ERROR,
+}
+
 
 class SmartProtocol(BaseProtocol):
     """Class for the new TPLink SMART protocol."""
 
     BACKOFF_SECONDS_AFTER_TIMEOUT = 1
     DEFAULT_MULTI_REQUEST_BATCH_SIZE = 5
+    #: Estimated response size in bytes for methods not yet seen
+    DEFAULT_RESPONSE_SIZE_ESTIMATE = 256
+    #: Successful multiple queries before probing a larger batch limit
+    MULTI_REQUEST_PROBE_INTERVAL = 50
+    #: Stop probing when the limit is this close to a known failure size
+    MULTI_REQUEST_PROBE_MIN_STEP = 256
+    #: Request sent to check whether an unavailable device is back
+    CIRCUIT_PROBE_REQUEST: str | dict = "get_device_info"
 
     def __init__(
         self,
@@ -111,10 +131,19 @@ class SmartProtocol(BaseProtocol):
         """Create a protocol object."""
         super().__init__(transport=transport)
         self._terminal_uuid: str = base64.b64encode(md5(uuid.uuid4().bytes)).decode()
-        self._query_lock = asyncio.Lock()
+        config = self._transport._config
+        self._max_multi_request_batch_size = (
+            config.batch_size or self.DEFAULT_MULTI_REQUEST_BATCH_SIZE
+        )
         self._multi_request_batch_size = (
-            self._transport._config.batch_size or self.DEFAULT_MULTI_REQUEST_BATCH_SIZE
+            config.learned_batch_size or self._max_multi_request_batch_size
         )
+        self._multi_request_max_size = config.batch_max_size
+        self._multi_request_failed_size: int | None = None
+        self._multi_request_good_size = 0
+        self._multi_request_successes = 0
+        self._multi_request_probe_interval = self.MULTI_REQUEST_PROBE_INTERVAL
+        self._response_sizes: dict[str, int] = {}
         self._redact_data = True
         self._method_missing_logged = False
 
@@ -131,8 +160,42 @@ class SmartProtocol(BaseProtocol):
 
     async def query(self, request: str | dict, retry_count: int = 3) -> dict:
         """Query the device retrying for retry_count on failure."""
-        async with self._query_lock:
-            return await self._query(request, retry_count)
+        return await self._query_scheduled(
+            request,
+            lambda: self._query(request, retry_count),
+            lambda: self._query(self.CIRCUIT_PROBE_REQUEST, 0),
+        )
+
+    def _is_read_only_request(self, request: str | dict) -> bool:
+        """Return true if all the request methods only read from the device."""
+        if isinstance(request, str):
+            return self._is_read_only_method(request, None)
+        return all(
+            self._is_read_only_method(method, params)
+            for method, params in request.items()
+        )
+
+    def _is_read_only_method(self, method: str, params: Any) -> bool:
+        """Return true if the method only reads from the device.
+
+        Batched and child requests are classified by the methods they wrap.
+        """
+        if method == "multipleRequest":
+            requests = params.get("requests") if isinstance(params, dict) else None
+            return isinstance(requests, list) and all(
+                self._is_read_only_method(req.get("method", ""), req.get("params"))
+                for req in requests
+            )
+        if method == "control_child":
+            wrapped = params.get("requestData") if isinstance(params, dict) else None
+        elif method == "controlChild":
+            child_control = params.get("childControl") if params else None
+            wrapped = child_control.get("request_data") if child_control else None
+        else:
+            return method.startswith("get") or method in READ_ONLY_METHODS
+        return isinstance(wrapped, dict) and self._is_read_only_method(
+            wrapped.get("method", ""), wrapped.get("params")
+        )
 
     async def _query(self, request: str | dict, retry_count: int = 3) -> dict:
         for retry in range(retry_count + 1):
@@ -148,7 +211,7 @@ class SmartProtocol(BaseProtocol):
                         retry_count,
                         ex,
                     )
-                if retry >= retry_count:
+                if retry >= retry_count or not can_retry():
                     _LOGGER.debug("Giving up on %s after %s retries", self._host, retry)
                     raise ex
                 continue
@@ -167,9 +230,12 @@ class SmartProtocol(BaseProtocol):
                         ex,
                     )
                 await self._transport.reset()
-                if retry >= retry_count:
+                if retry >= retry_count or not can_retry(
+                    self.BACKOFF_SECONDS_AFTER_TIMEOUT
+                ):
                     _LOGGER.debug("Giving up on %s after %s retries", self._host, retry)
                     raise ex
+                await self._query_lock.yield_to_higher_priority()
                 await asyncio.sleep(self.BACKOFF_SECONDS_AFTER_TIMEOUT)
                 continue
             except TimeoutError as ex:
@@ -181,9 +247,12 @@ class SmartProtocol(BaseProtocol):
                         ex,
                     )
                 await self._transport.reset()
-                if retry >= retry_count:
+                if retry >= retry_count or not can_retry(
+                    self.BACKOFF_SECONDS_AFTER_TIMEOUT
+                ):
                     _LOGGER.debug("Giving up on %s after %s retries", self._host, retry)
                     raise ex
+                await self._query_lock.yield_to_higher_priority()
                 await asyncio.sleep(self.BACKOFF_SECONDS_AFTER_TIMEOUT)
                 continue
             except KasaException as ex:
@@ -198,6 +267,221 @@ class SmartProtocol(BaseProtocol):
         # make mypy happy, this should never be reached..
         raise KasaException("Query reached somehow to unreachable")
 
+    async def _query_children(
+        self, requests: dict[str, dict], retry_count: int = 3
+    ) -> dict[str, dict]:
+        """Query multiple child devices with batched control_child requests.
+
+        The child requests, keyed by child device id, are wrapped in
+        control_child envelopes and sent as multipleRequests planned by the
+        multi request limits, counting the methods of the child requests.
+
+        Returns the unwrapped responses keyed by child device id. Children
+        missing from the result could not be queried as part of a batch,
+        e.g. the batch failed or the device stopped after an error, and
+        should be queried individually by the caller.
+        """
+        results: dict[str, dict] = {}
+        children = [
+            (_ChildProtocolWrapper(device_id, self), request)
+            for device_id, request in requests.items()
+        ]
+        methods = []
+        control_child_requests = []
+        for child, request in children:
+            method, params = child._get_control_child_params(request)
+            methods.append(method)
+            control_child_requests.append({"method": "control_child", "params": params})
+
+        responses = await self._query_multi_request_batches(
+            control_child_requests, retry_count
+        )
+        for (child, _), method, response in zip(
+            children, methods, responses, strict=True
+        ):
+            if response is None:
+                continue
+            try:
+                self._handle_response_error_code(response, "control_child")
+                results[child._device_id] = child._unwrap_control_child_result(
+                    method, response.get("result")
+                )
+            except KasaException as ex:
+                _LOGGER.debug(
+                    "Error querying %s for child %s in batch: %s",
+                    self._host,
+                    child._device_id,
+                    ex,
+                )
+        return results
+
+    async def _query_multi_request_batches(
+        self, requests: list[dict], retry_count: int
+    ) -> list[dict | None]:
+        """Send the requests as multipleRequests planned by the batch limits.
+
+        Batches too large for the device lower the limits and are planned
+        again. Returns the responses in request order, None for requests not
+        answered because their batch failed or the device stopped after an
+        error.
+        """
+        responses: list[dict | None] = [None] * len(requests)
+        index = 0
+        batches = self._get_multi_request_batches(requests)
+        succeeded = False
+        while batches:
+            batch, batch_size = batches.pop(0)
+            try:
+                resp = await self.query(
+                    {"multipleRequest": {"requests": batch}}, retry_count
+                )
+                # The device does not continue after an error
+                batch_responses = resp["multipleRequest"]["responses"][: len(batch)]
+            except Exception as ex:
+                if (
+                    isinstance(ex, DeviceError)
+                    and ex.error_code in MULTI_REQUEST_SIZE_ERRORS
+                    and len(batch) > 1
+                ):
+                    self._handle_multi_request_size_error(len(batch), batch_size)
+                    batches = self._get_multi_request_batches(requests[index:])
+                    continue
+                _LOGGER.debug(
+                    "Error querying %s for %s requests as a batch: %s",
+                    self._host,
+                    len(batch),
+                    ex,
+                )
+            else:
+                responses[index : index + len(batch_responses)] = batch_responses
+                if len(batch) > 1 and batch_size > self._multi_request_good_size:
+                    self._multi_request_good_size = batch_size
+                succeeded = True
+            index += len(batch)
+        if succeeded:
+            self._handle_multi_request_success()
+        return responses
+
+    @property
+    def multi_request_limits(self) -> tuple[int, int | None]:
+        """Return the learned batch size and max batch size in bytes.
+
+        The limits are also stored on the device config as learned_batch_size
+        and batch_max_size so they can be persisted and reused.
+        """
+        return self._multi_request_batch_size, self._multi_request_max_size
+
+    def _get_request_methods(self, request: dict) -> list[str]:
+        """Return the methods of a request, unwrapping child requests."""
+        method = request["method"]
+        params = request.get("params") or {}
+        if method == "control_child":
+            wrapped = params.get("requestData")
+        elif method == "controlChild":
+            wrapped = (params.get("childControl") or {}).get("request_data")
+        else:
+            return [method]
+        if not isinstance(wrapped, dict) or "method" not in wrapped:
+            return [method]
+        if wrapped["method"] == "multipleRequest":
+            return [req["method"] for req in (wrapped.get("params") or {})["requests"]]
+        return [wrapped["method"]]
+
+    def _estimate_request_size(self, request: dict) -> int:
+        """Return the estimated request and response size of a request."""
+        return len(json_dumps(request)) + sum(
+            self._response_sizes.get(method, self.DEFAULT_RESPONSE_SIZE_ESTIMATE)
+            for method in self._get_request_methods(request)
+        )
+
+    def _get_multi_request_batches(
+        self, multi_requests: list[dict]
+    ) -> list[tuple[list[dict], int]]:
+        """Pack the requests into batches by method count and estimated size.
+
+        The methods of wrapped child requests count towards the batch size.
+        Returns the batches with their estimated size in bytes.
+        """
+        max_size = self._multi_request_max_size
+        batches: list[tuple[list[dict], int]] = []
+        batch: list[dict] = []
+        batch_size = batch_count = 0
+        for request in multi_requests:
+            size = self._estimate_request_size(request)
+            count = len(self._get_request_methods(request))
+            if batch and (
+                batch_count + count > self._multi_request_batch_size
+                or (max_size is not None and batch_size + size > max_size)
+            ):
+                batches.append((batch, batch_size))
+                batch, batch_size, batch_count = [], 0, 0
+            batch.append(request)
+            batch_size += size
+            batch_count += count
+        if batch:
+            batches.append((batch, batch_size))
+        return batches
+
+    def _save_multi_request_limits(self) -> None:
+        """Store the learned limits on the device config."""
+        config = self._transport._config
+        config.learned_batch_size = (
+            self._multi_request_batch_size
+            if self._multi_request_batch_size != self._max_multi_request_batch_size
+            else None
+        )
+        config.batch_max_size = self._multi_request_max_size
+
+    def _handle_multi_request_size_error(self, batch_len: int, size: int) -> None:
+        """Lower the batch limits after a batch was too large for the device."""
+        if self._multi_request_failed_size is None or (
+            size < self._multi_request_failed_size
+        ):
+            self._multi_request_failed_size = size
+        if batch_len > 1 and 0 < self._multi_request_good_size < size:
+            # Fall back to the largest batch known to work
+            self._multi_request_max_size = self._multi_request_good_size
+        else:
+            # Batching has not worked for this size so disable it
+            self._multi_request_batch_size = 1
+        self._multi_request_successes = 0
+        self._save_multi_request_limits()
+
+    def _get_multi_request_probe_limits(self) -> tuple[int, int | None] | None:
+        """Return the next batch limits to probe or None if not limited."""
+        max_size = self._multi_request_max_size
+        failed_size = self._multi_request_failed_size
+        if self._multi_request_batch_size == 1:
+            if self._max_multi_request_batch_size == 1 or failed_size is None:
+                return None
+            return self._max_multi_request_batch_size, None
+        if max_size is None:
+            return None
+        if failed_size is None:
+            return self._multi_request_batch_size, max_size * 2
+        if failed_size - max_size <= self.MULTI_REQUEST_PROBE_MIN_STEP:
+            return None
+        return self._multi_request_batch_size, (max_size + failed_size) // 2
+
+    def _handle_multi_request_success(self) -> None:
+        """Probe larger batch limits after enough successful queries."""
+        if (probe_limits := self._get_multi_request_probe_limits()) is None:
+            return
+        self._multi_request_successes += 1
+        if self._multi_request_successes < self._multi_request_probe_interval:
+            return
+        self._multi_request_successes = 0
+        if self._multi_request_batch_size == 1:
+            # Batching was disabled so back off probing further if the
+            # device fails again
+            self._multi_request_failed_size = None
+            self._multi_request_probe_interval *= 2
+        self._multi_request_batch_size, self._multi_request_max_size = probe_limits
+        _LOGGER.debug(
+            "Probing multi request limits for %s: %s", self._host, probe_limits
+        )
+        self._save_multi_request_limits()
+
     async def _execute_multiple_query(
         self, requests: dict, retry_count: int, iterate_list_pages: bool
     ) -> dict:
@@ -221,7 +505,9 @@ class SmartProtocol(BaseProtocol):
         step = self._multi_request_batch_size
         if step == 1:
             # If step is 1 do not send request batches
-            for request in multi_requests:
+            for i, request in enumerate(multi_requests):
+                if i:
+                    await self._query_lock.yield_to_higher_priority()
                 method = request["method"]
                 req = self.get_smart_request(method, request.get("params"))
                 resp = await self._transport.send(req)
@@ -229,14 +515,17 @@ class SmartProtocol(BaseProtocol):
                     resp, method, raise_on_error=raise_on_error
                 )
                 multi_result[method] = resp["result"]
+            self._handle_multi_request_success()
             return multi_result
 
-        for batch_num, i in enumerate(range(0, end, step)):
-            requests_step = multi_requests[i : i + step]
-
+        batches = self._get_multi_request_batches(multi_requests)
+        for batch_num, (requests_step, batch_size) in enumerate(batches):
+            if batch_num:
+                # Let interactive queries go between the batches
+                await self._query_lock.yield_to_higher_priority()
             smart_params = {"requests": requests_step}
             smart_request = self.get_smart_request(smart_method, smart_params)
-            batch_name = f"multi-request-batch-{batch_num + 1}-of-{int(end / step) + 1}"
+            batch_name = f"multi-request-batch-{batch_num + 1}-of-{len(batches)}"
             if debug_enabled:
                 _LOGGER.debug(
                     "%s %s >> %s",
@@ -244,6 +533,7 @@ class SmartProtocol(BaseProtocol):
                     batch_name,
                     pf(smart_request),
                 )
+            self._transport._last_response_size = None
             response_step = await self._transport.send(smart_request)
             if debug_enabled:
                 if self._redact_data:
@@ -260,22 +550,30 @@ class SmartProtocol(BaseProtocol):
                 self._handle_response_error_code(response_step, batch_name)
             except DeviceError as ex:
                 # P100 sometimes raises JSON_DECODE_FAIL_ERROR or INTERNAL_UNKNOWN_ERROR
-                # on batched request so disable batching
+                # on batched request when the batch is too large for the device
+                # so lower the batch limits
                 if (
-                    ex.error_code
-                    in {
-                        SmartErrorCode.JSON_DECODE_FAIL_ERROR,
-                        SmartErrorCode.INTERNAL_UNKNOWN_ERROR,
-                    }
+                    ex.error_code in MULTI_REQUEST_SIZE_ERRORS
                     and self._multi_request_batch_size != 1
                 ):
-                    self._multi_request_batch_size = 1
+                    self._handle_multi_request_size_error(
+                        len(requests_step), batch_size
+                    )
                     raise _RetryableError(
-                        "JSON Decode failure, multi requests disabled"
+                        "JSON Decode failure, multi request limits lowered to "
+                        f"{self.multi_request_limits}"
                     ) from ex
                 raise ex
 
             responses = response_step["result"]["responses"]
+            # Spread the response length over the responses to estimate their
+            # size, if the transport knows it
+            response_size = self._transport._last_response_size
+            result_size = (
+                response_size // len(responses)
+                if response_size is not None and responses
+                else None
+            )
             for response in responses:
                 # some smartcam devices calls do not populate the method key
                 # these should be defined in DO_NOT_SEND_AS_MULTI_REQUEST.
@@ -295,6 +593,8 @@ class SmartProtocol(BaseProtocol):
                     response, method, raise_on_error=raise_on_error
                 )
                 result = response.get("result", None)
+                if result_size is not None:
+                    self._response_sizes[method] = result_size
                 request_params = rp if (rp := requests.get(method)) else None
                 if iterate_list_pages and result:
                     await self._handle_response_lists(
@@ -302,6 +602,13 @@ class SmartProtocol(BaseProtocol):
                     )
                 multi_result[method] = result
 
+            if response_size is not None:
+                batch_size = len(smart_request) + response_size
+            if len(requests_step) > 1 and batch_size > self._multi_request_good_size:
+                self._multi_request_good_size = batch_size
+
+        self._handle_multi_request_success()
+
         # Multi requests don't continue after errors so requery any missing.
         # Will also query individually any DO_NOT_SEND_AS_MULTI_REQUEST.
         for method, params in requests.items():
@@ -480,27 +787,20 @@ class _ChildProtocolWrapper(SmartProtocol):
 
         return smart_method, smart_params
 
-    async def query(self, request: str | dict, retry_count: int = 3) -> dict:
-        """Wrap request inside control_child envelope."""
-        return await self._query(request, retry_count)
-
-    async def _query(self, request: str | dict, retry_count: int = 3) -> dict:
-        """Wrap request inside control_child envelope."""
+    def _get_control_child_params(self, request: dict[str, Any] | str) -> tuple:
+        """Return the child method and the control_child params for the request."""
         method, params = self._get_method_and_params_for_request(request)
         request_data = {
             "method": method,
             "params": params,
         }
-        wrapped_payload = {
-            "control_child": {
-                "device_id": self._device_id,
-                "requestData": request_data,
-            }
+        return method, {
+            "device_id": self._device_id,
+            "requestData": request_data,
         }
 
-        response = await self._protocol.query(wrapped_payload, retry_count)
-        result = response.get("control_child")
-        # Unwrap responseData for control_child
+    def _unwrap_control_child_result(self, method: str, result: Any) -> dict:
+        """Unwrap the control_child result into the child responses."""
         if result and (response_data := result.get("responseData")):
             result = response_data.get("result")
             if result and (multi_responses := result.get("responses")):
@@ -517,5 +817,22 @@ class _ChildProtocolWrapper(SmartProtocol):
 
         return {method: result}
 
+    @property
+    def circuit_state(self) -> CircuitState:
+        """Return the state of the circuit breaker of the parent connection."""
+        return self._protocol.circuit_state
+
+    async def query(self, request: str | dict, retry_count: int = 3) -> dict:
+        """Wrap request inside control_child envelope."""
+        return await self._query(request, retry_count)
+
+    async def _query(self, request: str | dict, retry_count: int = 3) -> dict:
+        """Wrap request inside control_child envelope."""
+        method, params = self._get_control_child_params(request)
+        wrapped_payload = {"control_child": params}
+
+        response = await self._protocol.query(wrapped_payload, retry_count)
+        return self._unwrap_control_child_result(method, response.get("control_child"))
+
     async def close(self) -> None:
         """Do nothing as the parent owns the protocol."""
@@ -0,0 +1,57 @@
+"""Store of device sessions to reuse them across restarts.
+
+Transports supporting session reuse save their session to the store of the
+:class:`~kasa.deviceconfig.DeviceConfig` after a handshake, and restore it
+instead of performing a new handshake when a device is next connected::
+
+    store = SessionStore("sessions.json")
+    config = DeviceConfig(host, credentials=credentials, session_store=store)
+
+The sessions contain the key material for communicating with the devices, so
+the file should be protected in the same way as the credentials.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from .jsonfile import JsonFile
+
+
+class SessionStore:
+    """Store of device sessions, optionally persisted to a json file.
+
+    The file is saved in the background, use :meth:`flush` to wait for the
+    changes to be written.
+
+    :param path: Path of the json file, the sessions are only kept in
+        memory if not provided.
+    """
+
+    def __init__(self, path: str | os.PathLike | None = None) -> None:
+        self._file = JsonFile(path, "sessions")
+        self._sessions: dict[str, dict[str, Any]] | None = None
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the session stored for the key."""
+        return self._load().get(key)
+
+    def set(self, key: str, session: dict[str, Any]) -> None:
+        """Store the session for the key."""
+        self._load()[key] = session
+        self._file.save(self._sessions)
+
+    def delete(self, key: str) -> None:
+        """Delete the session stored for the key."""
+        if self._load().pop(key, None) is not None:
+            self._file.save(self._sessions)
+
+    async def flush(self) -> None:
+        """Write the pending changes to the file."""
+        await self._file.flush()
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if self._sessions is None:
+            self._sessions = self._file.load() or {}
+        return self._sessions
@@ -83,31 +83,67 @@ class SmartChildDevice(SmartDevice):
         or test framework.
         """
         now = time.monotonic()
+        module_queries, req = self._get_module_queries(now)
+        resp = await self._query_modules(module_queries, req) if req else None
+        await self._process_update(now, module_queries, resp)
+
+    def _get_module_queries(
+        self, update_time: float
+    ) -> tuple[list[SmartModule], dict[str, Any]]:
+        """Return the modules due an update and their combined request."""
         module_queries: list[SmartModule] = []
         req: dict[str, Any] = {}
+        interests = self._get_modules_of_interest()
         for module in self.modules.values():
             if (
                 module.disabled is False
+                and (interests is None or module in interests)
                 and (mod_query := module.query())
-                and module._should_update(now)
+                and module._should_update(update_time)
             ):
                 module_queries.append(module)
                 req.update(mod_query)
-        if req:
-            first_update = self._last_update != {}
-            try:
-                resp = await self.protocol.query(req)
-            except Exception as ex:
-                resp = await self._handle_modular_update_error(
-                    ex, first_update, ", ".join(mod.name for mod in module_queries), req
-                )
+        req, _ = self._drop_known_failures(req)
+        return module_queries, req
+
+    async def _query_modules(
+        self, module_queries: list[SmartModule], req: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Query the device for the module requests handling any errors."""
+        first_update = self._last_update != {}
+        try:
+            return await self.protocol.query(req)
+        except Exception as ex:
+            return await self._handle_modular_update_error(
+                ex, first_update, ", ".join(mod.name for mod in module_queries), req
+            )
+
+    async def _process_update(
+        self,
+        update_time: float,
+        module_queries: list[SmartModule],
+        resp: dict[str, Any] | None,
+    ) -> None:
+        """Process the module query response.
+
+        The response is None if no module queries were due.
+        """
+        if resp is not None:
+            self._record_failures(resp)
+        # Methods known to fail were not queried
+        _, known_failures = self._drop_known_failures(
+            {meth: None for module in module_queries for meth in module.query()}
+        )
+        if known_failures:
+            resp = {**known_failures, **(resp or {})}
+        if resp is not None:
             self._last_update = resp
 
         for module in self.modules.values():
             await self._handle_module_post_update(
-                module, now, had_query=module in module_queries
+                module, update_time, had_query=module in module_queries
             )
-        self._last_update_time = now
+        self._last_update_time = update_time
 
         # We can first initialize the features after the first update.
         # We make here an assumption that every device has at least a single feature.
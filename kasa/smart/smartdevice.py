@@ -18,6 +18,7 @@ from ..feature import Feature
 from ..module import Module
 from ..modulemapping import ModuleMapping, ModuleName
 from ..protocols import SmartProtocol
+from ..protocols.smartprotocol import _ChildProtocolWrapper
 from ..transports import AesTransport
 from .modules import (
     ChildDevice,
@@ -52,6 +53,25 @@ class SmartDevice(Device):
     # Modules that are called as part of the init procedure on first update
     FIRST_UPDATE_MODULES = {DeviceModule, ChildDevice, Cloud}
 
+    STATE_MODULES = {
+        *Device.STATE_MODULES,
+        Module.DeviceModule,
+        Module.ChildDevice,
+    }
+
+    #: Seconds to wait before querying a method isolated as failing a batched
+    #: update again, multiplied by the number of consecutive failures
+    FAILED_METHOD_RETRY_INTERVAL_SECS = 30
+
+    #: Methods the device state depends on, never skipped as failing
+    REQUIRED_METHODS = {"get_device_info"}
+
+    #: Error codes of responses meaning that the device does not support the method
+    UNSUPPORTED_METHOD_ERRORS = {
+        SmartErrorCode.UNKNOWN_METHOD_ERROR,
+        SmartErrorCode.UNSUPPORTED_METHOD,
+    }
+
     def __init__(
         self,
         host: str,
@@ -76,6 +96,13 @@ class SmartDevice(Device):
         self._on_since: datetime | None = None
         self._info: dict[str, Any] = {}
         self._logged_missing_child_ids: set[str] = set()
+        # Responses to the cached queries sent together with the negotiation
+        self._prefetched: dict[str, Any] = {}
+        # Queries of the first update to store to the capability cache
+        self._capability_queries: dict[str, Any] | None = None
+        # Methods isolated as failing batched updates with the number of
+        # consecutive failures and the time of the last failure
+        self._failed_methods: dict[str, tuple[int, float]] = {}
 
     async def _initialize_children(self) -> None:
         """Initialize children for power strips."""
@@ -83,9 +110,153 @@ class SmartDevice(Device):
             "get_child_device_component_list": None,
             "get_child_device_list": None,
         }
-        resp = await self.protocol.query(child_info_query)
+        resp = await self._query_prefetched(child_info_query)
         self.internal_state.update(resp)
 
+    def _capability_cache_hints(self) -> dict[str, str | None]:
+        """Return the hints to look up the device in the capability cache."""
+        discovery_model = None
+        if self._discovery_info:
+            discovery_model = self._discovery_info.get("device_model")
+        return {"host": self.host, "discovery_model": discovery_model}
+
+    async def _query_negotiation(self, initial_query: dict[str, Any]) -> dict:
+        """Query the negotiation requests.
+
+        If the capability cache has an entry for the device, the cached queries of
+        the first update are sent together with the negotiation requests and
+        their responses are used instead of querying them again.
+        """
+        cache = self.config.capability_cache
+        # Children share the host and the configuration of their parent
+        if cache is None or self._parent is not None:
+            return await self.protocol.query(initial_query)
+        self._capability_queries = {}
+        if not (entry := cache.find(**self._capability_cache_hints())):
+            return await self.protocol.query(initial_query)
+
+        cached_queries = {
+            meth: params
+            for meth, params in entry["queries"].items()
+            if meth not in initial_query
+        }
+        try:
+            resp = await self.protocol.query({**initial_query, **cached_queries})
+        except AuthenticationError:
+            raise
+        except KasaException as ex:
+            _LOGGER.debug(
+                "Unable to query %s with cached queries, querying without: %s",
+                self.host,
+                ex,
+            )
+            return await self.protocol.query(initial_query)
+
+        self._prefetched = {meth: resp[meth] for meth in cached_queries if meth in resp}
+        return resp
+
+    async def _query_prefetched(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Query the requests which were not already sent with the negotiation."""
+        if self._capability_queries is not None:
+            self._capability_queries.update(request)
+        resp = {
+            meth: self._prefetched.pop(meth)
+            for meth in request
+            if meth in self._prefetched
+        }
+        if remaining := {
+            meth: params for meth, params in request.items() if meth not in resp
+        }:
+            resp.update(await self.protocol.query(remaining))
+        return resp
+
+    def _capability_key(self) -> tuple[str, str, str] | None:
+        """Return the model, hardware and firmware version of the device."""
+        if not all(self._info.get(key) for key in ("model", "hw_ver", "fw_ver")):
+            return None
+        return self._info["model"], self._info["hw_ver"], self._info["fw_ver"]
+
+    def _set_cached_capabilities(self) -> None:
+        """Store the components and queries of the first update to the cache."""
+        queries, self._capability_queries = self._capability_queries, None
+        self._prefetched = {}
+        if (
+            queries is None
+            or (cache := self.config.capability_cache) is None
+            or self._components_raw is None
+            or (key := self._capability_key()) is None
+        ):
+            return
+        unsupported = cache.get_unsupported(*key)
+        hints = self._capability_cache_hints()
+        cache.set(
+            *key,
+            components=cast(dict, self._components_raw),
+            queries={
+                meth: params
+                for meth, params in queries.items()
+                if meth not in unsupported
+            },
+            host=hints["host"],
+            discovery_model=hints["discovery_model"],
+        )
+
+    def _drop_known_failures(
+        self, request: dict[str, Any]
+    ) -> tuple[dict[str, Any], dict[str, SmartErrorCode]]:
+        """Split the methods known to fail from the request.
+
+        Methods known to be unsupported and methods isolated as failing batched
+        updates, until their retry interval has passed, are not queried.
+        Returns the remaining request and the error responses of the methods.
+        """
+        errors: dict[str, SmartErrorCode] = {}
+        now = time.monotonic()
+        for meth, (count, failed_time) in self._failed_methods.items():
+            if (
+                meth in request
+                and meth not in self.REQUIRED_METHODS
+                and now - failed_time < self.FAILED_METHOD_RETRY_INTERVAL_SECS * count
+            ):
+                errors[meth] = SmartErrorCode.INTERNAL_QUERY_ERROR
+        if (cache := self.config.capability_cache) is not None and (
+            key := self._capability_key()
+        ) is not None:
+            unsupported = cache.get_unsupported(*key)
+            errors.update(
+                {meth: unsupported[meth] for meth in request if meth in unsupported}
+            )
+        if not errors:
+            return request, {}
+        _LOGGER.debug("Not querying %s for failing methods: %s", self.host, errors)
+        return {
+            meth: params for meth, params in request.items() if meth not in errors
+        }, errors
+
+    def _record_failures(self, responses: dict[str, Any]) -> None:
+        """Record the failures of the responses.
+
+        Methods the device rejected as unsupported are stored to the capability
+        cache and methods which succeeded are no longer considered failing.
+        """
+        for meth in [
+            meth
+            for meth in self._failed_methods
+            if meth in responses and not isinstance(responses[meth], SmartErrorCode)
+        ]:
+            del self._failed_methods[meth]
+        if (cache := self.config.capability_cache) is None or (
+            key := self._capability_key()
+        ) is None:
+            return
+        if unsupported := {
+            meth: resp
+            for meth, resp in responses.items()
+            if isinstance(resp, SmartErrorCode)
+            and resp in self.UNSUPPORTED_METHOD_ERRORS
+        }:
+            cache.set_unsupported(*key, unsupported)
+
     async def _try_create_child(
         self, info: dict, child_components: dict
     ) -> SmartDevice | None:
@@ -215,7 +386,7 @@ class SmartDevice(Device):
             "get_device_info": None,
             "get_connect_cloud_state": None,
         }
-        resp = await self.protocol.query(initial_query)
+        resp = await self._query_negotiation(initial_query)
 
         # Save the initial state to allow modules access the device info already
         # during the initialization, which is necessary as some information like the
@@ -275,6 +446,8 @@ class SmartDevice(Device):
                 await self._handle_module_post_update(cloud_mod, now, had_query=True)
 
         resp = await self._modular_update(first_update, now)
+        if first_update:
+            self._set_cached_capabilities()
 
         children_changed = await self._update_children_info()
         # Call child update which will only update module calls, info is updated
@@ -283,10 +456,7 @@ class SmartDevice(Device):
         # This needs to go after updating the internal state of the children so that
         # child modules have access to their sysinfo.
         if children_changed or update_children or self.device_type != DeviceType.Hub:
-            for child in self._children.values():
-                if TYPE_CHECKING:
-                    assert isinstance(child, SmartChildDevice)
-                await child._update()
+            await self._update_children()
 
         # We can first initialize the features after the first update.
         # We make here an assumption that every device has at least a single feature.
@@ -297,6 +467,51 @@ class SmartDevice(Device):
             updated = self._last_update if first_update else resp
             _LOGGER.debug("Update completed %s: %s", self.host, list(updated.keys()))
 
+    def _is_batchable_child(self, child: SmartChildDevice) -> bool:
+        """Return true if the child module queries can be batched by the parent."""
+        return (
+            isinstance(child.protocol, _ChildProtocolWrapper)
+            and child.protocol._protocol is self.protocol
+        )
+
+    async def _update_children(self) -> None:
+        """Update the child module info.
+
+        The due module queries of all children using the parent protocol are
+        sent together as batched child requests, so the number of requests
+        scales with the number of batches rather than the number of children.
+        Children whose batched query fails are queried individually so an error
+        on one child does not affect the others.
+        """
+        now = time.monotonic()
+        batch_queries: dict[str, tuple[list[SmartModule], dict[str, Any]]] = {}
+        for child in self._children.values():
+            if TYPE_CHECKING:
+                assert isinstance(child, SmartChildDevice)
+            if not self._is_batchable_child(child):
+                await child._update()
+                continue
+            module_queries, req = child._get_module_queries(now)
+            if req:
+                batch_queries[child._id] = (module_queries, req)
+            else:
+                await child._process_update(now, module_queries, None)
+
+        if not batch_queries:
+            return
+
+        responses: dict[str, dict] = {}
+        if len(batch_queries) > 1 and self.protocol._multi_request_batch_size > 1:
+            responses = await self.protocol._query_children(
+                {child_id: req for child_id, (_, req) in batch_queries.items()}
+            )
+
+        for child_id, (module_queries, req) in batch_queries.items():
+            child = cast("SmartChildDevice", self._children[child_id])
+            if (resp := responses.get(child_id)) is None:
+                resp = await child._query_modules(module_queries, req)
+            await child._process_update(now, module_queries, resp)
+
     async def _handle_module_post_update(
         self, module: SmartModule, update_time: float, had_query: bool
     ) -> None:
@@ -307,6 +522,9 @@ class SmartDevice(Device):
         try:
             await module._post_update_hook()
             module._set_error(None)
+            # Only digest the module data when it is used to adapt the intervals
+            if had_query and self._adaptive_updates_enabled:
+                module._record_update(update_time)
         except Exception as ex:
             # Only set the error if a query happened.
             if had_query:
@@ -326,10 +544,13 @@ class SmartDevice(Device):
         # Keep a track of actual module queries so we can track the time for
         # modules that do not need to be updated frequently
         module_queries: list[SmartModule] = []
+        interests = self._get_modules_of_interest()
         mq = {
             module: query
             for module in self._modules.values()
-            if (first_update or module.disabled is False) and (query := module.query())
+            if (first_update or module.disabled is False)
+            and (interests is None or module in interests)
+            and (query := module.query())
         }
         for module, query in mq.items():
             if first_update and module.__class__ in self.FIRST_UPDATE_MODULES:
@@ -345,12 +566,28 @@ class SmartDevice(Device):
             ", ".join(mod.name for mod in module_queries),
         )
 
+        if first_update and self._capability_queries is not None:
+            self._capability_queries.update(req)
+        req, known_failures = self._drop_known_failures(req)
+        prefetched = {
+            meth: self._prefetched.pop(meth) for meth in req if meth in self._prefetched
+        }
+        if prefetched:
+            req = {
+                meth: params for meth, params in req.items() if meth not in prefetched
+            }
+
         try:
-            resp = await self.protocol.query(req)
+            if req or not (prefetched or known_failures):
+                resp = await self.protocol.query(req)
+            else:
+                resp = {}
         except Exception as ex:
             resp = await self._handle_modular_update_error(
                 ex, first_update, ", ".join(mod.name for mod in module_queries), req
             )
+        self._record_failures(resp)
+        resp = {**known_failures, **prefetched, **resp}
 
         info_resp = self._last_update if first_update else resp
         self._last_update.update(**resp)
@@ -373,8 +610,12 @@ class SmartDevice(Device):
     ) -> dict[str, Any]:
         """Handle an error on calling module update.
 
-        Will try to call all modules individually
-        and any errors such as timeouts will be set as a SmartErrorCode.
+        If the device rejected the request, the failed requests are split in
+        halves recursively to isolate the failing methods. Otherwise, such as
+        for connection errors and timeouts, the methods are queried
+        individually. Any errors are set as a SmartErrorCode and the methods
+        isolated as rejected by the device are not queried again until their
+        retry interval has passed.
         """
         msg_part = "on first update" if first_update else "after first update"
 
@@ -385,12 +626,84 @@ class SmartDevice(Device):
             msg_part,
             ex,
         )
-        responses = {}
+        if self._can_bisect(ex):
+            responses = await self._bisect_failed_query(requests, msg_part)
+        else:
+            responses = await self._query_individually(requests, msg_part)
+
+        return responses
+
+    @staticmethod
+    def _can_bisect(ex: Exception) -> bool:
+        """Return true if the error was returned by the device for the request."""
+        return isinstance(ex, DeviceError) and not isinstance(ex, AuthenticationError)
+
+    async def _bisect_failed_query(
+        self, requests: dict[str, Any], msg_part: str
+    ) -> dict[str, Any]:
+        """Query the halves of the failed requests, splitting the failing halves.
+
+        A single failing method among n requests is found with about
+        2 * log2(n) queries instead of n individual queries. The methods of a
+        half failing without a device error are queried individually.
+        """
+        if len(requests) == 1:
+            return await self._query_individually(
+                requests, msg_part, record_rejected=True
+            )
+
+        methods = list(requests)
+        middle = len(methods) // 2
+        responses: dict[str, Any] = {}
+        for half in (methods[:middle], methods[middle:]):
+            half_requests = {meth: requests[meth] for meth in half}
+            if len(half_requests) > 1:
+                try:
+                    responses.update(await self.protocol.query(half_requests))
+                    continue
+                except Exception as ex:
+                    _LOGGER.debug(
+                        "Error querying %s for module queries %s %s: %s",
+                        self.host,
+                        half,
+                        msg_part,
+                        ex,
+                    )
+                    if not self._can_bisect(ex):
+                        responses.update(
+                            await self._query_individually(half_requests, msg_part)
+                        )
+                        continue
+            responses.update(await self._bisect_failed_query(half_requests, msg_part))
+        return responses
+
+    async def _query_individually(
+        self, requests: dict[str, Any], msg_part: str, *, record_rejected: bool = False
+    ) -> dict[str, Any]:
+        """Query the methods one by one setting errors as a SmartErrorCode.
+
+        If record_rejected is set, the methods rejected by the device are not
+        queried again until their retry interval has passed.
+        """
+        responses: dict[str, Any] = {}
         for meth, params in requests.items():
             try:
                 resp = await self.protocol.query({meth: params})
                 responses[meth] = resp[meth]
             except Exception as iex:
+                if (
+                    isinstance(iex, DeviceError)
+                    and iex.error_code in self.UNSUPPORTED_METHOD_ERRORS
+                ):
+                    self._record_failures({meth: iex.error_code})
+                if (
+                    record_rejected
+                    and self._can_bisect(iex)
+                    and meth not in self.REQUIRED_METHODS
+                ):
+                    now = time.monotonic()
+                    count = self._failed_methods.get(meth, (0, now))[0] + 1
+                    self._failed_methods[meth] = (count, now)
                 _LOGGER.error(
                     "Error querying %s individually for module query '%s' %s: %s",
                     self.host,
@@ -35,6 +35,7 @@ def allow_update_after(
             return await func(self, *args, **kwargs)
         finally:
             self._last_update_time = None
+            self._reset_adaptive_interval()
 
     return _async_wrap
 
@@ -116,9 +117,12 @@ class SmartModule(Module):
             return self.UPDATE_INTERVAL_AFTER_ERROR_SECS * self._error_count
 
         if self._device._is_hub_child:
-            return self.MINIMUM_HUB_CHILD_UPDATE_INTERVAL_SECS
+            interval = self.MINIMUM_HUB_CHILD_UPDATE_INTERVAL_SECS
+        else:
+            interval = self.MINIMUM_UPDATE_INTERVAL_SECS
 
-        return self.MINIMUM_UPDATE_INTERVAL_SECS
+        interval = self._get_minimum_update_interval(interval)
+        return max(interval, self._get_adaptive_interval())
 
     @property
     def disabled(self) -> bool:
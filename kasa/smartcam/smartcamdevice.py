@@ -61,6 +61,13 @@ class SmartCamDevice(SmartDevice):
             region=basic_info.get("region"),
         )
 
+    def _is_batchable_child(self, child: SmartChildDevice) -> bool:
+        """Return true if the child module queries can be batched by the parent."""
+        return (
+            isinstance(child.protocol, _ChildCameraProtocolWrapper)
+            and child.protocol._protocol is self.protocol
+        )
+
     def _update_internal_info(self, info_resp: dict) -> None:
         """Update the internal device info."""
         info = self._try_get_response(info_resp, "getDeviceInfo")
@@ -142,7 +149,7 @@ class SmartCamDevice(SmartDevice):
             "getChildDeviceList": {"childControl": {"start_index": 0}},
             "getChildDeviceComponentList": {"childControl": {"start_index": 0}},
         }
-        resp = await self.protocol.query(child_info_query)
+        resp = await self._query_prefetched(child_info_query)
         self.internal_state.update(resp)
 
     async def _try_create_child(
@@ -206,7 +213,7 @@ class SmartCamDevice(SmartDevice):
             "getAppComponentList": {"app_component": {"name": "app_component_list"}},
             "getConnectionType": {"network": {"get_connection_type": {}}},
         }
-        resp = await self.protocol.query(initial_query)
+        resp = await self._query_negotiation(initial_query)
         self._last_update.update(resp)
         self._update_internal_info(resp)
 
@@ -1,6 +1,6 @@
 """Package containing all supported transports."""
 
-from .aestransport import AesEncyptionSession, AesTransport
+from .aestransport import AesEncyptionSession, AesTransport, KeyPairPool
 from .basetransport import BaseTransport
 from .klaptransport import KlapTransport, KlapTransportV2
 from .linkietransport import LinkieTransportV2
@@ -11,6 +11,7 @@ from .xortransport import XorEncryption, XorTransport
 __all__ = [
     "AesTransport",
     "AesEncyptionSession",
+    "KeyPairPool",
     "SslTransport",
     "SslAesTransport",
     "BaseTransport",
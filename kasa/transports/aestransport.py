@@ -6,6 +6,7 @@ under compatible GNU GPL3 license.
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import hashlib
 import logging
@@ -37,7 +38,7 @@ from kasa.httpclient import HttpClient
 from kasa.json import dumps as json_dumps
 from kasa.json import loads as json_loads
 
-from .basetransport import BaseTransport
+from .basetransport import _RenewableSessionTransport
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -60,7 +61,79 @@ class TransportState(Enum):
     ESTABLISHED = auto()  # Ready to send requests
 
 
-class AesTransport(BaseTransport):
+class KeyPairPool:
+    """Pool of key pairs generated in an executor off the event loop.
+
+    Key pairs are generated ahead of time to keep *size* of them ready, so
+    connecting many devices at once does not wait on key generation.
+
+    :param size: Number of key pairs to keep ready, 0 to only generate
+        key pairs when requested.
+    :param key_size: Size in bits of the RSA keys.
+    :param reuse: Return the same key pair every time instead of a new one
+        for each transport.
+    """
+
+    def __init__(
+        self, size: int = 0, *, key_size: int = 1024, reuse: bool = False
+    ) -> None:
+        self._size = size
+        self._key_size = key_size
+        self._reuse = reuse
+        self._key_pairs: list[KeyPair] = []
+        self._shared_key_pair: KeyPair | None = None
+        self._generating: set[asyncio.Future[KeyPair]] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def get(self) -> KeyPair:
+        """Return a key pair, generating one if none is ready."""
+        if self._reuse and self._shared_key_pair:
+            return self._shared_key_pair
+        self._check_loop()
+        if self._key_pairs:
+            key_pair = self._key_pairs.pop()
+        elif self._generating:
+            # Take over a key pair being generated for the pool
+            future = self._generating.pop()
+            key_pair = await future
+        else:
+            key_pair = await self._generate()
+        if self._reuse:
+            self._shared_key_pair = key_pair
+        else:
+            self.fill()
+        return key_pair
+
+    def fill(self) -> None:
+        """Start generating key pairs in the background to fill the pool."""
+        self._check_loop()
+        missing = self._size - len(self._key_pairs) - len(self._generating)
+        for _ in range(max(missing, 0)):
+            future = asyncio.ensure_future(self._generate())
+            self._generating.add(future)
+            future.add_done_callback(self._add_key_pair)
+
+    def _check_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Key pairs being generated are bound to the previous loop
+            self._loop = loop
+            self._generating = set()
+
+    def _add_key_pair(self, future: asyncio.Future[KeyPair]) -> None:
+        if future not in self._generating:
+            # Taken by a caller
+            return
+        self._generating.discard(future)
+        if not future.cancelled() and future.exception() is None:
+            self._key_pairs.append(future.result())
+
+    async def _generate(self) -> KeyPair:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, KeyPair.create_key_pair, self._key_size)
+
+
+class AesTransport(_RenewableSessionTransport):
     """Implementation of the AES encryption protocol.
 
     AES is the name used in device discovery for TP-Link's TAPO encryption
@@ -77,6 +150,16 @@ class AesTransport(BaseTransport):
     }
     CONTENT_LENGTH = "Content-Length"
     KEY_PAIR_CONTENT_LENGTH = 314
+    #: Pool the key pairs for handshakes are taken from, shared by the
+    #: transports unless replaced on a transport
+    key_pair_pool = KeyPairPool()
+    _SESSION_ATTRIBUTES = (
+        "_state",
+        "_encryption_session",
+        "_session_expire_at",
+        "_session_cookie",
+        "_token_url",
+    )
 
     def __init__(
         self,
@@ -175,7 +258,9 @@ class AesTransport(BaseTransport):
         else:
             url = self._app_url
 
-        encrypted_payload = self._encryption_session.encrypt(request.encode())  # type: ignore
+        # The session may be swapped by a renewal while the request is sent
+        encryption_session = self._encryption_session
+        encrypted_payload = encryption_session.encrypt(request.encode())  # type: ignore
         passthrough_request = {
             "method": "securePassthrough",
             "params": {"request": encrypted_payload.decode()},
@@ -196,7 +281,7 @@ class AesTransport(BaseTransport):
 
         if TYPE_CHECKING:
             resp_dict = cast(dict[str, Any], resp_dict)
-            assert self._encryption_session is not None
+            assert encryption_session is not None
 
         self._handle_response_error_code(
             resp_dict, "Error sending secure_passthrough message"
@@ -205,7 +290,8 @@ class AesTransport(BaseTransport):
         raw_response: str = resp_dict["result"]["response"]
 
         try:
-            response = self._encryption_session.decrypt(raw_response.encode())
+            response = encryption_session.decrypt(raw_response.encode())
+            self._last_response_size = len(response)
             ret_val = json_loads(response)
         except Exception as ex:
             try:
@@ -280,7 +366,7 @@ class AesTransport(BaseTransport):
         """
         _LOGGER.debug("Generating keypair")
         if not self._key_pair:
-            kp = KeyPair.create_key_pair()
+            kp = await self.key_pair_pool.get()
             self._config.aes_keys = {
                 "private": kp.private_key_der_b64,
                 "public": kp.public_key_der_b64,
@@ -358,6 +444,16 @@ class AesTransport(BaseTransport):
 
         _LOGGER.debug("Handshake with %s complete", self._host)
 
+    def _get_session_expires_in(self) -> float | None:
+        """Return the seconds until the session expires."""
+        if self._session_expire_at is None:
+            return None
+        return self._session_expire_at - time.time()
+
+    async def _establish_session(self) -> None:
+        await self.perform_handshake()
+        await self.perform_login()
+
     def _handshake_session_expired(self) -> bool:
         """Return true if session has expired."""
         return (
@@ -380,11 +476,13 @@ class AesTransport(BaseTransport):
             except AuthenticationError as ex:
                 self._state = TransportState.HANDSHAKE_REQUIRED
                 raise ex
+            self._schedule_session_renewal()
 
         return await self.send_secure_passthrough(request)
 
     async def close(self) -> None:
         """Close the http client and reset internal state."""
+        self._cancel_session_renewal()
         await self.reset()
         await self._http_client.close()
 
@@ -456,6 +554,14 @@ class KeyPair:
 
         return KeyPair(private_key, public_key)
 
+    @staticmethod
+    def create_from_private_pem(private_key_pem: bytes) -> KeyPair:
+        """Create a key pair from an unencrypted PEM encoded private key."""
+        private_key = serialization.load_pem_private_key(private_key_pem, None)
+        if not isinstance(private_key, rsa.RSAPrivateKey):
+            raise ValueError("Private key is not an RSA key")
+        return KeyPair(private_key, private_key.public_key())
+
     def __init__(
         self, private_key: rsa.RSAPrivateKey, public_key: rsa.RSAPublicKey
     ) -> None:
@@ -480,6 +586,14 @@ class KeyPair:
             format=serialization.PublicFormat.SubjectPublicKeyInfo,
         )
 
+    def get_private_pem(self) -> bytes:
+        """Get unencrypted private key in PEM encoding."""
+        return self.private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+
     def decrypt_handshake_key(self, encrypted_key: bytes) -> bytes:
         """Decrypt an aes handshake key."""
         decrypted = self.private_key.decrypt(
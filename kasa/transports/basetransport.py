@@ -5,12 +5,21 @@ All transport classes must derive from this to implement the common interface.
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import contextvars
+import copy
+import logging
 from abc import ABC, abstractmethod
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from kasa import DeviceConfig
 
+_LOGGER = logging.getLogger(__name__)
+
 
 class BaseTransport(ABC):
     """Base class for all TP-Link protocol transports."""
@@ -31,6 +40,8 @@ class BaseTransport(ABC):
         if not config.timeout:
             config.timeout = self.DEFAULT_TIMEOUT
         self._timeout = config.timeout
+        #: Length of the last decoded response if known by the transport
+        self._last_response_size: int | None = None
 
     @property
     @abstractmethod
@@ -53,3 +64,82 @@ class BaseTransport(ABC):
     @abstractmethod
     async def reset(self) -> None:
         """Reset internal state."""
+
+
+class _RenewableSessionTransport(BaseTransport):
+    """Base class for transports able to renew their session in the background."""
+
+    #: Seconds before the session expires to renew it in the background
+    SESSION_RENEWAL_SECONDS = 300
+    #: Attributes holding the session, swapped in when a session is renewed
+    _SESSION_ATTRIBUTES: tuple[str, ...] = ()
+
+    def __init__(
+        self,
+        *,
+        config: DeviceConfig,
+    ) -> None:
+        super().__init__(config=config)
+        self._session_renewal_task: asyncio.Task | None = None
+        #: Context serializing the renewal with the requests, set by the protocol
+        self._session_renewal_lock: Callable[[], AbstractAsyncContextManager] = (
+            contextlib.nullcontext
+        )
+
+    @abstractmethod
+    def _get_session_expires_in(self) -> float | None:
+        """Return the seconds until the session expires, if it expires."""
+
+    @abstractmethod
+    async def _establish_session(self) -> None:
+        """Establish a new session with the device."""
+
+    def _schedule_session_renewal(self) -> None:
+        """Renew the session in the background shortly before it expires.
+
+        Does nothing unless session renewal is enabled in the config.
+        """
+        if (
+            not self._config.session_renewal
+            or (expires_in := self._get_session_expires_in()) is None
+        ):
+            return
+        self._cancel_session_renewal()
+        delay = max(expires_in - self.SESSION_RENEWAL_SECONDS, 0)
+        # Run in a new context so the renewal is not bound by the query deadline
+        self._session_renewal_task = asyncio.create_task(
+            self._renew_session(delay), context=contextvars.Context()
+        )
+
+    def _cancel_session_renewal(self) -> None:
+        if self._session_renewal_task is not None:
+            self._session_renewal_task.cancel()
+            self._session_renewal_task = None
+
+    async def _renew_session(self, delay: float) -> None:
+        """Establish a new session after the delay and swap it in.
+
+        The session is established between the requests to the device, on a
+        copy of the transport so a failed renewal leaves the current session
+        in place. Requests establishing a new session cancel the renewal.
+        """
+        await asyncio.sleep(delay)
+        async with self._session_renewal_lock():
+            renewed = copy.copy(self)
+            renewed._session_renewal_task = None
+            try:
+                await renewed._establish_session()
+            except Exception as ex:
+                _LOGGER.debug(
+                    "Unable to renew the session with %s, it will be renewed "
+                    "on the next request: %s",
+                    self._host,
+                    ex,
+                )
+                self._session_renewal_task = None
+                return
+            for attribute in self._SESSION_ATTRIBUTES:
+                setattr(self, attribute, getattr(renewed, attribute))
+        _LOGGER.debug("Renewed the session with %s", self._host)
+        self._session_renewal_task = None
+        self._schedule_session_renewal()
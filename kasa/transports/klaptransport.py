@@ -66,7 +66,7 @@ from kasa.httpclient import HttpClient
 from kasa.json import loads as json_loads
 from kasa.protocols.protocol import md5
 
-from .basetransport import BaseTransport
+from .basetransport import _RenewableSessionTransport
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -85,7 +85,7 @@ def _sha1(payload: bytes) -> bytes:
     return hashlib.sha1(payload).digest()  # noqa: S324
 
 
-class KlapTransport(BaseTransport):
+class KlapTransport(_RenewableSessionTransport):
     """Implementation of the KLAP encryption protocol.
 
     KLAP is the name used in device discovery for TP-Link's new encryption
@@ -108,6 +108,12 @@ class KlapTransport(BaseTransport):
         ]
     )
     _ssl_context: ssl.SSLContext | None = None
+    _SESSION_ATTRIBUTES = (
+        "_handshake_done",
+        "_encryption_session",
+        "_session_expire_at",
+        "_session_cookie",
+    )
 
     def __init__(
         self,
@@ -137,6 +143,7 @@ class KlapTransport(BaseTransport):
         self._session_expire_at: float | None = None
 
         self._session_cookie: dict[str, Any] | None = None
+        self._session_store = config.session_store
 
         _LOGGER.debug("Created KLAP transport for %s", self._host)
         protocol = "https" if config.connection_type.https else "http"
@@ -338,9 +345,70 @@ class KlapTransport(BaseTransport):
             local_seed, remote_seed, auth_hash
         )
         self._handshake_done = True
+        self._save_session()
 
         _LOGGER.debug("Handshake with %s complete", self._host)
 
+    @property
+    def _session_store_key(self) -> str:
+        """Return the key of the session in the session store."""
+        return f"klap:{self._host}:{self._port}:{_sha256(self._local_auth_hash).hex()}"
+
+    def _save_session(self) -> None:
+        """Save the session to the session store if configured."""
+        if (
+            self._session_store is None
+            or self._encryption_session is None
+            or self._session_expire_at is None
+        ):
+            return
+        expires_at = time.time() + self._session_expire_at - time.monotonic()
+        self._session_store.set(
+            self._session_store_key,
+            {
+                "cookie": self._session_cookie,
+                "expires_at": expires_at,
+                "encryption_session": self._encryption_session.to_dict(),
+            },
+        )
+
+    def _restore_session(self) -> bool:
+        """Restore the session from the session store if configured.
+
+        Sessions are only restored before the first handshake and if they
+        have not expired.
+        """
+        if self._session_store is None or self._encryption_session is not None:
+            return False
+        if not (session := self._session_store.get(self._session_store_key)):
+            return False
+        if (expires_in := session["expires_at"] - time.time()) <= 0:
+            self._session_store.delete(self._session_store_key)
+            return False
+        try:
+            encryption_session = KlapEncryptionSession.from_dict(
+                session["encryption_session"]
+            )
+        except (KeyError, TypeError, ValueError) as ex:
+            _LOGGER.debug("Unable to restore session for %s: %s", self._host, ex)
+            self._session_store.delete(self._session_store_key)
+            return False
+        self._encryption_session = encryption_session
+        self._session_cookie = session["cookie"]
+        self._session_expire_at = time.monotonic() + expires_in
+        self._handshake_done = True
+        _LOGGER.debug("Restored session with %s", self._host)
+        return True
+
+    def _get_session_expires_in(self) -> float | None:
+        """Return the seconds until the session expires."""
+        if self._session_expire_at is None:
+            return None
+        return self._session_expire_at - time.monotonic()
+
+    async def _establish_session(self) -> None:
+        await self.perform_handshake()
+
     def _handshake_session_expired(self) -> bool:
         """Return true if session has expired."""
         return (
@@ -351,11 +419,15 @@ class KlapTransport(BaseTransport):
     async def send(self, request: str) -> Generator[Future, None, dict[str, str]]:  # type: ignore[override]
         """Send the request."""
         if not self._handshake_done or self._handshake_session_expired():
-            await self.perform_handshake()
+            if not self._restore_session():
+                await self.perform_handshake()
+            self._schedule_session_renewal()
 
+        # The session may be swapped by a renewal while the request is sent
+        encryption_session = self._encryption_session
         # Check for mypy
-        if self._encryption_session is not None:
-            payload, seq = self._encryption_session.encrypt(request.encode())
+        if encryption_session is not None:
+            payload, seq = encryption_session.encrypt(request.encode())
 
         response_status, response_data = await self._http_client.post(
             self._request_url,
@@ -375,6 +447,8 @@ class KlapTransport(BaseTransport):
             # If we failed with a security error, force a new handshake next time.
             if response_status == 403:
                 self._handshake_done = False
+                if self._session_store is not None:
+                    self._session_store.delete(self._session_store_key)
                 raise _RetryableError(
                     "Got a security error from %s after handshake completed", self._host
                 )
@@ -387,15 +461,16 @@ class KlapTransport(BaseTransport):
             _LOGGER.debug("Device %s query posted %s", self._host, msg)
 
             if TYPE_CHECKING:
-                assert self._encryption_session
+                assert encryption_session
                 assert isinstance(response_data, bytes)
             try:
-                decrypted_response = self._encryption_session.decrypt(response_data)
+                decrypted_response = encryption_session.decrypt(response_data)
             except Exception as ex:
                 raise KasaException(
                     f"Error trying to decrypt device {self._host} response: {ex}"
                 ) from ex
 
+            self._last_response_size = len(decrypted_response)
             json_payload = json_loads(decrypted_response)
 
             _LOGGER.debug("Device %s query response received", self._host)
@@ -404,6 +479,10 @@ class KlapTransport(BaseTransport):
 
     async def close(self) -> None:
         """Close the http client and reset internal state."""
+        self._cancel_session_renewal()
+        if self._handshake_done:
+            # Save the current sequence number for the session to be restored
+            self._save_session()
         await self.reset()
         await self._http_client.close()
 
@@ -500,6 +579,37 @@ class KlapEncryptionSession:
         self._aes = algorithms.AES(self._key)
         self._sig = self._sig_derive(local_seed, remote_seed, user_hash)
 
+    def to_dict(self) -> dict[str, Any]:
+        """Return the session state to be restored with :meth:`from_dict`."""
+        return {
+            **{
+                name: base64.b64encode(value).decode()
+                for name, value in (
+                    ("local_seed", self.local_seed),
+                    ("remote_seed", self.remote_seed),
+                    ("user_hash", self.user_hash),
+                    ("key", self._key),
+                    ("iv", self._iv),
+                    ("sig", self._sig),
+                )
+            },
+            "seq": self._seq,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> KlapEncryptionSession:
+        """Restore a session from the state returned by :meth:`to_dict`."""
+        session = cls.__new__(cls)
+        session.local_seed = base64.b64decode(data["local_seed"])
+        session.remote_seed = base64.b64decode(data["remote_seed"])
+        session.user_hash = base64.b64decode(data["user_hash"])
+        session._key = base64.b64decode(data["key"])
+        session._iv = base64.b64decode(data["iv"])
+        session._sig = base64.b64decode(data["sig"])
+        session._seq = int(data["seq"])
+        session._aes = algorithms.AES(session._key)
+        return session
+
     def _key_derive(
         self, local_seed: bytes, remote_seed: bytes, user_hash: bytes
     ) -> bytes:
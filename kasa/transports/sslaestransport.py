@@ -289,6 +289,7 @@ class SslAesTransport(BaseTransport):
 
         try:
             response = self._encryption_session.decrypt(raw_response.encode())
+            self._last_response_size = len(response)
             ret_val = json_loads(response)
         except Exception as ex:
             try:
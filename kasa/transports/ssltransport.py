@@ -30,7 +30,8 @@ from kasa.exceptions import (
 from kasa.httpclient import HttpClient
 from kasa.json import dumps as json_dumps
 from kasa.json import loads as json_loads
-from kasa.transports import BaseTransport
+
+from .basetransport import _RenewableSessionTransport
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -50,7 +51,7 @@ class TransportState(Enum):
     ESTABLISHED = auto()  # Ready to send requests
 
 
-class SslTransport(BaseTransport):
+class SslTransport(_RenewableSessionTransport):
     """Implementation of the cleartext transport protocol.
 
     This transport uses HTTPS without any further payload encryption.
@@ -61,6 +62,7 @@ class SslTransport(BaseTransport):
         "Content-Type": "application/json",
     }
     BACKOFF_SECONDS_AFTER_LOGIN_ERROR = 1
+    _SESSION_ATTRIBUTES = ("_state", "_session_expire_at", "_app_url")
 
     def __init__(
         self,
@@ -208,6 +210,16 @@ class SslTransport(BaseTransport):
             time.time() + ONE_DAY_SECONDS - SESSION_EXPIRE_BUFFER_SECONDS
         )
 
+    def _get_session_expires_in(self) -> float | None:
+        """Return the seconds until the session expires."""
+        if self._session_expire_at is None:
+            return None
+        return self._session_expire_at - time.time()
+
+    async def _establish_session(self) -> None:
+        await self.reset()
+        await self.perform_login()
+
     def _session_expired(self) -> bool:
         """Return true if session has expired."""
         return (
@@ -221,11 +233,13 @@ class SslTransport(BaseTransport):
         if self._state is not TransportState.ESTABLISHED or self._session_expired():
             _LOGGER.debug("Transport not established or session expired, logging in")
             await self.perform_login()
+            self._schedule_session_renewal()
 
         return await self.send_request(request)
 
     async def close(self) -> None:
         """Close the http client and reset internal state."""
+        self._cancel_session_renewal()
         await self.reset()
         await self._http_client.close()
 
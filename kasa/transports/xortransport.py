@@ -21,9 +21,9 @@ import struct
 from asyncio import timeout as asyncio_timeout
 from collections.abc import Generator
 
+from kasa.deadline import get_timeout, get_timeout_error
 from kasa.deviceconfig import DeviceConfig
 from kasa.exceptions import KasaException, _RetryableError
-from kasa.exceptions import TimeoutError as KasaTimeoutError
 from kasa.json import loads as json_loads
 
 from .basetransport import BaseTransport
@@ -56,7 +56,7 @@ class XorTransport(BaseTransport):
         """The hashed credentials used by the transport."""
         return None
 
-    async def _connect(self, timeout: int) -> None:
+    async def _connect(self, timeout: float | None) -> None:
         """Try to connect or reconnect to the device."""
         if self.writer:
             return
@@ -125,12 +125,13 @@ class XorTransport(BaseTransport):
         # connection open/close operations in the same time frame can block
         # the event loop.
         # This is especially import when there are multiple tplink devices being polled.
+        timeout = get_timeout(self._timeout)
         try:
-            await self._connect(self._timeout)
+            await self._connect(timeout)
         except TimeoutError as ex:
             await self.reset()
-            raise KasaTimeoutError(
-                f"Timeout after {self._timeout} seconds connecting to the device:"
+            raise get_timeout_error(timeout, self._timeout)(
+                f"Timeout after {timeout} seconds connecting to the device:"
                 f" {self._host}:{self._port}: {ex}"
             ) from ex
         except ConnectionRefusedError as ex:
@@ -159,15 +160,16 @@ class XorTransport(BaseTransport):
             self.close_without_wait()
             raise
 
+        timeout = get_timeout(self._timeout)
         try:
             assert self.reader is not None  # noqa: S101
             assert self.writer is not None  # noqa: S101
-            async with asyncio_timeout(self._timeout):
+            async with asyncio_timeout(timeout):
                 return await self._execute_send(request)
         except TimeoutError as ex:
             await self.reset()
-            raise KasaTimeoutError(
-                f"Timeout after {self._timeout} seconds sending request to the device"
+            raise get_timeout_error(timeout, self._timeout)(
+                f"Timeout after {timeout} seconds sending request to the device"
                 f" {self._host}:{self._port}: {ex}"
             ) from ex
         except Exception as ex:
@@ -454,6 +454,9 @@ async def get_device_for_fixture(
     # of DeviceType.Hub
     class DummyParent:
         device_type = DeviceType.Hub
+        _update_interests = None
+        _adaptive_max_interval = None
+        _module_update_intervals = None
 
     if fixture_data.protocol in {"SMARTCAM.CHILD"}:
         d._parent = DummyParent()
@@ -292,9 +292,6 @@ def patch_discovery(fixture_infos: dict[str, FixtureInfo], mocker):
         Handles test cases modifying the ip and hostname of the first fixture
         for discover_single testing.
         """
-        finished_event = asyncio.Event()
-        asyncio.create_task(process_callback_queue(finished_event))
-
         for ip, dm in discovery_mocks.items():
             first_ip = list(discovery_mocks.values())[0].ip
             fixture_info = fixture_infos[ip]
@@ -321,6 +318,9 @@ def patch_discovery(fixture_infos: dict[str, FixtureInfo], mocker):
                 dm._datagram,
                 (dm.ip, port),
             )
+        await self.wait_for_responses()
+        finished_event = asyncio.Event()
+        asyncio.create_task(process_callback_queue(finished_event))
         # Setting this event will stop the processing of callbacks
         finished_event.set()
 
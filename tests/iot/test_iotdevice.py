@@ -1,6 +1,7 @@
 """Module for common iotdevice tests."""
 
 import re
+import time
 from datetime import datetime
 
 import pytest
@@ -18,7 +19,9 @@ from voluptuous import (
 
 from kasa import DeviceType, KasaException, Module
 from kasa.iot import IotDevice
+from kasa.iot.iotdevice import _MODEL_RESPONSE_SIZES
 from kasa.iot.iotmodule import _merge_dict
+from kasa.json import dumps as json_dumps
 from tests.conftest import get_device_for_fixture_protocol, handle_turn_on, turn_on
 from tests.device_fixtures import device_iot, has_emeter_iot, no_emeter_iot
 from tests.fakeprotocol_iot import FakeIotProtocol
@@ -101,6 +104,8 @@ async def test_initial_update_emeter(dev, mocker):
     """Test that the initial update performs second query if emeter is available."""
     dev._last_update = {}
     dev._legacy_features = set()
+    # Use the module estimates rather than the measured response sizes
+    mocker.patch.dict(_MODEL_RESPONSE_SIZES, clear=True)
     spy = mocker.spy(dev.protocol, "query")
     await dev.update()
     # Devices with small buffers may require 3 queries
@@ -257,6 +262,90 @@ async def test_estimated_response_sizes(dev):
         assert mod.estimated_query_response_size > 0
 
 
+@device_iot
+async def test_response_sizes(dev: IotDevice, mocker):
+    """Test that measured response sizes are used to split the queries."""
+    mocker.patch.dict(_MODEL_RESPONSE_SIZES, clear=True)
+    for mod in dev.modules.values():
+        mod._last_update_time = None
+    await dev.update()
+    response_sizes = dev.response_sizes
+    assert response_sizes["system"] == len(json_dumps(dev._last_update["system"]))
+    queried = [
+        mod
+        for mod in dev.modules.values()
+        if mod.query() and isinstance(dev._last_update.get(mod._module), dict)
+    ]
+    for mod in queried:
+        assert response_sizes[mod._module] > 0
+
+    # A module larger than the device buffer is queried on its own
+    module = next(iter(queried), None)
+    if module is None:
+        pytest.skip("Device has no module queries")
+    dev._get_response_sizes()[module._module] = dev.max_device_response_size
+    module._last_update_time = None
+    requests, _ = dev._get_update_requests({}, time.monotonic())
+    assert {module._module} in [set(request) for request in requests]
+
+
+def _get_query_methods(modules) -> set[tuple[str, str]]:
+    return {
+        (namespace, method)
+        for module in modules
+        for namespace, methods in module.query().items()
+        for method in methods
+    }
+
+
+@device_iot
+async def test_module_update_interval(dev: IotDevice, mocker):
+    """Test that modules are only queried once their update interval passed."""
+    modules = [
+        mod for device in [dev, *dev.children] for mod in device.modules.values()
+    ]
+    gated = [
+        mod
+        for mod in modules
+        if mod.update_interval and mod._module in mod._device._last_update
+    ]
+    gated_methods = _get_query_methods(gated) - _get_query_methods(
+        [mod for mod in modules if not mod.update_interval]
+    )
+    if not gated_methods:
+        pytest.skip("Device has no modules with an update interval")
+
+    def _get_sent_methods(spy) -> set[tuple[str, str]]:
+        return {
+            (namespace, method)
+            for call in spy.call_args_list
+            for namespace, methods in call.args[0].items()
+            if namespace != "context"
+            for method in methods
+        }
+
+    await dev.update()
+    spy = mocker.spy(dev.protocol, "query")
+    await dev.update()
+    assert not gated_methods & _get_sent_methods(spy)
+
+    for mod in gated:
+        if mod._last_update_time is not None:
+            mod._last_update_time -= mod.update_interval
+    spy.reset_mock()
+    await dev.update()
+    assert gated_methods & _get_sent_methods(spy)
+
+
+@device_iot
+async def test_module_setter_allows_update(dev: IotDevice):
+    """Test that calling a setter updates the module in the next update."""
+    time_mod = dev.modules[Module.Time]
+    assert time_mod._last_update_time is not None
+    await time_mod.set_time(time_mod.time)
+    assert time_mod._last_update_time is None
+
+
 @device_iot
 async def test_modules_not_supported(dev: IotDevice):
     """Test that unsupported modules do not break the device."""
@@ -14,14 +14,24 @@ from unittest.mock import AsyncMock
 import pytest
 
 from kasa.credentials import Credentials
+from kasa.deadline import query_deadline
 from kasa.device import Device
 from kasa.deviceconfig import DeviceConfig
-from kasa.exceptions import KasaException, TimeoutError
+from kasa.exceptions import (
+    DeviceUnavailableError,
+    KasaException,
+    TimeoutError,
+    _ConnectionError,
+    _DeadlineExceededError,
+)
 from kasa.iot import IotDevice
 from kasa.protocols.iotprotocol import IotProtocol, _deprecated_TPLinkSmartHomeProtocol
 from kasa.protocols.protocol import (
     BaseProtocol,
+    CircuitState,
+    QueryPriority,
     mask_mac,
+    query_priority,
     redact_data,
 )
 from kasa.transports.aestransport import AesTransport
@@ -951,3 +961,305 @@ async def test_redact_data():
     redacted_data = redact_data(data, REDACTORS)
 
     assert redacted_data == excpected_data
+
+
+async def test_iot_query_single_flight(mocker):
+    """Test that concurrent identical read only queries are coalesced."""
+    host = "127.0.0.1"
+    protocol = IotProtocol(transport=XorTransport(config=DeviceConfig(host)))
+    send_event = asyncio.Event()
+
+    async def _send(request: str):
+        await send_event.wait()
+        return {"system": {"get_sysinfo": {"alias": "foo"}}}
+
+    send_mock = mocker.patch.object(protocol._transport, "send", side_effect=_send)
+    get_request = {"system": {"get_sysinfo": {}}}
+    set_request = {"system": {"set_dev_alias": {"alias": "foo"}}}
+
+    tasks = [
+        asyncio.create_task(protocol.query(request))
+        for request in [get_request, get_request, set_request, set_request]
+    ]
+    await asyncio.sleep(0)
+    send_event.set()
+    results = await asyncio.gather(*tasks)
+
+    assert send_mock.call_count == 3
+    assert protocol.coalesced_query_count == 1
+    assert results[0] == results[1]
+    assert results[0] is not results[1]
+
+
+async def test_iot_query_single_flight_error(mocker):
+    """Test that an error from a coalesced query is raised to all callers."""
+    host = "127.0.0.1"
+    protocol = IotProtocol(transport=XorTransport(config=DeviceConfig(host)))
+    send_event = asyncio.Event()
+
+    async def _send(request: str):
+        await send_event.wait()
+        raise KasaException("Error")
+
+    send_mock = mocker.patch.object(protocol._transport, "send", side_effect=_send)
+    mocker.patch.object(protocol._transport, "reset")
+    tasks = [
+        asyncio.create_task(protocol.query({"system": {"get_sysinfo": {}}}))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    send_event.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert send_mock.call_count == 1
+    assert protocol.coalesced_query_count == 2
+    assert all(isinstance(result, KasaException) for result in results)
+    assert not protocol._in_flight_queries
+
+
+async def test_iot_query_single_flight_cancelled(mocker):
+    """Test that a waiter queries again if the query in flight is cancelled."""
+    host = "127.0.0.1"
+    protocol = IotProtocol(transport=XorTransport(config=DeviceConfig(host)))
+    send_event = asyncio.Event()
+
+    async def _send(request: str):
+        await send_event.wait()
+        return {"system": {"get_sysinfo": {}}}
+
+    send_mock = mocker.patch.object(protocol._transport, "send", side_effect=_send)
+    first = asyncio.create_task(protocol.query({"system": {"get_sysinfo": {}}}))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(protocol.query({"system": {"get_sysinfo": {}}}))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    send_event.set()
+
+    assert await second == {"system": {"get_sysinfo": {}}}
+    assert first.cancelled()
+    assert send_mock.call_count == 2
+    assert protocol.coalesced_query_count == 0
+
+
+async def test_query_priority_order(mocker):
+    """Test that waiting queries are sent by priority and then in order."""
+    host = "127.0.0.1"
+    protocol = IotProtocol(transport=XorTransport(config=DeviceConfig(host)))
+    send_event = asyncio.Event()
+    sent = []
+
+    async def _send(request: str):
+        sent.append(json.loads(request))
+        await send_event.wait()
+        return {}
+
+    mocker.patch.object(protocol._transport, "send", side_effect=_send)
+
+    async def _query(request, priority=None):
+        if priority is None:
+            return await protocol.query(request)
+        with query_priority(priority):
+            return await protocol.query(request)
+
+    get_sysinfo = {"system": {"get_sysinfo": {}}}
+    get_time = {"time": {"get_time": {}}}
+    get_realtime = {"emeter": {"get_realtime": {}}}
+    set_alias = {"system": {"set_dev_alias": {"alias": "foo"}}}
+    tasks = [asyncio.create_task(_query(get_sysinfo))]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(_query(get_time, QueryPriority.Background)))
+    tasks.append(asyncio.create_task(_query(get_realtime)))
+    tasks.append(asyncio.create_task(_query(set_alias)))
+    await asyncio.sleep(0)
+    send_event.set()
+    await asyncio.gather(*tasks)
+
+    assert sent == [get_sysinfo, set_alias, get_realtime, get_time]
+    stats = protocol.query_wait_stats
+    assert stats[QueryPriority.Interactive]["count"] == 1
+    assert stats[QueryPriority.Normal]["count"] == 2
+    assert stats[QueryPriority.Background]["count"] == 1
+    assert not protocol._query_lock.locked()
+
+
+async def test_query_priority_cancelled_waiter(mocker):
+    """Test that a cancelled waiter does not keep the lock."""
+    host = "127.0.0.1"
+    protocol = IotProtocol(transport=XorTransport(config=DeviceConfig(host)))
+    send_event = asyncio.Event()
+
+    async def _send(request: str):
+        await send_event.wait()
+        return {}
+
+    send_mock = mocker.patch.object(protocol._transport, "send", side_effect=_send)
+    first = asyncio.create_task(protocol.query({"system": {"set_led_off": {}}}))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(protocol.query({"system": {"set_relay_state": {}}}))
+    await asyncio.sleep(0)
+    second.cancel()
+    send_event.set()
+    await first
+    with pytest.raises(asyncio.CancelledError):
+        await second
+
+    assert send_mock.call_count == 1
+    assert not protocol._query_lock.locked()
+
+
+async def test_circuit_breaker(mocker):
+    """Test that queries fail fast after consecutive connection failures."""
+    host = "127.0.0.1"
+    config = DeviceConfig(host, circuit_breaker=True)
+    protocol = IotProtocol(transport=XorTransport(config=config))
+    dev = IotDevice(host, protocol=protocol)
+    sent = []
+    reachable = False
+
+    async def _send(request: str):
+        sent.append(json.loads(request))
+        if not reachable:
+            raise _ConnectionError("Unable to connect")
+        return {"system": {"get_sysinfo": {}, "set_led_off": {}}}
+
+    mocker.patch.object(protocol._transport, "send", side_effect=_send)
+    mocker.patch.object(protocol._transport, "reset")
+    request = {"system": {"set_led_off": {"off": 1}}}
+    probe = json.loads(IotProtocol.CIRCUIT_PROBE_REQUEST)
+
+    for _ in range(protocol.CIRCUIT_FAILURE_THRESHOLD):
+        assert dev.circuit_state is CircuitState.Closed
+        with pytest.raises(_ConnectionError):
+            await protocol.query(request, retry_count=0)
+
+    assert dev.circuit_state is CircuitState.Open
+    with pytest.raises(DeviceUnavailableError) as ex:
+        await protocol.query(request, retry_count=0)
+    assert 0 < ex.value.retry_after <= protocol.CIRCUIT_RESET_TIMEOUT
+    assert len(sent) == protocol.CIRCUIT_FAILURE_THRESHOLD
+
+    # A failed probe doubles the reset timeout
+    protocol._circuit_breaker._opened_at -= protocol.CIRCUIT_RESET_TIMEOUT
+    assert dev.circuit_state is CircuitState.HalfOpen
+    sent.clear()
+    with pytest.raises(_ConnectionError):
+        await protocol.query(request)
+    assert sent == [probe]
+    assert dev.circuit_state is CircuitState.Open
+    assert protocol._circuit_breaker.retry_after > protocol.CIRCUIT_RESET_TIMEOUT
+
+    # A successful probe closes the circuit
+    protocol._circuit_breaker._opened_at -= 2 * protocol.CIRCUIT_RESET_TIMEOUT
+    reachable = True
+    sent.clear()
+    await protocol.query(request)
+    assert sent == [probe, request]
+    assert dev.circuit_state is CircuitState.Closed
+    assert protocol._circuit_breaker.failures == 0
+
+
+async def test_circuit_breaker_device_error(mocker):
+    """Test that device errors do not count as connection failures."""
+    host = "127.0.0.1"
+    config = DeviceConfig(host, circuit_breaker=True)
+    protocol = IotProtocol(transport=XorTransport(config=config))
+    mocker.patch.object(
+        protocol._transport, "send", side_effect=KasaException("Device error")
+    )
+    for _ in range(protocol.CIRCUIT_FAILURE_THRESHOLD + 1):
+        with pytest.raises(KasaException):
+            await protocol.query({"system": {"get_sysinfo": {}}}, retry_count=0)
+
+    assert protocol.circuit_state is CircuitState.Closed
+
+
+async def test_circuit_breaker_disabled(mocker):
+    """Test that queries are always sent without the circuit breaker enabled."""
+    host = "127.0.0.1"
+    protocol = IotProtocol(transport=XorTransport(config=DeviceConfig(host)))
+    send_mock = mocker.patch.object(
+        protocol._transport, "send", side_effect=_ConnectionError("Unable to connect")
+    )
+    mocker.patch.object(protocol._transport, "reset")
+    for _ in range(protocol.CIRCUIT_FAILURE_THRESHOLD + 1):
+        with pytest.raises(_ConnectionError):
+            await protocol.query({"system": {"get_sysinfo": {}}}, retry_count=0)
+
+    assert send_mock.call_count == protocol.CIRCUIT_FAILURE_THRESHOLD + 1
+    assert protocol.circuit_state is CircuitState.Closed
+
+
+async def test_query_deadline(mocker):
+    """Test that retries which cannot finish before the deadline are skipped."""
+    host = "127.0.0.1"
+    protocol = IotProtocol(transport=XorTransport(config=DeviceConfig(host)))
+    send_mock = mocker.patch.object(
+        protocol._transport, "send", side_effect=TimeoutError("Timed out")
+    )
+    mocker.patch.object(protocol._transport, "reset")
+    mocker.patch.object(protocol, "BACKOFF_SECONDS_AFTER_TIMEOUT", 0.1)
+
+    with query_deadline(0.55), pytest.raises(TimeoutError):
+        await protocol.query({"system": {"get_sysinfo": {}}})
+    assert send_mock.call_count == 1
+
+    send_mock.reset_mock()
+    with pytest.raises(TimeoutError):
+        await protocol.query({"system": {"get_sysinfo": {}}})
+    assert send_mock.call_count == 4
+
+
+async def test_query_deadline_waiting(mocker):
+    """Test that waiting for the device counts towards the deadline."""
+    host = "127.0.0.1"
+    protocol = IotProtocol(transport=XorTransport(config=DeviceConfig(host)))
+    send_event = asyncio.Event()
+
+    async def _send(request: str):
+        await send_event.wait()
+        return {}
+
+    mocker.patch.object(protocol._transport, "send", side_effect=_send)
+    first = asyncio.create_task(protocol.query({"system": {"set_led_off": {}}}))
+    await asyncio.sleep(0)
+    with (
+        query_deadline(0.01),
+        pytest.raises(TimeoutError, match="deadline exceeded"),
+    ):
+        await protocol.query({"system": {"set_relay_state": {}}})
+    send_event.set()
+    await first
+    assert not protocol._query_lock.locked()
+
+
+async def test_xor_transport_deadline(mocker):
+    """Test that the xor transport timeout is shrunk to the deadline."""
+    transport = XorTransport(config=DeviceConfig("127.0.0.1", timeout=5))
+    connect = mocker.patch.object(
+        transport, "_connect", side_effect=asyncio.TimeoutError
+    )
+    with query_deadline(1), pytest.raises(_DeadlineExceededError):
+        await transport.send('{"system": {"get_sysinfo": {}}}')
+    assert 0 < connect.call_args.args[0] <= 1
+
+    # Timeouts not shrunk by a deadline are device timeouts
+    with pytest.raises(TimeoutError) as ex:
+        await transport.send('{"system": {"get_sysinfo": {}}}')
+    assert not isinstance(ex.value, _DeadlineExceededError)
+
+
+async def test_circuit_breaker_deadline(mocker):
+    """Test that queries running out of time do not open the circuit."""
+    host = "127.0.0.1"
+    config = DeviceConfig(host, timeout=5, circuit_breaker=True)
+    protocol = IotProtocol(transport=XorTransport(config=config))
+    mocker.patch.object(
+        protocol._transport, "_connect", side_effect=asyncio.TimeoutError
+    )
+    for _ in range(protocol.CIRCUIT_FAILURE_THRESHOLD + 1):
+        with query_deadline(0.6), pytest.raises(_DeadlineExceededError):
+            await protocol.query({"system": {"get_sysinfo": {}}})
+
+    assert protocol.circuit_state is CircuitState.Closed
+    assert protocol._circuit_breaker.failures == 0
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 import pytest
@@ -10,6 +11,9 @@ from kasa.exceptions import (
     KasaException,
     SmartErrorCode,
 )
+from kasa.json import dumps as json_dumps
+from kasa.json import loads as json_loads
+from kasa.protocols import QueryPriority, query_priority
 from kasa.protocols.smartcamprotocol import SmartCamProtocol
 from kasa.protocols.smartprotocol import SmartProtocol, _ChildProtocolWrapper
 from kasa.smart import SmartDevice
@@ -225,6 +229,366 @@ async def test_smart_device_multiple_request_non_json_decode_failure(
     assert send_mock.call_count == 1
 
 
+def _limited_multi_request_send(transport, max_requests: int):
+    """Return a send mock raising JSON_DECODE_FAIL_ERROR for large batches."""
+
+    async def _send(request: str):
+        response = _get_limited_response(request, max_requests)
+        transport._last_response_size = len(json_dumps(response))
+        return response
+
+    return _send
+
+
+def _get_limited_response(request: str, max_requests: int) -> dict:
+    request_dict = json_loads(request)
+    if request_dict["method"] != "multipleRequest":
+        return {"result": {"great": "success"}, "error_code": 0}
+    requests = request_dict["params"]["requests"]
+    if len(requests) > max_requests:
+        return {
+            "result": {"responses": []},
+            "error_code": SmartErrorCode.JSON_DECODE_FAIL_ERROR.value,
+        }
+    return {
+        "result": {
+            "responses": [
+                {
+                    "method": req["method"],
+                    "result": {"great": "success"},
+                    "error_code": 0,
+                }
+                for req in requests
+            ]
+        },
+        "error_code": 0,
+    }
+
+
+def _get_requests(count: int) -> dict:
+    return {f"get_method_{i}": {"foo": "bar", "bar": "foo"} for i in range(count)}
+
+
+async def test_smart_device_multiple_request_max_size(dummy_protocol, mocker):
+    """Test that batches are packed by their estimated size."""
+    requests = _get_requests(6)
+    send_mock = mocker.patch.object(
+        dummy_protocol._transport,
+        "send",
+        side_effect=_limited_multi_request_send(dummy_protocol._transport, 6),
+    )
+    request_size = dummy_protocol._estimate_request_size(
+        {"method": "get_method_0", "params": {"foo": "bar", "bar": "foo"}}
+    )
+    dummy_protocol._multi_request_max_size = request_size * 2
+    await dummy_protocol.query(requests, retry_count=0)
+    assert send_mock.call_count == 3
+
+    # Learned response sizes are smaller than the default estimate
+    send_mock.reset_mock()
+    await dummy_protocol.query(requests, retry_count=0)
+    assert send_mock.call_count == 2
+
+
+async def test_smart_device_multiple_request_size_failure(dummy_protocol, mocker):
+    """Test that a too large batch falls back to the largest good batch size."""
+    send_mock = mocker.patch.object(
+        dummy_protocol._transport,
+        "send",
+        side_effect=_limited_multi_request_send(dummy_protocol._transport, 3),
+    )
+    await dummy_protocol.query(_get_requests(3), retry_count=0)
+    assert send_mock.call_count == 1
+    assert dummy_protocol._multi_request_max_size is None
+
+    send_mock.reset_mock()
+    resp = await dummy_protocol.query(_get_requests(6), retry_count=1)
+    # The retry succeeds with smaller batches
+    assert len(resp) == 6
+    assert send_mock.call_count > 2
+
+    batch_size, max_size = dummy_protocol.multi_request_limits
+    assert batch_size == 5
+    assert max_size == dummy_protocol._multi_request_good_size
+    assert dummy_protocol.config.batch_size is None
+    assert dummy_protocol.config.learned_batch_size is None
+    assert dummy_protocol.config.batch_max_size == max_size
+
+    # Probe upwards after enough successes without exceeding the failed size
+    dummy_protocol._multi_request_probe_interval = 1
+    await dummy_protocol.query(_get_requests(6), retry_count=1)
+    _, probe_size = dummy_protocol.multi_request_limits
+    assert max_size < probe_size < dummy_protocol._multi_request_failed_size
+
+
+async def test_smart_device_multiple_request_disabled_probe(dummy_protocol, mocker):
+    """Test that disabled batching is probed again with backoff."""
+    send_mock = mocker.patch.object(
+        dummy_protocol._transport,
+        "send",
+        side_effect=_limited_multi_request_send(dummy_protocol._transport, 1),
+    )
+    dummy_protocol._multi_request_probe_interval = 1
+    await dummy_protocol.query(_get_requests(3), retry_count=1)
+    # The failed batch followed by the single requests
+    assert send_mock.call_count == 4
+    # Batching is re-enabled after the successful query
+    assert dummy_protocol.multi_request_limits == (5, None)
+    assert dummy_protocol._multi_request_probe_interval == 2
+
+    send_mock.reset_mock()
+    await dummy_protocol.query(_get_requests(3), retry_count=1)
+    assert send_mock.call_count == 4
+    assert dummy_protocol.multi_request_limits == (1, None)
+    assert dummy_protocol.config.learned_batch_size == 1
+    assert dummy_protocol.config.batch_size is None
+
+    send_mock.reset_mock()
+    await dummy_protocol.query(_get_requests(3), retry_count=1)
+    assert send_mock.call_count == 3
+    assert dummy_protocol.multi_request_limits == (5, None)
+    assert dummy_protocol._multi_request_probe_interval == 4
+    assert dummy_protocol.config.learned_batch_size is None
+
+
+async def test_smart_query_children_batches(dummy_protocol, mocker):
+    """Test that child batches are planned by method count and learn limits."""
+    max_methods = 6
+    batch_methods = []
+
+    async def _send(request: str):
+        requests = json_loads(request)["params"]["requests"]
+        inner = [req["params"]["requestData"]["params"]["requests"] for req in requests]
+        batch_methods.append(sum(len(child) for child in inner))
+        if batch_methods[-1] > max_methods:
+            return {
+                "result": {"responses": []},
+                "error_code": SmartErrorCode.JSON_DECODE_FAIL_ERROR.value,
+            }
+        responses = [
+            {
+                "method": "control_child",
+                "result": {
+                    "responseData": {
+                        "result": {
+                            "responses": [
+                                {"method": r["method"], "result": {}, "error_code": 0}
+                                for r in child
+                            ]
+                        }
+                    }
+                },
+                "error_code": 0,
+            }
+            for child in inner
+        ]
+        return {"result": {"responses": responses}, "error_code": 0}
+
+    mocker.patch.object(dummy_protocol._transport, "send", side_effect=_send)
+    child_requests = {
+        f"child_{i}": {f"get_method_{j}": None for j in range(3)} for i in range(4)
+    }
+    dummy_protocol._multi_request_batch_size = 10
+    dummy_protocol._max_multi_request_batch_size = 10
+    results = await dummy_protocol._query_children(child_requests, retry_count=0)
+
+    assert results.keys() == child_requests.keys()
+    # The first batch holding 9 methods was too large and lowered the limits
+    assert batch_methods == [9, 3, 3, 3, 3]
+    assert dummy_protocol.multi_request_limits == (1, None)
+    assert dummy_protocol.config.learned_batch_size == 1
+
+    # The batch size counts the methods of the children
+    batch_methods.clear()
+    dummy_protocol._multi_request_batch_size = 6
+    results = await dummy_protocol._query_children(child_requests, retry_count=0)
+    assert results.keys() == child_requests.keys()
+    assert batch_methods == [6, 6]
+
+
+async def test_smart_query_single_flight(dummy_protocol, mocker):
+    """Test that concurrent identical get queries are coalesced."""
+    send_event = asyncio.Event()
+
+    async def _send(request: str):
+        await send_event.wait()
+        return {"result": {"great": "success"}, "error_code": 0}
+
+    send_mock = mocker.patch.object(
+        dummy_protocol._transport, "send", side_effect=_send
+    )
+    requests = ["get_device_info", "get_device_info", "set_device_info"] * 2
+    tasks = [asyncio.create_task(dummy_protocol.query(req)) for req in requests]
+    await asyncio.sleep(0)
+    send_event.set()
+    await asyncio.gather(*tasks)
+
+    # One get_device_info and two set_device_info
+    assert send_mock.call_count == 3
+    assert dummy_protocol.coalesced_query_count == 3
+
+
+async def test_smart_query_single_flight_copies(dummy_protocol, mocker):
+    """Test that changes to the result of a shared query are not seen by others."""
+    send_event = asyncio.Event()
+
+    async def _send(request: str):
+        await send_event.wait()
+        return {"result": {"great": "success"}, "error_code": 0}
+
+    mocker.patch.object(dummy_protocol._transport, "send", side_effect=_send)
+
+    async def _query_and_change():
+        result = await dummy_protocol.query("get_device_info")
+        result["get_device_info"]["great"] = "changed"
+        return result
+
+    owner = asyncio.create_task(_query_and_change())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(dummy_protocol.query("get_device_info"))
+    await asyncio.sleep(0)
+    send_event.set()
+    await owner
+    assert (await waiter) == {"get_device_info": {"great": "success"}}
+    assert dummy_protocol.coalesced_query_count == 1
+
+
+@pytest.mark.parametrize(
+    ("request_", "read_only"),
+    [
+        pytest.param("get_device_info", True, id="getter"),
+        pytest.param("component_nego", True, id="component_nego"),
+        pytest.param({"set_device_info": {"on": True}}, False, id="setter"),
+        pytest.param(
+            {
+                "multipleRequest": {
+                    "requests": [
+                        {
+                            "method": "control_child",
+                            "params": {
+                                "device_id": "child",
+                                "requestData": {"method": "get_device_info"},
+                            },
+                        },
+                        {"method": "get_energy_usage"},
+                    ]
+                }
+            },
+            True,
+            id="multiple-control_child-getters",
+        ),
+        pytest.param(
+            {
+                "control_child": {
+                    "device_id": "child",
+                    "requestData": {
+                        "method": "multipleRequest",
+                        "params": {
+                            "requests": [
+                                {"method": "get_device_info"},
+                                {"method": "set_device_info", "params": {}},
+                            ]
+                        },
+                    },
+                }
+            },
+            False,
+            id="control_child-setter",
+        ),
+        pytest.param(
+            {
+                "multipleRequest": {
+                    "requests": [
+                        {
+                            "method": "controlChild",
+                            "params": {
+                                "childControl": {
+                                    "device_id": "child",
+                                    "request_data": {
+                                        "method": "getDeviceInfo",
+                                        "params": {},
+                                    },
+                                }
+                            },
+                        }
+                    ]
+                }
+            },
+            True,
+            id="controlChild-getter",
+        ),
+    ],
+)
+async def test_smart_read_only_request(dummy_protocol, request_, read_only):
+    """Test that wrapped requests are classified by the methods they wrap."""
+    assert dummy_protocol._is_read_only_request(request_) is read_only
+
+
+async def test_smart_child_poll_priority(dummy_protocol, mocker):
+    """Test that batched child polls are not queried as interactive."""
+    mocker.patch.object(
+        dummy_protocol._transport,
+        "send",
+        return_value={"result": {"responses": []}, "error_code": 0},
+    )
+    child_poll = {
+        "control_child": {
+            "device_id": "child",
+            "requestData": {"method": "get_device_info"},
+        }
+    }
+    await dummy_protocol.query(child_poll)
+    stats = dummy_protocol.query_wait_stats
+    assert stats[QueryPriority.Normal]["count"] == 1
+    assert stats[QueryPriority.Interactive]["count"] == 0
+
+
+async def test_smart_interactive_query_between_batches(dummy_protocol, mocker):
+    """Test that interactive queries are sent between the batches of a query."""
+    send_event = asyncio.Event()
+    sent = []
+
+    async def _send(request: str):
+        request_dict = json_loads(request)
+        method = request_dict["method"]
+        sent.append(method)
+        await send_event.wait()
+        if method != "multipleRequest":
+            return {"result": {}, "error_code": 0}
+        return {
+            "result": {
+                "responses": [
+                    {"method": req["method"], "result": {}, "error_code": 0}
+                    for req in request_dict["params"]["requests"]
+                ]
+            },
+            "error_code": 0,
+        }
+
+    mocker.patch.object(dummy_protocol._transport, "send", side_effect=_send)
+    update = asyncio.create_task(dummy_protocol.query(_get_requests(10)))
+    await asyncio.sleep(0)
+    background = asyncio.create_task(
+        _query_with_priority(dummy_protocol, "get_other", QueryPriority.Background)
+    )
+    set_query = asyncio.create_task(dummy_protocol.query("set_device_info"))
+    await asyncio.sleep(0)
+    send_event.set()
+    await asyncio.gather(update, background, set_query)
+
+    assert sent == [
+        "multipleRequest",
+        "set_device_info",
+        "multipleRequest",
+        "get_other",
+    ]
+
+
+async def _query_with_priority(protocol, request, priority):
+    with query_priority(priority):
+        return await protocol.query(request)
+
+
 async def test_childdevicewrapper_unwrapping(dummy_protocol, mocker):
     """Test that responseData gets unwrapped correctly."""
     wrapped_protocol = _ChildProtocolWrapper("dummyid", dummy_protocol)
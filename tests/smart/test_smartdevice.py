@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import copy
 import logging
+import math
 import time
 from collections import OrderedDict
 from typing import TYPE_CHECKING, Any, cast
@@ -13,8 +14,10 @@ import pytest
 from freezegun.api import FrozenDateTimeFactory
 from pytest_mock import MockerFixture
 
-from kasa import Device, DeviceType, KasaException, Module
-from kasa.exceptions import DeviceError, SmartErrorCode
+from kasa import CapabilityCache, Device, DeviceType, KasaException, Module
+from kasa.deviceconfig import DeviceConfig
+from kasa.exceptions import DeviceError, SmartErrorCode, _ConnectionError
+from kasa.exceptions import TimeoutError as KasaTimeoutError
 from kasa.smart import SmartDevice
 from kasa.smart.modules.energy import Energy
 from kasa.smart.smartmodule import SmartModule
@@ -157,6 +160,222 @@ async def test_negotiate(dev: SmartDevice, mocker: MockerFixture):
         assert len(dev._children) == dev.internal_state["get_child_device_list"]["sum"]
 
 
+def _reset_initial_state(dev: SmartDevice) -> None:
+    dev._components_raw = None
+    dev._components = {}
+    dev._modules = OrderedDict()
+    dev._features = {}
+    dev._children = {}
+    dev._last_update = {}
+    dev._last_update_time = None
+
+
+@device_smart
+async def test_capability_cache(dev: SmartDevice, mocker: MockerFixture, tmp_path):
+    """Test that cached capabilities batch the negotiation and the first queries."""
+    cache_file = tmp_path / "capabilities.json"
+    dev.config.capability_cache = CapabilityCache(cache_file)
+    _reset_initial_state(dev)
+    query = mocker.spy(dev.protocol, "query")
+    await dev.update()
+    uncached_calls = query.call_count
+    uncached_state = dev.internal_state.keys()
+    modules = list(dev.modules)
+
+    entry = dev.config.capability_cache.get(
+        dev._info["model"], dev._info["hw_ver"], dev._info["fw_ver"]
+    )
+    assert entry
+    assert entry["components"] == dev._components_raw
+    assert entry["queries"]
+    await dev.config.capability_cache.flush()
+    assert cache_file.exists()
+
+    # A new cache instance loads the persisted entry
+    dev.config.capability_cache = CapabilityCache(cache_file)
+    _reset_initial_state(dev)
+    query.reset_mock()
+    await dev.update()
+
+    assert query.call_count < uncached_calls
+    first_request = query.call_args_list[0].args[0]
+    assert "component_nego" in first_request
+    assert entry["queries"].keys() <= first_request.keys()
+    assert dev.internal_state.keys() == uncached_state
+    assert list(dev.modules) == modules
+    assert dev._prefetched == {}
+
+
+@device_smart
+async def test_capability_cache_query_error(dev: SmartDevice, mocker: MockerFixture):
+    """Test that the negotiation is retried without the cached queries on errors."""
+    dev.config.capability_cache = CapabilityCache()
+    _reset_initial_state(dev)
+    await dev.update()
+    modules = list(dev.modules)
+
+    _reset_initial_state(dev)
+    original_query = dev.protocol.query
+    calls: list[dict] = []
+
+    async def _query(request, *args, **kwargs):
+        calls.append(request)
+        if len(calls) == 1:
+            raise DeviceError("Failed", error_code=SmartErrorCode.UNKNOWN_METHOD_ERROR)
+        return await original_query(request, *args, **kwargs)
+
+    mocker.patch.object(dev.protocol, "query", side_effect=_query)
+    await dev.update()
+
+    assert len(calls[0]) > len(calls[1])
+    assert calls[1] == {
+        "component_nego": None,
+        "get_device_info": None,
+        "get_connect_cloud_state": None,
+    }
+    assert list(dev.modules) == modules
+
+
+async def test_capability_cache_unsupported(mocker: MockerFixture):
+    """Test that methods rejected as unsupported are no longer queried."""
+    dev = await get_device_for_fixture_protocol("P110(EU)_1.0_1.0.7.json", "SMART")
+    cache = CapabilityCache()
+    requests: list[dict] = []
+    original_query = dev.protocol.query
+
+    async def _query(request, *args, **kwargs):
+        requests.append(request)
+        resp = await original_query(request, *args, **kwargs)
+        if "get_led_info" in request:
+            resp["get_led_info"] = SmartErrorCode.UNKNOWN_METHOD_ERROR
+        return resp
+
+    mocker.patch.object(dev.protocol, "query", side_effect=_query)
+
+    first_dev = SmartDevice(
+        dev.host,
+        config=DeviceConfig(dev.host, capability_cache=cache),
+        protocol=dev.protocol,
+    )
+    await first_dev.update()
+    assert any("get_led_info" in request for request in requests)
+    assert cache.get_unsupported("P110", "1.0", first_dev._info["fw_ver"]) == {
+        "get_led_info": SmartErrorCode.UNKNOWN_METHOD_ERROR
+    }
+    assert (
+        "get_led_info"
+        not in cache.get("P110", "1.0", first_dev._info["fw_ver"])["queries"]
+    )
+
+    requests.clear()
+    new_dev = SmartDevice(
+        dev.host,
+        config=DeviceConfig(dev.host, capability_cache=cache),
+        protocol=dev.protocol,
+    )
+    await new_dev.update()
+    await new_dev.update()
+    assert requests
+    assert not any("get_led_info" in request for request in requests)
+    assert new_dev.internal_state["get_led_info"] == SmartErrorCode.UNKNOWN_METHOD_ERROR
+    assert new_dev.modules[Module.Led]._last_update_error
+
+
+async def test_update_error_bisect(
+    mocker: MockerFixture, freezer: FrozenDateTimeFactory
+):
+    """Test that failing methods of a batched update are isolated by bisecting."""
+    dev = await get_device_for_fixture_protocol("P110(EU)_1.0_1.0.7.json", "SMART")
+    requests: list[dict] = []
+    original_query = dev.protocol.query
+    fail = True
+
+    async def _query(request, *args, **kwargs):
+        requests.append(request)
+        if fail and "get_led_info" in request:
+            raise DeviceError(
+                "Dummy error", error_code=SmartErrorCode.JSON_DECODE_FAIL_ERROR
+            )
+        return await original_query(request, *args, **kwargs)
+
+    mocker.patch.object(dev.protocol, "query", side_effect=_query)
+    for mod in dev.modules.values():
+        mod._last_update_time = None
+    await dev.update()
+
+    batch = next(request for request in requests if "get_led_info" in request)
+    assert len(batch) > 4
+    retries = requests[requests.index(batch) + 1 :]
+    # Two queries per halving instead of one per method
+    assert len(retries) <= 2 * math.ceil(math.log2(len(batch)))
+    assert retries[-1] == {"get_led_info": None}
+    assert dev.internal_state["get_led_info"] is SmartErrorCode.INTERNAL_QUERY_ERROR
+    assert all(
+        not isinstance(dev.internal_state[meth], SmartErrorCode)
+        for meth in batch
+        if meth != "get_led_info"
+    )
+    assert dev.modules[Module.Led]._last_update_error
+
+    # The failing method is excluded until its retry interval passed
+    requests.clear()
+    await dev.update()
+    assert requests
+    assert not any("get_led_info" in request for request in requests)
+
+    fail = False
+    freezer.tick(SmartDevice.FAILED_METHOD_RETRY_INTERVAL_SECS)
+    requests.clear()
+    await dev.update()
+    assert any("get_led_info" in request for request in requests)
+    assert dev._failed_methods == {}
+    assert dev.modules[Module.Led]._last_update_error is None
+
+
+async def test_update_error_unreachable(mocker: MockerFixture):
+    """Test that a batched update failing to connect is not bisected."""
+    dev = await get_device_for_fixture_protocol("P110(EU)_1.0_1.0.7.json", "SMART")
+    requests: list[dict] = []
+
+    async def _query(request, *args, **kwargs):
+        requests.append(request)
+        raise _ConnectionError("Dummy connection error")
+
+    mocker.patch.object(dev.protocol, "query", side_effect=_query)
+    for mod in dev.modules.values():
+        mod._last_update_time = None
+    with pytest.raises(KasaException, match="get_device_info not found"):
+        await dev.update()
+
+    batch = requests[0]
+    assert len(batch) > 4
+    # The methods are queried individually as before
+    assert requests[1:] == [{meth: params} for meth, params in batch.items()]
+
+
+async def test_update_error_timeout_recovery(mocker: MockerFixture):
+    """Test that methods failing with a timeout are queried once recovered."""
+    dev = await get_device_for_fixture_protocol("P110(EU)_1.0_1.0.7.json", "SMART")
+    original_query = dev.protocol.query
+    fail = True
+
+    async def _query(request, *args, **kwargs):
+        if fail:
+            raise KasaTimeoutError("Dummy timeout")
+        return await original_query(request, *args, **kwargs)
+
+    mocker.patch.object(dev.protocol, "query", side_effect=_query)
+    for mod in dev.modules.values():
+        mod._last_update_time = None
+    with pytest.raises(KasaException, match="get_device_info not found"):
+        await dev.update()
+    assert dev._failed_methods == {}
+
+    fail = False
+    await dev.update()
+    assert not isinstance(dev.internal_state["get_device_info"], SmartErrorCode)
+
+
 @device_smart
 async def test_update_module_queries(dev: SmartDevice, mocker: MockerFixture):
     """Test that the regular update uses queries from all supported modules."""
@@ -178,10 +397,17 @@ async def test_update_module_queries(dev: SmartDevice, mocker: MockerFixture):
     spies = {}
     for device in device_queries:
         spies[device] = mocker.spy(device.protocol, "query")
+    query_children = mocker.spy(dev.protocol, "_query_children")
 
     await dev.update()
+    # Child queries using the parent protocol are batched by the parent
+    batched_queries: dict[str, dict] = {}
+    for call in query_children.call_args_list:
+        batched_queries.update(call.args[0])
     for device in device_queries:
-        if device_queries[device]:
+        if device.parent and device.device_id in batched_queries:
+            assert batched_queries[device.device_id] == device_queries[device]
+        elif device_queries[device]:
             # Need assert any here because the child device updates use the parent's protocol
             spies[device].assert_any_call(device_queries[device])
         else:
@@ -246,6 +472,30 @@ async def _get_child_responses(child_requests: list[dict[str, Any]], child_proto
     ]
 
 
+async def _get_batched_child_responses(request: dict[str, Any], query_func):
+    """Get responses for batched control_child requests from the single query mock.
+
+    Returns None if the request is not a batched child request.
+    """
+    if not (
+        (mr := request.get("multipleRequest"))
+        and (requests := mr.get("requests"))
+        and all(req["method"] == "control_child" for req in requests)
+    ):
+        return None
+    responses = []
+    for req in requests:
+        resp = await query_func({"control_child": req["params"]})
+        responses.append(
+            {
+                "method": "control_child",
+                "result": resp["control_child"],
+                "error_code": 0,
+            }
+        )
+    return {"multipleRequest": {"responses": responses}}
+
+
 @hub_all
 @pytest.mark.xdist_group(name="caplog")
 async def test_hub_children_update_delays(
@@ -292,6 +542,8 @@ async def test_hub_children_update_delays(
     }
 
     async def _query(request, *args, **kwargs):
+        if batch_resp := await _get_batched_child_responses(request, _query):
+            return batch_resp
         # If this is a child multipleRequest query return the error wrapped
         child_id = None
         # smart hub
@@ -305,27 +557,21 @@ async def test_hub_children_update_delays(
             child_protocol = dev.protocol._transport.child_protocols[child_id]
             resp = await _get_child_responses(child_requests, child_protocol)
             return {"control_child": {"responseData": {"result": {"responses": resp}}}}
-        # smartcam hub
+        # smartcam hub, requests may be batched across children
         if (
             (mr := request.get("multipleRequest"))
             and (requests := mr.get("requests"))
-            # assumes all requests for the same child
-            and (
-                child_id := next(iter(requests))
-                .get("params", {})
-                .get("childControl", {})
-                .get("device_id")
-            )
-            and (
-                child_requests := [
-                    cc["request_data"]
-                    for req in requests
-                    if (cc := req["params"].get("childControl"))
-                ]
-            )
+            and all(req["method"] == "controlChild" for req in requests)
         ):
-            child_protocol = dev.protocol._transport.child_protocols[child_id]
-            resp = await _get_child_responses(child_requests, child_protocol)
+            resp = []
+            for req in requests:
+                cc = req["params"]["childControl"]
+                child_protocol = dev.protocol._transport.child_protocols[
+                    cc["device_id"]
+                ]
+                resp.extend(
+                    await _get_child_responses([cc["request_data"]], child_protocol)
+                )
             resp = [{"result": {"response_data": resp}} for resp in resp]
             return {"multipleRequest": {"responses": resp}}
 
@@ -465,6 +711,8 @@ async def test_update_module_query_errors(
     raise_error = True
 
     async def _query(request, *args, **kwargs):
+        if batch_resp := await _get_batched_child_responses(request, _query):
+            return batch_resp
         pass
         # If this is a childmultipleRequest query return the error wrapped
         child_id = None
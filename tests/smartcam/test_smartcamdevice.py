@@ -69,3 +69,28 @@ async def test_device_time(dev: Device, freezer: FrozenDateTimeFactory):
     await module.set_time(fallback_time)
     await dev.update()
     assert dev.time == fallback_time
+
+
+@hub_smartcam
+async def test_hub_children_update_batched(dev: Device, mocker):
+    """Test that hub child module queries are batched across children."""
+    queried_children = []
+    for child in dev.children:
+        for module in child.modules.values():
+            module._last_update_time = None
+        if any(module.query() for module in child.modules.values()):
+            queried_children.append(child)
+    if len(queried_children) < 2:
+        pytest.skip(f"Device {dev.model} fixture does not have children to batch")
+
+    child_queries = [mocker.spy(child.protocol, "query") for child in dev.children]
+    query_children = mocker.spy(dev.protocol, "_query_children")
+
+    await dev.update()
+
+    query_children.assert_called_once()
+    assert set(query_children.call_args.args[0]) == {
+        child.device_id for child in queried_children
+    }
+    for child_query in child_queries:
+        child_query.assert_not_called()
@@ -56,6 +56,69 @@ async def test_childdevice_update(dev, dummy_protocol, mocker):
     assert child_list[0] == first._info
 
 
+@strip_smart
+async def test_childdevice_update_batched(dev, mocker):
+    """Test that parent update batches the child module queries."""
+    for child in dev.children:
+        for module in child.modules.values():
+            module._last_update_time = None
+    queried_children = [
+        child
+        for child in dev.children
+        if any(m.query() for m in child.modules.values())
+    ]
+    if len(queried_children) < 2:
+        pytest.skip(f"Device {dev} fixture does not have children with queries")
+
+    child_queries = [mocker.spy(child.protocol, "query") for child in queried_children]
+    query_children = mocker.spy(dev.protocol, "_query_children")
+
+    await dev.update()
+
+    query_children.assert_called_once()
+    assert set(query_children.call_args.args[0]) == {
+        child.device_id for child in queried_children
+    }
+    for child_query in child_queries:
+        child_query.assert_not_called()
+    for child in queried_children:
+        assert child._last_update
+
+
+@strip_smart
+async def test_childdevice_update_batched_error(dev, mocker):
+    """Test that a child missing from the batch is queried individually."""
+    for child in dev.children:
+        for module in child.modules.values():
+            module._last_update_time = None
+    queried_children = [
+        child
+        for child in dev.children
+        if any(m.query() for m in child.modules.values())
+    ]
+    if len(queried_children) < 2:
+        pytest.skip(f"Device {dev} fixture does not have children with queries")
+
+    failing, *others = queried_children
+    query_children = dev.protocol._query_children
+
+    async def _query_children(requests, *args, **kwargs):
+        responses = await query_children(requests, *args, **kwargs)
+        responses.pop(failing.device_id)
+        return responses
+
+    mocker.patch.object(dev.protocol, "_query_children", side_effect=_query_children)
+    failing_query = mocker.spy(failing.protocol, "query")
+    other_queries = [mocker.spy(child.protocol, "query") for child in others]
+
+    await dev.update()
+
+    failing_query.assert_called_once()
+    for other_query in other_queries:
+        other_query.assert_not_called()
+    assert failing._last_update
+
+
 @strip_smart
 async def test_childdevice_properties(dev: SmartChildDevice):
     """Check that accessing childdevice properties do not raise exceptions."""
@@ -12,6 +12,7 @@ from pytest_mock import MockerFixture
 from kasa import (
     AuthenticationError,
     ColorTempRange,
+    ConnectionCache,
     Credentials,
     Device,
     DeviceError,
@@ -30,6 +31,7 @@ from kasa.cli.device import (
     toggle,
     update_credentials,
 )
+from kasa.cli.discover import find_dev_from_alias
 from kasa.cli.light import (
     brightness,
     effect,
@@ -831,6 +833,33 @@ async def test_duplicate_target_device(runner):
     assert "Error: Use either --alias or --host, not both." in res.output
 
 
+async def test_find_dev_from_alias_connection_cache(dev, mocker, tmp_path):
+    """Test the device cached with the alias is connected before discovering."""
+    if not dev.alias:
+        pytest.skip("Device has no alias")
+    cache = ConnectionCache(tmp_path / "connections.json")
+    cache.set_device(dev)
+    connect = mocker.patch.object(Device, "connect", return_value=dev)
+    discover = mocker.patch.object(Discover, "discover", return_value={})
+    echo = mocker.patch("kasa.cli.discover.echo")
+
+    found = await find_dev_from_alias(dev.alias.upper(), None, connection_cache=cache)
+    assert found is dev
+    config = connect.call_args.kwargs["config"]
+    assert config.host == dev.host
+    assert config.connection_type == dev.config.connection_type
+    discover.assert_not_called()
+
+    # A failing cached device is dropped and discovered instead
+    connect.side_effect = KasaException("Unable to connect")
+    assert await find_dev_from_alias(dev.alias, None, connection_cache=cache) is None
+    discover.assert_called()
+    echo.assert_called_with(
+        f"Unable to connect to cached device {dev.host}: Unable to connect"
+    )
+    assert cache.find(alias=dev.alias) is None
+
+
 async def test_discover(discovery_mock, mocker, runner):
     """Test discovery output."""
     # These will mock the features to avoid accessing non-existing
@@ -1349,6 +1378,11 @@ async def test_discover_config(dev: Device, mocker, runner):
     host = "127.0.0.1"
     mocker.patch("kasa.device_factory._connect", side_effect=[Exception, dev])
 
+    async def _get_open_ports(host, ports, timeout):
+        return set(ports)
+
+    mocker.patch.object(Discover, "_get_open_ports", new=_get_open_ports)
+
     res = await runner.invoke(
         cli,
         [
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import importlib
 import inspect
+import itertools
 import pkgutil
 import sys
 import zoneinfo
@@ -30,9 +31,12 @@ from kasa.iot.iottimezone import (
     get_timezone_index,
 )
 from kasa.iot.modules import IotLightPreset
+from kasa.json import dumps as json_dumps
 from kasa.smart import SmartChildDevice, SmartDevice
 from kasa.smartcam import SmartCamChild, SmartCamDevice
 
+from .device_fixtures import get_device_for_fixture_protocol
+
 
 def _get_subclasses(of_class):
     package = sys.modules["kasa"]
@@ -417,3 +421,129 @@ async def test_device_timezones():
     # Try a timezone not hardcoded no match
     with pytest.raises(zoneinfo.ZoneInfoNotFoundError):
         await get_timezone_index(zoneinfo.ZoneInfo("Foo/bar"))
+
+
+@pytest.mark.parametrize(
+    ("fixture", "protocol"),
+    [
+        pytest.param("P110(EU)_1.0_1.0.7.json", "SMART", id="smart"),
+        pytest.param("P300(EU)_1.0_1.0.7.json", "SMART", id="smart strip"),
+        pytest.param("HS110(EU)_1.0_1.2.5.json", "IOT", id="iot"),
+        pytest.param("HS300(US)_1.0_1.0.21.json", "IOT", id="iot strip"),
+    ],
+)
+async def test_update_interests(fixture, protocol, mocker):
+    """Test that updates only query the modules backing the interests."""
+    dev = await get_device_for_fixture_protocol(fixture, protocol)
+    devices = [dev, *dev.children]
+    query = mocker.spy(dev.protocol, "query")
+
+    async def _update() -> int:
+        for device in devices:
+            for module in device.modules.values():
+                module._last_update_time = None
+        query.reset_mock()
+        await dev.update()
+        return sum(len(json_dumps(call.args[0])) for call in query.call_args_list)
+
+    all_size = await _update()
+
+    dev.set_update_interests(["state", "current_consumption", "rssi"])
+    interest_size = await _update()
+    assert interest_size < all_size
+
+    for device in devices:
+        modules = device._get_modules_of_interest()
+        assert modules is not None
+        for name, module in device.modules.items():
+            if module not in modules:
+                assert module._last_update_time is None, name
+        if energy := device.modules.get(Module.Energy):
+            assert energy in modules
+            assert "current_consumption" in device.features
+
+    dev.set_update_interests(None)
+    assert dev._get_modules_of_interest() is None
+    assert await _update() == all_size
+
+
+@pytest.mark.parametrize(
+    ("fixture", "protocol", "module_name"),
+    [
+        pytest.param("P110(EU)_1.0_1.0.7.json", "SMART", Module.Energy, id="smart"),
+        pytest.param("HS110(EU)_1.0_1.2.5.json", "IOT", Module.Energy, id="iot"),
+    ],
+)
+async def test_adaptive_update_intervals(fixture, protocol, module_name, freezer):
+    """Test that the intervals of modules with unchanged data grow to the maximum."""
+    dev = await get_device_for_fixture_protocol(fixture, protocol)
+    module = dev.modules[module_name]
+    dev.set_adaptive_update_intervals(100)
+
+    update_times = []
+    for _ in range(30):
+        freezer.tick(10)
+        await dev.update()
+        if module._last_update_time not in update_times:
+            update_times.append(module._last_update_time)
+
+    stats = dev.module_update_stats[str(module_name)]
+    assert stats["adaptive_interval"] == 100
+    assert stats["update_interval"] == 100
+    assert stats["changes"] == 0
+    assert stats["updates"] == len(update_times) - 1
+    assert [b - a for a, b in itertools.pairwise(update_times)] == [
+        10,
+        10,
+        20,
+        40,
+        80,
+        100,
+    ]
+
+    dev.set_adaptive_update_intervals(None)
+    assert module.update_interval == module.MINIMUM_UPDATE_INTERVAL_SECS
+
+
+@pytest.mark.parametrize(
+    ("fixture", "protocol"),
+    [
+        pytest.param("P110(EU)_1.0_1.0.7.json", "SMART", id="smart"),
+        pytest.param("HS110(EU)_1.0_1.2.5.json", "IOT", id="iot"),
+    ],
+)
+async def test_adaptive_update_intervals_disabled(fixture, protocol, mocker):
+    """Test that the module data is not digested without adaptive intervals."""
+    dev = await get_device_for_fixture_protocol(fixture, protocol)
+    record_update = mocker.spy(Module, "_record_update")
+    await dev.update()
+    record_update.assert_not_called()
+
+    dev.set_adaptive_update_intervals(100)
+    await dev.update()
+    record_update.assert_called()
+
+
+async def test_adaptive_update_intervals_reset(freezer):
+    """Test that data changes and setters reset the adaptive interval."""
+    dev = await get_device_for_fixture_protocol("P110(EU)_1.0_1.0.7.json", "SMART")
+    led = dev.modules[Module.Led]
+    led.set_update_interval(0)
+    dev.set_adaptive_update_intervals(100)
+    for _ in range(3):
+        freezer.tick(10)
+        await dev.update()
+    assert led.update_interval == 20
+
+    dev.protocol._transport.info["get_led_info"]["led_rule"] = "never"
+    freezer.tick(20)
+    await dev.update()
+    assert led.update_stats["changes"] == 1
+    assert led.update_stats["change_rate"] == 1 / 3
+    assert led.update_interval == 0
+
+    freezer.tick(10)
+    await dev.update()
+    assert led.update_interval == 10
+    await led.set_led(True)
+    assert led.update_interval == 0
@@ -14,6 +14,7 @@ import pytest  # type: ignore # https://github.com/pytest-dev/pytest/issues/3342
 
 from kasa import (
     BaseProtocol,
+    ConnectionCache,
     Credentials,
     Discover,
     IotProtocol,
@@ -189,6 +190,52 @@ async def test_connect_http_client(discovery_mock, mocker):
     await http_client.close()
 
 
+async def test_connect_connection_cache(discovery_mock, mocker, tmp_path):
+    """Test connect starts from the cached connection and refreshes it on failure."""
+    host = DISCOVERY_MOCK_IP
+    ctype, device_class = _get_connection_type_device_class(
+        discovery_mock.discovery_data
+    )
+    cache_file = tmp_path / "connections.json"
+    credentials = Credentials("foor", "bar")
+
+    config = DeviceConfig(
+        host=host,
+        credentials=credentials,
+        connection_type=ctype,
+        connection_cache=ConnectionCache(cache_file),
+    )
+    dev = await connect(config=config)
+    await dev.disconnect()
+    await config.connection_cache.flush()
+    entry = ConnectionCache(cache_file).get(dev.mac)
+    assert entry["host"] == host
+    assert entry["model"] == dev.model
+    assert "credentials" not in entry["config"]
+
+    # A restart connects with the cached connection instead of the default one
+    cache = ConnectionCache(cache_file)
+    dev = await connect(
+        config=DeviceConfig(host=host, credentials=credentials, connection_cache=cache)
+    )
+    assert isinstance(dev, device_class)
+    assert dev.config.connection_type == ctype
+    await dev.disconnect()
+
+    # The cached connection is dropped once connecting fails
+    mocker.patch("kasa.IotProtocol.query", side_effect=KasaException)
+    mocker.patch("kasa.SmartProtocol.query", side_effect=KasaException)
+    with pytest.raises(KasaException):
+        await connect(
+            config=DeviceConfig(
+                host=host, credentials=credentials, connection_cache=cache
+            )
+        )
+    assert cache.find(host=host) is None
+    await cache.flush()
+    assert ConnectionCache(cache_file).find(host=host) is None
+
+
 async def test_device_types(dev: Device):
     await dev.update()
     if isinstance(dev, SmartCamDevice):
@@ -7,6 +7,8 @@ import json
 import logging
 import re
 import socket
+import threading
+import time
 from asyncio import timeout as asyncio_timeout
 from unittest.mock import MagicMock
 
@@ -16,6 +18,7 @@ from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import padding as asymmetric_padding
 
 from kasa import (
+    ConnectionCache,
     Credentials,
     Device,
     DeviceType,
@@ -40,7 +43,7 @@ from kasa.discover import (
 )
 from kasa.exceptions import AuthenticationError, UnsupportedDeviceError
 from kasa.iot import IotDevice, IotPlug
-from kasa.transports.aestransport import AesEncyptionSession
+from kasa.transports.aestransport import AesEncyptionSession, KeyPair
 from kasa.transports.xortransport import XorEncryption, XorTransport
 
 from .conftest import (
@@ -320,10 +323,12 @@ async def test_discover_datagram_received(mocker, discovery_data):
 
     mocker.patch("kasa.discover.json_loads", return_value=discovery_data)
     proto.datagram_received("<placeholder data>", (addr, port))
+    await proto.wait_for_responses()
 
     addr2 = "127.0.0.2"
     mocker.patch("kasa.discover.json_loads", return_value=UNSUPPORTED)
     proto.datagram_received("<placeholder data>", (addr2, 20002))
+    await proto.wait_for_responses()
 
     # Check that device in discovered_devices is initialized correctly
     assert len(proto.discovered_devices) == 1
@@ -343,6 +348,7 @@ async def test_discover_invalid_responses(msg, data, mocker):
     mocker.patch.object(XorEncryption, "decrypt")
 
     proto.datagram_received(data, ("127.0.0.1", 9999))
+    await proto.wait_for_responses()
     assert len(proto.discovered_devices) == 0
 
 
@@ -547,6 +553,216 @@ async def test_do_discover_invalid(mocker, port, will_timeout):
     assert dp.discover_task.cancelled() != will_timeout
 
 
+async def test_discover_response_pipeline(mocker):
+    """Test responses are decoded in the executor and processed in order."""
+    proto = _DiscoverProtocol()
+    get_discovery_result = Discover._get_discovery_result
+    decode_threads = []
+
+    def _get_discovery_result(info, host):
+        decode_threads.append(threading.get_ident())
+        time.sleep(0.05)
+        return get_discovery_result(info, host)
+
+    mocker.patch.object(Discover, "_get_discovery_result", _get_discovery_result)
+    klap_datagram = (
+        b"\x02\x00\x00\x01\x01[\x00\x00\x00\x00\x00\x00W\xcev\xf8"
+        + json_dumps(AUTHENTICATION_DATA_KLAP).encode()
+    )
+    legacy_datagram = XorEncryption.encrypt(json_dumps(LEGACY_DISCOVER_DATA))[4:]
+
+    proto.datagram_received(klap_datagram, ("127.0.0.1", 20002))
+    proto.datagram_received(legacy_datagram, ("127.0.0.2", 9999))
+    proto.datagram_received(legacy_datagram, ("127.0.0.2", 9999))
+    proto.datagram_received(legacy_datagram, ("127.0.0.3", 1234))
+    assert proto.stats["pending"] == 2
+
+    await proto.wait_for_responses()
+    assert decode_threads
+    assert threading.get_ident() not in decode_threads
+    assert list(proto.discovered_devices) == ["127.0.0.1", "127.0.0.2"]
+
+    stats = proto.stats
+    assert stats["received"] == 2
+    assert stats["processed"] == 2
+    assert stats["pending"] == 0
+    assert stats["queue_max"] == 2
+    assert stats["latency_max"] >= 0.05
+    assert stats["latency_average"] > 0
+    assert stats["throughput"] > 0
+
+    discover_stats = Discover.get_stats()
+    Discover._add_stats(stats)
+    assert Discover.get_stats()["processed"] == discover_stats["processed"] + 2
+
+
+@pytest.mark.parametrize(
+    ("expected", "discovered"),
+    [
+        pytest.param({}, ["127.0.0.1", "127.0.0.2"], id="all"),
+        pytest.param({"hosts": ["127.0.0.1"]}, ["127.0.0.1"], id="hosts"),
+        pytest.param(
+            {"hosts": ["127.0.0.1"], "macs": ["00:00:00:00:00:00"]},
+            ["127.0.0.1", "127.0.0.2"],
+            id="hosts_and_macs",
+        ),
+        pytest.param({"macs": ["12:34:56:78:90:ab"]}, ["127.0.0.1"], id="macs"),
+    ],
+)
+async def test_discover_iter(mocker, expected, discovered):
+    """Test devices are yielded once discovered until the expected are found."""
+    klap_datagram = (
+        b"\x02\x00\x00\x01\x01[\x00\x00\x00\x00\x00\x00W\xcev\xf8"
+        + json_dumps(AUTHENTICATION_DATA_KLAP).encode()
+    )
+    legacy_datagram = XorEncryption.encrypt(json_dumps(LEGACY_DISCOVER_DATA))[4:]
+    discovery_time = 0 if not expected else 10
+
+    async def mock_discover(self):
+        self.datagram_received(klap_datagram, ("127.0.0.1", 20002))
+        await asyncio.sleep(0.01)
+        self.datagram_received(legacy_datagram, ("127.0.0.2", 9999))
+        await asyncio.sleep(discovery_time)
+
+    mocker.patch.object(_DiscoverProtocol, "do_discover", mock_discover)
+
+    devices = []
+    async with asyncio_timeout(5):
+        async for device in Discover.discover_iter(**expected):
+            assert isinstance(device, Device)
+            devices.append(device.host)
+    assert devices == discovered
+
+
+async def test_discover_and_update(mocker):
+    """Test devices are updated concurrently up to the limit and retried."""
+    legacy_datagram = XorEncryption.encrypt(json_dumps(LEGACY_DISCOVER_DATA))[4:]
+    hosts = [f"127.0.0.{i}" for i in range(1, 7)]
+
+    async def mock_discover(self):
+        for host in hosts:
+            self.datagram_received(legacy_datagram, (host, 9999))
+
+    mocker.patch.object(_DiscoverProtocol, "do_discover", mock_discover)
+
+    updating = 0
+    max_updating = 0
+    attempts: dict[str, int] = {}
+
+    async def _update(self, *args, **kwargs):
+        nonlocal updating, max_updating
+        attempts[self.host] = attempts.get(self.host, 0) + 1
+        updating += 1
+        max_updating = max(max_updating, updating)
+        await asyncio.sleep(0.01)
+        updating -= 1
+        if self.host == "127.0.0.1" and attempts[self.host] == 1:
+            raise KasaException("Device not ready")
+        if self.host == "127.0.0.2":
+            raise KasaException("Device failing")
+        if self.host == "127.0.0.3":
+            raise AuthenticationError("Invalid credentials")
+
+    mocker.patch.object(IotPlug, "update", _update)
+
+    results = {}
+    async with asyncio_timeout(5):
+        async for updated in Discover.discover_and_update(
+            max_concurrency=2, update_attempts=3, retry_delay=0.05, discovery_timeout=0
+        ):
+            results[updated.device.host] = updated
+
+    assert set(results) == set(hosts)
+    assert max_updating == 2
+    # The retried devices do not hold up the other devices
+    assert list(results)[-2:] == ["127.0.0.1", "127.0.0.2"]
+    assert results["127.0.0.1"].attempts == 2
+    assert results["127.0.0.1"].error is None
+    assert results["127.0.0.1"].time_to_ready > 0
+    assert results["127.0.0.2"].attempts == 3
+    assert isinstance(results["127.0.0.2"].error, KasaException)
+    assert results["127.0.0.3"].attempts == 1
+    assert isinstance(results["127.0.0.3"].error, AuthenticationError)
+    assert results["127.0.0.4"].attempts == 1
+    assert results["127.0.0.4"].error is None
+
+
+@pytest.mark.parametrize("update_attempts", [0, -1])
+async def test_discover_and_update_invalid_attempts(mocker, update_attempts):
+    """Test that at least one update attempt is required."""
+    do_discover = mocker.patch.object(_DiscoverProtocol, "do_discover")
+    with pytest.raises(ValueError, match="update_attempts must be at least 1"):
+        async for _ in Discover.discover_and_update(update_attempts=update_attempts):
+            pass
+    do_discover.assert_not_called()
+
+
+@pytest.mark.parametrize(("packet_rate", "paced"), [(100, True), (100000, False)])
+async def test_sweep(mocker, packet_rate, paced):
+    """Test sweep sends unicast queries to the hosts of the networks."""
+    klap_datagram = (
+        b"\x02\x00\x00\x01\x01[\x00\x00\x00\x00\x00\x00W\xcev\xf8"
+        + json_dumps(AUTHENTICATION_DATA_KLAP).encode()
+    )
+    legacy_datagram = XorEncryption.encrypt(json_dumps(LEGACY_DISCOVER_DATA))[4:]
+    responses = {
+        ("10.0.0.5", 9999): legacy_datagram,
+        ("10.0.0.9", 20002): klap_datagram,
+    }
+    sent = []
+
+    async def _create_datagram_endpoint(protocol_factory, *_, **__):
+        protocol = protocol_factory()
+        transport = MagicMock()
+
+        def _sendto(data, addr):
+            sent.append(addr)
+            if response := responses.get(addr):
+                protocol.datagram_received(response, addr)
+
+        transport.sendto = _sendto
+        protocol.connection_made(transport)
+        return transport, protocol
+
+    mocker.patch(
+        "asyncio.BaseEventLoop.create_datagram_endpoint",
+        side_effect=_create_datagram_endpoint,
+    )
+    sleeps = []
+
+    async def _sleep(delay, *_, **__):
+        sleeps.append(delay)
+
+    mocker.patch("asyncio.sleep", side_effect=_sleep)
+
+    devices = await Discover.sweep(
+        ["10.0.0.0/28", "10.0.0.5", "10.0.0.1"],
+        packet_rate=packet_rate,
+        discovery_packets=2,
+        discovery_timeout=1,
+    )
+    assert set(devices) == {"10.0.0.5", "10.0.0.9"}
+    assert isinstance(devices["10.0.0.5"], IotDevice)
+
+    # 14 hosts are queried in the first round and resent to the 12 not responding
+    assert len(sent) == (14 + 12) * 2
+    assert sent[:2] == [("10.0.0.1", 9999), ("10.0.0.1", 20002)]
+    assert ("10.0.0.5", 9999) not in sent[14 * 2 :]
+    assert ("10.0.0.0", 9999) not in sent
+    # Sleeping only at the end of each round unless paced
+    assert (len(sleeps) > 2) is paced
+
+
+async def test_discover_iter_error(mocker):
+    """Test errors of the discovery are raised by the iterator."""
+    mocker.patch.object(_DiscoverProtocol, "DISCOVERY_START_TIMEOUT", 0)
+    mocker.patch.object(_DiscoverProtocol, "connection_made")
+
+    with pytest.raises(asyncio.TimeoutError):
+        async for _ in Discover.discover_iter():
+            pass
+
+
 async def test_discover_propogates_task_exceptions(discovery_mock):
     """Make sure that discover propogates callback exceptions."""
     discovery_timeout = 0
@@ -666,6 +882,39 @@ async def test_discovery_decryption():
     assert dr.decrypted_data == data_dict
 
 
+async def test_prepare_key_pair(tmp_path, mocker, monkeypatch, caplog):
+    """Test the discovery key pair is created once and loaded from the key file."""
+    monkeypatch.setattr(_AesDiscoveryQuery, "keypair", None)
+    monkeypatch.setattr(_AesDiscoveryQuery, "query", None)
+    monkeypatch.setattr(_AesDiscoveryQuery, "key_file", None)
+    create_spy = mocker.spy(KeyPair, "create_key_pair")
+    key_file = tmp_path / "discovery_key.pem"
+
+    await Discover.prepare_key_pair(key_file)
+    assert create_spy.call_count == 1
+    assert key_file.stat().st_mode & 0o777 == 0o600
+    keypair = _AesDiscoveryQuery.keypair
+    query = await _AesDiscoveryQuery.get_query()
+    assert query is _AesDiscoveryQuery.query
+    payload = json.loads(query[16:])
+    assert payload["params"]["rsa_key"] == keypair.get_public_pem().decode()
+
+    # A restart loads the key pair from the key file
+    monkeypatch.setattr(_AesDiscoveryQuery, "keypair", None)
+    monkeypatch.setattr(_AesDiscoveryQuery, "query", None)
+    await Discover.prepare_key_pair(key_file)
+    assert create_spy.call_count == 1
+    assert _AesDiscoveryQuery.keypair.get_public_pem() == keypair.get_public_pem()
+
+    # An invalid key file is replaced
+    invalid_file = tmp_path / "invalid_key.pem"
+    invalid_file.write_text("foobar")
+    await Discover.prepare_key_pair(invalid_file)
+    assert create_spy.call_count == 2
+    assert "Unable to load discovery key" in caplog.text
+    assert KeyPair.create_from_private_pem(invalid_file.read_bytes())
+
+
 async def test_discover_try_connect_all(discovery_mock, mocker):
     """Test that device update is called on main."""
     if "result" in discovery_mock.discovery_data:
@@ -710,9 +959,13 @@ async def test_discover_try_connect_all(discovery_mock, mocker):
 
         raise KasaException("Unable to execute update")
 
+    async def _get_open_ports(host, ports, timeout):
+        return set(ports)
+
     mocker.patch("kasa.IotProtocol.query", new=_query)
     mocker.patch("kasa.SmartProtocol.query", new=_query)
     mocker.patch.object(dev_class, "update", new=_update)
+    mocker.patch.object(Discover, "_get_open_ports", new=_get_open_ports)
 
     session = aiohttp.ClientSession()
     dev = await Discover.try_connect_all(discovery_mock.ip, http_client=session)
@@ -726,6 +979,123 @@ async def test_discover_try_connect_all(discovery_mock, mocker):
         assert dev.protocol._transport._http_client.client == session
 
 
+async def test_discover_try_connect_all_open_ports(mocker):
+    """Test only parameters using open ports are attempted concurrently."""
+    attempted_ports = []
+    connecting = 0
+    max_connecting = 0
+
+    async def _connect(config, prot):
+        nonlocal connecting, max_connecting
+        port = prot._transport._port
+        attempted_ports.append(port)
+        connecting += 1
+        max_connecting = max(max_connecting, connecting)
+        try:
+            await asyncio.sleep(0)
+            if isinstance(prot._transport, XorTransport):
+                return IotPlug(config.host, protocol=prot)
+            await asyncio.sleep(0)
+            raise KasaException("Unable to connect")
+        finally:
+            connecting -= 1
+
+    async def _get_open_ports(host, ports, timeout):
+        assert {9999, 80, 443, 4433} <= set(ports)
+        return {80, 9999}
+
+    mocker.patch("kasa.device_factory._connect", new=_connect)
+    mocker.patch.object(Discover, "_get_open_ports", new=_get_open_ports)
+    attempts = []
+
+    dev = await Discover.try_connect_all(
+        "127.0.0.1", on_attempt=lambda ca, success: attempts.append((ca, success))
+    )
+    assert isinstance(dev, IotPlug)
+    assert set(attempted_ports) <= {80, 9999}
+    assert 1 < max_connecting <= Discover.TRY_CONNECT_CONCURRENCY
+    # The parameters using closed ports are reported as failed attempts
+    assert any(ca.https and not success for ca, success in attempts)
+    assert [ca.transport for ca, success in attempts if success] == [XorTransport]
+
+
+async def test_discover_try_connect_all_preference_order(mocker):
+    """Test the earliest working parameters are used over faster later ones."""
+    attempted = []
+
+    async def _connect(config, prot):
+        attempted.append(prot)
+        if len(attempted) == 1:
+            await asyncio.sleep(0.01)
+        return IotPlug(config.host, protocol=prot)
+
+    async def _get_open_ports(host, ports, timeout):
+        return set(ports)
+
+    mocker.patch("kasa.device_factory._connect", new=_connect)
+    mocker.patch.object(Discover, "_get_open_ports", new=_get_open_ports)
+    disconnect = mocker.patch.object(IotPlug, "disconnect")
+
+    dev = await Discover.try_connect_all("127.0.0.1")
+    assert isinstance(dev, IotPlug)
+    assert len(attempted) > 1
+    assert dev.protocol is attempted[0]
+    # The devices of the later working parameters are disconnected
+    assert disconnect.call_count == len(attempted) - 1
+
+
+async def test_discover_try_connect_all_connection_cache(mocker):
+    """Test the cached connection is tried first and working ones are cached."""
+    cache = ConnectionCache()
+    dev = IotPlug("127.0.0.1")
+    dev.update_from_discover_info(LEGACY_DISCOVER_DATA)
+    cache.set_device(dev)
+    # The mac addresses are normalized whatever their separators
+    mac = dev.mac.lower()
+    assert cache.get(mac.replace(":", "")) == cache.get(mac.replace(":", "-"))
+    assert cache.get(mac.replace(":", "")) is not None
+    connect = mocker.patch("kasa.device_factory.connect", return_value=dev)
+
+    assert await Discover.try_connect_all("127.0.0.1", connection_cache=cache) is dev
+    assert connect.call_args.kwargs["config"].connection_cache is cache
+
+    # Once the cached connection fails the working connection is cached
+    connect.side_effect = KasaException("Unable to connect")
+    cache.delete(dev.mac)
+    cache.set_device(dev)
+
+    async def _connect(config, prot):
+        return IotPlug(config.host, protocol=prot)
+
+    async def _get_open_ports(host, ports, timeout):
+        return {9999}
+
+    mocker.patch("kasa.device_factory._connect", new=_connect)
+    mocker.patch.object(Discover, "_get_open_ports", new=_get_open_ports)
+    set_device = mocker.spy(cache, "set_device")
+    found = await Discover.try_connect_all("127.0.0.1", connection_cache=cache)
+    assert isinstance(found, IotPlug)
+    set_device.assert_called_once_with(found)
+
+
+async def test_get_open_ports(mocker):
+    """Test the tcp ports accepting connections are returned."""
+    writer = MagicMock()
+    writer.wait_closed = mocker.AsyncMock()
+
+    async def _open_connection(host, port):
+        if port == 80:
+            return MagicMock(), writer
+        if port == 443:
+            raise ConnectionRefusedError
+        await asyncio.Event().wait()
+
+    mocker.patch("asyncio.open_connection", side_effect=_open_connection)
+    open_ports = await Discover._get_open_ports("127.0.0.1", [80, 443, 9999], 0.01)
+    assert open_ports == {80}
+    writer.close.assert_called_once()
+
+
 async def test_discovery_device_repr(discovery_mock, mocker):
     """Test that repr works when only discovery data is available."""
     host = "foobar"
@@ -3,6 +3,7 @@ import re
 import aiohttp
 import pytest
 
+from kasa.deadline import query_deadline
 from kasa.deviceconfig import DeviceConfig
 from kasa.exceptions import (
     KasaException,
@@ -97,3 +98,18 @@ async def test_httpclient_errors(mocker, error, error_raises, error_message, moc
         assert mock_response.call_count == 1
     else:
         assert conn.call_count == 1
+
+
+async def test_httpclient_deadline(mocker):
+    """Test that the request timeout is shrunk to the query deadline."""
+    conn = mocker.patch.object(
+        aiohttp.ClientSession, "post", side_effect=Exception("Error")
+    )
+    client = HttpClient(DeviceConfig("127.0.0.1", timeout=5))
+    with query_deadline(2), pytest.raises(KasaException):
+        await client.post("http://foobar")
+    assert 0 < conn.call_args.kwargs["timeout"].total <= 2
+
+    with query_deadline(0), pytest.raises(TimeoutError, match="deadline exceeded"):
+        await client.post("http://foobar")
+    assert conn.call_count == 1
@@ -0,0 +1,220 @@
+import asyncio
+import contextlib
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from kasa import Device, Module, Poller
+from kasa.protocols.protocol import QueryPriority, _query_priority
+
+from .device_fixtures import device_smart
+
+
+def _get_device(host: str = "127.0.0.1", update=None) -> Device:
+    device = MagicMock(spec=Device)
+    device.host = host
+    device.children = []
+    device.update = update or AsyncMock()
+    device._update_interests = None
+    device._adaptive_max_interval = None
+    device._module_update_intervals = None
+    return device
+
+
+async def _wait_for(condition, timeout: float = 2) -> None:
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.001)
+
+
+async def test_poller_polls_devices():
+    """Test that devices are polled repeatedly and the callback called."""
+    priorities = []
+
+    async def _update():
+        priorities.append(_query_priority.get())
+
+    devices = [
+        _get_device(f"127.0.0.{i}", AsyncMock(side_effect=_update)) for i in range(3)
+    ]
+    callback = MagicMock()
+    async with Poller(devices, interval=0.01, callback=callback) as poller:
+        await _wait_for(lambda: all(dev.update.call_count >= 3 for dev in devices))
+        assert set(poller.devices) == set(devices)
+
+    assert set(priorities) == {QueryPriority.Background}
+    called = {call.args[0] for call in callback.call_args_list}
+    assert called == set(devices)
+    assert all(call.args[1] is None for call in callback.call_args_list)
+    stats = poller.stats
+    assert stats["polls"] >= 9
+    assert stats["errors"] == 0
+    assert stats["devices"] == 3
+    assert stats["lag_max"] >= stats["lag_average"] >= 0
+
+
+async def test_poller_async_callback():
+    """Test that async callbacks are awaited and their errors logged."""
+    device = _get_device()
+    callback = AsyncMock(side_effect=Exception("Callback error"))
+    async with Poller([device], interval=0.01, callback=callback):
+        await _wait_for(lambda: callback.await_count >= 2)
+
+
+@pytest.mark.parametrize(
+    ("max_concurrency", "max_subnet_concurrency", "hosts", "expected"),
+    [
+        pytest.param(2, 16, [f"127.0.0.{i}" for i in range(5)], 2, id="global"),
+        pytest.param(16, 1, [f"127.0.0.{i}" for i in range(5)], 1, id="subnet"),
+        pytest.param(16, 1, [f"127.0.{i}.1" for i in range(5)], 5, id="subnets"),
+    ],
+)
+async def test_poller_concurrency(
+    max_concurrency, max_subnet_concurrency, hosts, expected
+):
+    """Test that the number of devices polled at once is limited."""
+    polling = 0
+    max_polling = 0
+    polls = 0
+
+    async def _update():
+        nonlocal polling, max_polling, polls
+        polling += 1
+        max_polling = max(max_polling, polling)
+        # Hold the poll until the expected number of devices are polled at once
+        with contextlib.suppress(TimeoutError):
+            await _wait_for(lambda: max_polling >= expected, timeout=1)
+        polling -= 1
+        polls += 1
+
+    devices = [_get_device(host, AsyncMock(side_effect=_update)) for host in hosts]
+    async with Poller(
+        devices,
+        interval=0.001,
+        max_concurrency=max_concurrency,
+        max_subnet_concurrency=max_subnet_concurrency,
+    ):
+        await _wait_for(lambda: polls >= 5, timeout=10)
+
+    assert max_polling == expected
+
+
+async def test_poller_backoff():
+    """Test that unreachable devices are polled with an exponential backoff."""
+    device = _get_device(update=AsyncMock(side_effect=Exception("Unreachable")))
+    callback = MagicMock()
+    async with Poller(
+        [device], interval=0.01, jitter=0, max_backoff=0.04, callback=callback
+    ) as poller:
+        await _wait_for(lambda: device.update.call_count >= 4)
+        entry = poller._entries[id(device)]
+        assert entry.failures >= 3
+        assert poller._get_next_interval(entry) == 0.04
+        assert poller.stats["backing_off"] == 1
+
+    assert poller.stats["errors"] >= 4
+    assert isinstance(callback.call_args.args[1], Exception)
+
+    entry.failures = 1
+    assert poller._get_next_interval(entry) == 0.02
+    # The backoff does not overflow after many failures
+    entry.failures = 2000
+    assert poller._get_next_interval(entry) == poller._max_backoff
+
+
+async def test_poller_remove_device():
+    """Test that removed devices are no longer polled."""
+    device = _get_device()
+    async with Poller([device], interval=0.01) as poller:
+        await _wait_for(lambda: device.update.call_count >= 1)
+        poller.remove_device(device)
+        call_count = device.update.call_count
+        await asyncio.sleep(0.05)
+        assert device.update.call_count <= call_count + 1
+        assert poller.devices == []
+
+
+@device_smart
+async def test_poller_module_intervals(dev: Device):
+    """Test that module intervals are applied when the device is added."""
+    if Module.Firmware not in dev.modules:
+        pytest.skip("Device has no firmware module")
+    firmware = dev.modules[Module.Firmware]
+    default_interval = firmware.update_interval
+    poller = Poller(interval=0.01)
+    poller.add_device(dev, module_intervals={Module.Firmware: 12345})
+    assert firmware.update_interval == 12345
+    assert "MINIMUM_UPDATE_INTERVAL_SECS" not in vars(firmware)
+
+    poller.remove_device(dev)
+    assert firmware.update_interval == default_interval
+
+
+async def test_poller_readd_device_while_polling():
+    """Test that a device re-added while polled is not polled concurrently."""
+    polling = 0
+    max_polling = 0
+    release = asyncio.Event()
+
+    async def _update():
+        nonlocal polling, max_polling
+        polling += 1
+        max_polling = max(max_polling, polling)
+        await release.wait()
+        polling -= 1
+
+    device = _get_device(update=_update)
+    poller = Poller(interval=0.01, jitter=0)
+    poller.add_device(device, interval=0)
+    async with poller:
+        await _wait_for(lambda: polling == 1)
+        poller.remove_device(device)
+        poller.add_device(device, interval=0)
+        await asyncio.sleep(0.05)
+        assert max_polling == 1
+        release.set()
+        await _wait_for(lambda: poller.stats["polls"] >= 3)
+
+    assert max_polling == 1
+    assert poller._polls == {}
+
+
+def test_poller_interests():
+    """Test that the poller and device interests are set on the devices."""
+    devices = [_get_device(f"127.0.0.{i}") for i in range(3)]
+    poller = Poller(devices[:2], interests=["state", "rssi"])
+    poller.add_device(devices[2], interests=["current_consumption"])
+    devices[0].set_update_interests.assert_called_once_with(["state", "rssi"])
+    devices[1].set_update_interests.assert_called_once_with(["state", "rssi"])
+    devices[2].set_update_interests.assert_called_once_with(["current_consumption"])
+
+    device = _get_device()
+    Poller([device])
+    device.set_update_interests.assert_not_called()
+
+
+def test_poller_adaptive_max_interval():
+    """Test that the adaptive update intervals are set on the devices."""
+    devices = [_get_device(f"127.0.0.{i}") for i in range(2)]
+    poller = Poller(devices[:1], adaptive_max_interval=600)
+    poller.add_device(devices[1], adaptive_max_interval=60)
+    devices[0].set_adaptive_update_intervals.assert_called_once_with(600)
+    devices[1].set_adaptive_update_intervals.assert_called_once_with(60)
+
+    device = _get_device()
+    Poller([device])
+    device.set_adaptive_update_intervals.assert_not_called()
+
+
+def test_poller_remove_device_restores_settings():
+    """Test that removing a device restores the settings applied by the poller."""
+    device = _get_device()
+    device._update_interests = frozenset({"state"})
+    poller = Poller(interests=["rssi"], adaptive_max_interval=600)
+    poller.add_device(device, module_intervals={"Firmware": 3600})
+    device.set_update_interests.assert_called_once_with(["rssi"])
+
+    poller.remove_device(device)
+    device.set_update_interests.assert_called_with(frozenset({"state"}))
+    device.set_adaptive_update_intervals.assert_called_with(None)
+    device.set_module_update_intervals.assert_called_with(None)
@@ -1,3 +1,5 @@
+import copy
+import time
 from datetime import datetime
 
 import pytest
@@ -160,3 +162,31 @@ async def test_children_energy(dev: Device):
         assert "voltage" in energy._module_features
         assert "current" in energy._module_features
         assert "current_consumption" in energy._module_features
+
+
+@strip_iot
+async def test_children_update_requests(dev: IotStrip, mocker):
+    """Test that the strip sends the plug requests with their child ids."""
+    requests = []
+    query = dev.protocol.query
+
+    async def _query(request, *args, **kwargs):
+        requests.append(copy.deepcopy(request))
+        return await query(request, *args, **kwargs)
+
+    mocker.patch.object(dev.protocol, "query", side_effect=_query)
+    expected = {}
+    for plug in dev.children:
+        for module in plug.modules.values():
+            module._last_update_time = None
+        expected[plug.child_id], _ = plug._get_update_requests({}, time.monotonic())
+    await dev.update()
+
+    child_requests = [request for request in requests if "context" in request]
+    for plug in dev.children:
+        plug_requests = [
+            request
+            for request in child_requests
+            if request["context"]["child_ids"] == [plug.child_id]
+        ]
+        assert plug_requests == expected[plug.child_id]
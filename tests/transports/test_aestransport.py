@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import base64
 import json
 import logging
@@ -30,6 +31,8 @@ from kasa.httpclient import HttpClient
 from kasa.transports.aestransport import (
     AesEncyptionSession,
     AesTransport,
+    KeyPair,
+    KeyPairPool,
     TransportState,
 )
 
@@ -418,6 +421,78 @@ async def test_device_closes_connection(
     assert success == should_succeed
 
 
+async def test_session_renewal(mocker):
+    """Test that the session is renewed in the background before it expires."""
+    host = "127.0.0.1"
+    mock_aes_device = MockAesDevice(host)
+    mocker.patch.object(aiohttp.ClientSession, "post", side_effect=mock_aes_device.post)
+
+    transport = AesTransport(
+        config=DeviceConfig(
+            host, credentials=Credentials("foo", "bar"), session_renewal=True
+        )
+    )
+    # Renew the first session straight away
+    transport.SESSION_RENEWAL_SECONDS = 86400
+    request = json_dumps({"method": "get_device_info", "params": None})
+    assert "result" in await transport.send(request)
+    token = mock_aes_device.token
+    renewal_task = transport._session_renewal_task
+    assert renewal_task
+
+    transport.SESSION_RENEWAL_SECONDS = 300
+    await renewal_task
+    assert mock_aes_device.token != token
+    assert mock_aes_device.token in str(transport._token_url)
+    assert transport._state is TransportState.ESTABLISHED
+    assert "result" in await transport.send(request)
+
+    # The next renewal is scheduled before the new session expires
+    assert transport._session_renewal_task
+    await transport.close()
+    assert transport._session_renewal_task is None
+
+
+@pytest.mark.parametrize("reuse", [True, False])
+async def test_key_pair_pool(mocker, reuse):
+    """Test that key pairs are generated ahead of time in an executor."""
+    create_key_pair = mocker.spy(KeyPair, "create_key_pair")
+    pool = KeyPairPool(2, reuse=reuse)
+    first = await pool.get()
+    assert create_key_pair.call_count == 1
+
+    if reuse:
+        assert await pool.get() is first
+        assert create_key_pair.call_count == 1
+        return
+
+    await asyncio.gather(*pool._generating)
+    assert len(pool._key_pairs) == 2
+    assert create_key_pair.call_count == 3
+    second = await pool.get()
+    assert second is not first
+    await asyncio.gather(*pool._generating)
+    assert len(pool._key_pairs) == 2
+
+
+async def test_transport_key_pair_pool(mocker):
+    """Test that transports take their key pair from the pool."""
+    host = "127.0.0.1"
+    mock_aes_device = MockAesDevice(host)
+    mocker.patch.object(aiohttp.ClientSession, "post", side_effect=mock_aes_device.post)
+    pool = KeyPairPool(reuse=True)
+    mocker.patch.object(AesTransport, "key_pair_pool", pool)
+
+    transports = [
+        AesTransport(config=DeviceConfig(host, credentials=Credentials("foo", "bar")))
+        for _ in range(2)
+    ]
+    for transport in transports:
+        await transport.perform_handshake()
+    assert transports[0]._key_pair is transports[1]._key_pair
+    assert transports[0]._config.aes_keys == transports[1]._config.aes_keys
+
+
 class MockAesDevice:
     class _mock_response:
         def __init__(self, status, json: dict):
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import re
@@ -9,6 +10,7 @@ import aiohttp
 import pytest
 from yarl import URL
 
+from kasa import jsonfile
 from kasa.credentials import DEFAULT_CREDENTIALS, Credentials, get_default_credentials
 from kasa.deviceconfig import DeviceConfig
 from kasa.exceptions import (
@@ -19,7 +21,8 @@ from kasa.exceptions import (
     _RetryableError,
 )
 from kasa.httpclient import HttpClient
-from kasa.protocols import IotProtocol, SmartProtocol
+from kasa.protocols import IotProtocol, QueryPriority, SmartProtocol
+from kasa.sessionstore import SessionStore
 from kasa.transports.aestransport import AesTransport
 from kasa.transports.klaptransport import (
     KlapEncryptionSession,
@@ -270,6 +273,7 @@ async def test_transport_decrypt(mocker):
 
     resp = await transport.send(json.dumps({}))
     assert d == resp
+    assert transport._last_response_size == len(json.dumps(d))
 
 
 async def test_transport_decrypt_error(mocker, caplog):
@@ -563,3 +567,175 @@ async def test_port_override():
     transport = KlapTransport(config=config)
 
     assert str(transport._app_url) == "http://127.0.0.1:12345/app"
+
+
+async def test_session_store(mocker, tmp_path):
+    """Test that sessions are restored from the store without a handshake."""
+    server_seed = secrets.token_bytes(16)
+    client_credentials = Credentials("foo", "bar")
+    device_auth_hash = KlapTransport.generate_auth_hash(client_credentials)
+    device_session: KlapEncryptionSession | None = None
+    handshakes = 0
+    request_status = 200
+
+    async def _return_response(url: URL, params=None, data=None, *_, **__):
+        nonlocal device_session, handshakes
+
+        if url == URL("http://127.0.0.1:80/app/handshake1"):
+            handshakes += 1
+            device_session = KlapEncryptionSession(data, server_seed, device_auth_hash)
+            return _mock_response(200, server_seed + _sha256(data + device_auth_hash))
+        elif url == URL("http://127.0.0.1:80/app/handshake2"):
+            return _mock_response(200, b"")
+        elif url == URL("http://127.0.0.1:80/app/request"):
+            assert device_session
+            if request_status != 200:
+                return _mock_response(request_status, b"")
+            assert params["seq"] == device_session._seq + 1
+            encrypted, _ = device_session.encrypt('{"great": "success"}')
+            return _mock_response(200, encrypted)
+
+    mocker.patch.object(aiohttp.ClientSession, "post", side_effect=_return_response)
+
+    path = tmp_path / "sessions.json"
+
+    async def _query():
+        config = DeviceConfig(
+            "127.0.0.1",
+            credentials=client_credentials,
+            session_store=SessionStore(path),
+        )
+        transport = KlapTransport(config=config)
+        protocol = IotProtocol(transport=transport)
+        for _ in range(3):
+            assert await protocol.query({}) == {"great": "success"}
+        await protocol.close()
+        await config.session_store.flush()
+
+    await _query()
+    assert handshakes == 1
+    assert path.exists()
+
+    # The session and sequence number are restored after a restart
+    await _query()
+    assert handshakes == 1
+
+    # A security error falls back to a handshake
+    request_status = 403
+    config = DeviceConfig(
+        "127.0.0.1", credentials=client_credentials, session_store=SessionStore(path)
+    )
+    protocol = IotProtocol(transport=KlapTransport(config=config))
+    with pytest.raises(_RetryableError):
+        await protocol.query({}, retry_count=0)
+    await config.session_store.flush()
+    assert SessionStore(path).get(protocol._transport._session_store_key) is None
+    request_status = 200
+    assert await protocol.query({}) == {"great": "success"}
+    assert handshakes == 2
+    await protocol.close()
+    await config.session_store.flush()
+
+    # Expired sessions are not restored
+    store = SessionStore(path)
+    key = protocol._transport._session_store_key
+    session = store.get(key)
+    assert session
+    store.set(key, {**session, "expires_at": time.time() - 1})
+    config = DeviceConfig(
+        "127.0.0.1", credentials=client_credentials, session_store=store
+    )
+    protocol = IotProtocol(transport=KlapTransport(config=config))
+    assert await protocol.query({}) == {"great": "success"}
+    assert handshakes == 3
+    await protocol.close()
+
+
+async def test_session_store_batched_writes(mocker, tmp_path):
+    """Test that sessions stored in quick succession are written together."""
+    path = tmp_path / "sessions.json"
+    store = SessionStore(path)
+    write = mocker.spy(jsonfile, "write_private_file")
+    for i in range(3):
+        store.set(f"device{i}", {"seq": i})
+    assert not path.exists()
+
+    await store.flush()
+    write.assert_called_once()
+    assert path.stat().st_mode & 0o777 == 0o600
+    assert SessionStore(path).get("device2") == {"seq": 2}
+
+    # Without a running event loop the file is written straight away
+    await asyncio.to_thread(store.delete, "device0")
+    assert SessionStore(path).get("device0") is None
+
+
+def test_encryption_session_dict():
+    """Test that encryption sessions are restored from their state."""
+    session = KlapEncryptionSession(
+        secrets.token_bytes(16), secrets.token_bytes(16), secrets.token_bytes(32)
+    )
+    session.encrypt("foo")
+    restored = KlapEncryptionSession.from_dict(
+        json.loads(json.dumps(session.to_dict()))
+    )
+    assert restored.encrypt("bar") == session.encrypt("bar")
+
+
+@pytest.mark.parametrize("session_renewal", [True, False])
+async def test_session_renewal(mocker, session_renewal):
+    """Test that the session is renewed in the background before it expires."""
+    server_seed = secrets.token_bytes(16)
+    client_credentials = Credentials("foo", "bar")
+    device_auth_hash = KlapTransport.generate_auth_hash(client_credentials)
+    device_session: KlapEncryptionSession | None = None
+    handshakes = 0
+
+    async def _return_response(url: URL, params=None, data=None, *_, **__):
+        nonlocal device_session, handshakes
+
+        if url == URL("http://127.0.0.1:80/app/handshake1"):
+            handshakes += 1
+            device_session = KlapEncryptionSession(data, server_seed, device_auth_hash)
+            return _mock_response(200, server_seed + _sha256(data + device_auth_hash))
+        elif url == URL("http://127.0.0.1:80/app/handshake2"):
+            return _mock_response(200, b"")
+        elif url == URL("http://127.0.0.1:80/app/request"):
+            assert device_session
+            device_session._seq = params["seq"] - 1
+            encrypted, _ = device_session.encrypt('{"great": "success"}')
+            return _mock_response(200, encrypted)
+
+    mocker.patch.object(aiohttp.ClientSession, "post", side_effect=_return_response)
+
+    config = DeviceConfig(
+        "127.0.0.1", credentials=client_credentials, session_renewal=session_renewal
+    )
+    transport = KlapTransport(config=config)
+    # Renew the first session straight away
+    transport.SESSION_RENEWAL_SECONDS = 86400
+    protocol = IotProtocol(transport=transport)
+    assert await protocol.query({}) == {"great": "success"}
+    renewal_task = transport._session_renewal_task
+    if not session_renewal:
+        assert renewal_task is None
+        await protocol.close()
+        return
+
+    assert renewal_task
+    encryption_session = transport._encryption_session
+    transport.SESSION_RENEWAL_SECONDS = 300
+    # The renewal waits for the queries to the device
+    async with protocol._query_lock(QueryPriority.Interactive):
+        await asyncio.sleep(0.01)
+        assert not renewal_task.done()
+        assert handshakes == 1
+    await renewal_task
+    assert handshakes == 2
+    assert transport._encryption_session is not encryption_session
+    assert transport._encryption_session.local_seed == device_session.local_seed
+    assert await protocol.query({}) == {"great": "success"}
+    assert handshakes == 2
+
+    await protocol.close()
+    assert transport._session_renewal_task is None